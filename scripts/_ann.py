@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+from typing import List
+
+import numpy as np
+
+
+class LSHIndex:
+    """Random-hyperplane LSH over the rows of a DedupeEngine (row i here is row i there).
+
+    Each of `tables` tables hashes a unit vector to `bits` sign bits. Two vectors
+    at cosine s share one bit with probability 1 - acos(s)/pi, so a pair at the
+    0.85 dedupe threshold collides in a table with p = 0.823**bits and in at
+    least one table with 1 - (1 - p)**tables; unrelated stories almost never
+    do. Candidates from all tables are re-scored exactly by the engine.
+
+    Per table the codes are kept sorted together with their row numbers:
+    inserting merges new codes in, deleting (expiry, cap, replaced ids) drops
+    rows and renumbers the survivors the way the engine compacts its matrix.
+    """
+
+    def __init__(self, dims: int, bits: int = 14, tables: int = 48, seed: int = 0) -> None:
+        if not 1 <= bits <= 32:
+            raise ValueError("bits must be between 1 and 32")
+        self.dims = dims
+        self.bits = bits
+        self.tables = tables
+        rng = np.random.default_rng(seed)
+        self._planes = rng.standard_normal((dims, tables * bits), dtype=np.float32)
+        self._weights = (np.uint64(1) << np.arange(bits, dtype=np.uint64)).astype(np.uint64)
+        self._codes = np.zeros((tables, 0), dtype=np.uint32)
+        self._rows = np.zeros((tables, 0), dtype=np.int64)
+
+    def __len__(self) -> int:
+        return self._codes.shape[1]
+
+    def hash(self, vectors: np.ndarray) -> np.ndarray:
+        """(n, tables) uint32 codes."""
+        signs = (np.asarray(vectors, dtype=np.float32) @ self._planes) > 0
+        signs = signs.reshape(len(signs), self.tables, self.bits)
+        return (signs.astype(np.uint64) @ self._weights).astype(np.uint32)
+
+    def add(self, vectors: np.ndarray, first_row: int) -> None:
+        """Index vectors stored at rows first_row, first_row + 1, ... of the engine."""
+        if not len(vectors):
+            return
+        codes = self.hash(vectors)
+        rows = np.arange(first_row, first_row + len(vectors), dtype=np.int64)
+        merged_codes = np.empty((self.tables, len(self) + len(rows)), dtype=np.uint32)
+        merged_rows = np.empty_like(merged_codes, dtype=np.int64)
+        for t in range(self.tables):
+            order = np.argsort(codes[:, t], kind="stable")
+            new_codes = codes[order, t]
+            at = np.searchsorted(self._codes[t], new_codes, side="right")
+            merged_codes[t] = np.insert(self._codes[t], at, new_codes)
+            merged_rows[t] = np.insert(self._rows[t], at, rows[order])
+        self._codes, self._rows = merged_codes, merged_rows
+
+    def keep(self, mask: np.ndarray) -> None:
+        """Drop rows where mask is False; survivors are renumbered 0..kept-1 in order."""
+        renumber = np.cumsum(mask) - 1
+        selected = mask[self._rows]
+        kept = int(mask.sum())
+        self._codes = self._codes[selected].reshape(self.tables, kept)
+        self._rows = renumber[self._rows[selected]].reshape(self.tables, kept)
+
+    def candidates(self, queries: np.ndarray) -> List[np.ndarray]:
+        """Distinct engine rows sharing a bucket with each query, in any table."""
+        codes = self.hash(queries)
+        starts = np.empty((self.tables, len(queries)), dtype=np.int64)
+        ends = np.empty_like(starts)
+        for t in range(self.tables):
+            starts[t] = np.searchsorted(self._codes[t], codes[:, t], side="left")
+            ends[t] = np.searchsorted(self._codes[t], codes[:, t], side="right")
+        out = []
+        for q in range(len(queries)):
+            hits = [self._rows[t, starts[t, q] : ends[t, q]] for t in range(self.tables) if ends[t, q] > starts[t, q]]
+            out.append(np.unique(np.concatenate(hits)) if hits else np.zeros(0, dtype=np.int64))
+        return out
@@ -0,0 +1,536 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from _feeds import FEEDS_CONFIG, feed_table
+
+ROOT = Path(__file__).resolve().parents[1]
+LIB_DIR = ROOT / "scripts" / "lib"
+
+# `// @include name[, name...]` at column 0; a name is a helper in scripts/lib/*.js or a file stem (whole file).
+_INCLUDE = re.compile(r"^//\s*@include\s+(.+?)\s*$")
+# `// @generate name`: code generated at build time from a config file.
+_GENERATE = re.compile(r"^//\s*@generate\s+([\w-]+)\s*$")
+GENERATORS: Dict[str, Tuple[Path, Callable[[Path], Tuple[List[str], List[int]]]]] = {
+    "rss-feeds": (FEEDS_CONFIG, feed_table),
+}
+_UNIT_START = re.compile(r"^(?:(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=|(?:async\s+)?function\s*\*?\s*([A-Za-z_$][\w$]*))")
+
+_PUNCTUATOR = re.compile(
+    "|".join(
+        re.escape(op)
+        for op in sorted(
+            """>>>= ... === !== **= <<= >>= >>> &&= ||= ??= => == != <= >= && || ?? ?. ++ -- += -= *= /= %= &= |= ^= ** << >>""".split(),
+            key=len,
+            reverse=True,
+        )
+    )
+    + "|.",
+    re.S,
+)
+_SPACE = re.compile("[ \t\r\f\v\u00a0\ufeff]+")
+# After these keywords a `/` starts a regex literal, not a division.
+_REGEX_AFTER_WORDS = {
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void",
+    "throw", "case", "do", "else", "yield", "await",
+}
+_WORD = re.compile("[A-Za-z0-9_$#\u0080-\uffff]+")
+_NUMBER = re.compile(r"(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?[\w$]*")
+
+
+class BundleError(ValueError):
+    pass
+
+
+@dataclass
+class Token:
+    kind: str  # word | string | template | regex | punct | comment
+    text: str
+    line: int  # 0-based line of the first character
+    newline_before: bool = False  # a line break (or multi-line comment) separates it from the previous token
+    space_before: bool = False
+
+
+class _Lexer:
+    """Just enough of a JavaScript lexer to strip comments and whitespace safely."""
+
+    def __init__(self, src: str) -> None:
+        self.src = src
+        self.pos = 0
+        self.line = 0
+        self.prev: Optional[Token] = None
+
+    def _regex_allowed(self) -> bool:
+        prev = self.prev
+        if prev is None:
+            return True
+        if prev.kind == "word":
+            return prev.text in _REGEX_AFTER_WORDS
+        if prev.kind == "punct":
+            return prev.text not in (")", "]", "}", "++", "--")
+        return False
+
+    def _advance(self, end: int) -> str:
+        text = self.src[self.pos : end]
+        self.line += text.count("\n")
+        self.pos = end
+        return text
+
+    def _quoted_end(self, start: int, quote: str) -> int:
+        i = start + 1
+        while i < len(self.src):
+            ch = self.src[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == quote:
+                return i + 1
+            if ch == "\n":
+                break
+            i += 1
+        raise BundleError(f"unterminated string literal on line {self.line + 1}")
+
+    def _regex_end(self, start: int) -> int:
+        i = start + 1
+        in_class = False
+        while i < len(self.src):
+            ch = self.src[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "\n":
+                break
+            if in_class:
+                in_class = ch != "]"
+            elif ch == "[":
+                in_class = True
+            elif ch == "/":
+                i += 1
+                while i < len(self.src) and (self.src[i].isalnum() or self.src[i] in "_$"):
+                    i += 1
+                return i
+            i += 1
+        raise BundleError(f"unterminated regex literal on line {self.line + 1}")
+
+    def _template_end(self, start: int) -> int:
+        """End of a template literal; `${...}` expressions are lexed so nested strings/braces are skipped."""
+        i = start + 1
+        while i < len(self.src):
+            ch = self.src[i]
+            if ch == "\\":
+                i += 2
+                continue
+            if ch == "`":
+                return i + 1
+            if ch == "$" and self.src.startswith("${", i):
+                i = self._expression_end(i + 2)
+                continue
+            i += 1
+        raise BundleError("unterminated template literal")
+
+    def _expression_end(self, start: int) -> int:
+        inner = _Lexer(self.src)
+        inner.pos = start
+        inner.prev = Token("punct", "{", 0)
+        depth = 0
+        for token in inner:
+            if token.kind == "punct" and token.text == "{":
+                depth += 1
+            elif token.kind == "punct" and token.text == "}":
+                if depth == 0:
+                    return inner.pos
+                depth -= 1
+        raise BundleError("unterminated template expression")
+
+    def __iter__(self) -> Iterator[Token]:
+        src = self.src
+        newline = False
+        space = False
+        while self.pos < len(src):
+            ch = src[self.pos]
+            start_line = self.line
+            if ch == "\n":
+                newline = True
+                self._advance(self.pos + 1)
+                continue
+            blank = _SPACE.match(src, self.pos)
+            if blank:
+                space = True
+                self.pos = blank.end()
+                continue
+            if src.startswith("//", self.pos):
+                end = src.find("\n", self.pos)
+                text = self._advance(len(src) if end < 0 else end)
+                yield Token("comment", text, start_line)
+                space = True
+                continue
+            if src.startswith("/*", self.pos):
+                end = src.find("*/", self.pos + 2)
+                if end < 0:
+                    raise BundleError(f"unterminated block comment on line {start_line + 1}")
+                text = self._advance(end + 2)
+                yield Token("comment", text, start_line)
+                newline = newline or "\n" in text
+                space = True
+                continue
+
+            if ch in "'\"":
+                kind, end = "string", self._quoted_end(self.pos, ch)
+            elif ch == "`":
+                kind, end = "template", self._template_end(self.pos)
+            elif ch == "/" and self._regex_allowed():
+                kind, end = "regex", self._regex_end(self.pos)
+            elif _NUMBER.match(src, self.pos) or _WORD.match(src, self.pos):
+                kind, end = "word", (_NUMBER.match(src, self.pos) or _WORD.match(src, self.pos)).end()
+            else:
+                kind = "punct"
+                op = _PUNCTUATOR.match(src, self.pos).group(0)
+                if op == "?." and self.pos + 2 < len(src) and src[self.pos + 2].isdigit():
+                    op = "?"
+                end = self.pos + len(op)
+            token = Token(kind, self._advance(end), start_line, newline, space or newline)
+            newline = space = False
+            self.prev = token
+            yield token
+
+
+def _tokens(src: str) -> List[Token]:
+    return list(_Lexer(src))
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch in "_$#" or ord(ch) > 0x7F
+
+
+def _needs_space(prev: Token, token: Token) -> bool:
+    a, b = prev.text[-1], token.text[0]
+    if _is_word_char(a) and _is_word_char(b):
+        return True
+    if prev.kind == "word" and prev.text[0].isdigit() and b == ".":
+        return True
+    return (a, b) in (("+", "+"), ("-", "-"), ("/", "/"), ("<", "!"))
+
+
+@dataclass
+class _Unit:
+    name: str
+    path: Path
+    first_line: int  # 0-based
+    lines: List[str]
+    refs: set = field(default_factory=set)  # identifiers used, to pull in the helpers it calls
+
+
+def _parse_lib(path: Path) -> List[_Unit]:
+    lines = path.read_text(encoding="utf-8").split("\n")
+    starts = []
+    for index, line in enumerate(lines):
+        match = _UNIT_START.match(line)
+        if not match:
+            continue
+        first = index
+        while first > 0 and lines[first - 1].startswith("//"):
+            first -= 1
+        starts.append((first, match.group(1) or match.group(2)))
+    if starts and any(line.strip() and not line.startswith("//") for line in lines[: starts[0][0]]):
+        raise BundleError(f"{path}: code before the first helper definition")
+    units = []
+    for i, (first, name) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(lines)
+        body = lines[first:end]
+        while body and not body[-1].strip():
+            body.pop()
+        refs = {t.text for t in _tokens("\n".join(body)) if t.kind == "word"} - {name}
+        units.append(_Unit(name, path, first, body, refs))
+    return units
+
+
+_library_cache: Dict[Tuple, Dict[str, Any]] = {}
+
+
+def lib_paths() -> List[Path]:
+    return sorted(LIB_DIR.glob("*.js")) if LIB_DIR.is_dir() else []
+
+
+def shared_inputs() -> List[Path]:
+    """Files besides the node sources that can change a build: helper libraries and generator configs."""
+    return lib_paths() + [path for path, _ in GENERATORS.values()]
+
+
+def _library() -> Dict[str, Any]:
+    """{"units": name -> _Unit, "files": stem -> [names]}, re-parsed when a library file changes."""
+    paths = lib_paths()
+    key = tuple((str(p), p.stat().st_mtime_ns) for p in paths)
+    if key not in _library_cache:
+        units: Dict[str, _Unit] = {}
+        files: Dict[str, List[str]] = {}
+        for path in paths:
+            for unit in _parse_lib(path):
+                if unit.name in units:
+                    raise BundleError(f"helper {unit.name!r} defined in both {units[unit.name].path.name} and {path.name}")
+                units[unit.name] = unit
+                files.setdefault(path.stem, []).append(unit.name)
+        _library_cache.clear()
+        _library_cache[key] = {"units": units, "files": files}
+    return _library_cache[key]
+
+
+def _relative(path: Path) -> str:
+    try:
+        return str(path.resolve().relative_to(ROOT))
+    except ValueError:
+        return str(path)
+
+
+def _declared(lines: Iterable[str]) -> set:
+    return {m.group(1) or m.group(2) for m in (_UNIT_START.match(line) for line in lines) if m}
+
+
+def _expand(path: Path) -> List[Tuple[str, str, int]]:
+    """Inline `@include` directives; returns (text, source, 0-based line) per output line."""
+    library = _library()
+    units: Dict[str, _Unit] = library["units"]
+    lines = path.read_text(encoding="utf-8").split("\n")
+    own = _declared(lines)
+    source = _relative(path)
+    included: set = set()
+    out: List[Tuple[str, str, int]] = []
+
+    def emit(name: str, requested: bool) -> None:
+        if name in included:
+            return
+        if name in own:
+            if requested:
+                raise BundleError(f"{source}: {name!r} is both defined locally and included")
+            return
+        included.add(name)
+        unit = units[name]
+        for dep in sorted(unit.refs & units.keys()):
+            emit(dep, False)
+        unit_source = _relative(unit.path)
+        out.extend((text, unit_source, unit.first_line + i) for i, text in enumerate(unit.lines))
+        out.append(("", unit_source, unit.first_line + len(unit.lines)))
+
+    for index, line in enumerate(lines):
+        generate = _GENERATE.match(line)
+        if generate:
+            if generate.group(1) not in GENERATORS:
+                raise BundleError(f"{source}:{index + 1}: unknown generator {generate.group(1)!r}")
+            config, generator = GENERATORS[generate.group(1)]
+            try:
+                generated, origins = generator(config)
+            except (OSError, ValueError) as exc:
+                raise BundleError(f"{source}:{index + 1}: {generate.group(1)}: {exc}") from exc
+            out.extend((text, _relative(config), origin) for text, origin in zip(generated, origins))
+            continue
+        match = _INCLUDE.match(line)
+        if not match:
+            out.append((line, source, index))
+            continue
+        for name in (n.strip() for n in match.group(1).split(",")):
+            if name in library["files"]:
+                for unit_name in library["files"][name]:
+                    emit(unit_name, True)
+            elif name in units:
+                emit(name, True)
+            else:
+                raise BundleError(f"{source}:{index + 1}: unknown helper {name!r} in @include")
+    return out
+
+
+def _minify(tokens: List[Token]) -> Tuple[str, List[int]]:
+    """Drop comments, indentation and blank lines; line breaks between statements are kept (no ASI hazards).
+
+    Returns the code and, per output line, the 0-based input line it came from.
+    """
+    out_lines: List[str] = []
+    origins: List[int] = []
+    current: List[str] = []
+    prev: Optional[Token] = None
+    for token in tokens:
+        if token.kind == "comment":
+            continue
+        if current and token.newline_before:
+            out_lines.append("".join(current))
+            current = []
+        if not current:
+            origins.append(token.line)
+        elif token.space_before and prev is not None and _needs_space(prev, token):
+            current.append(" ")
+        pieces = token.text.split("\n")
+        current.append(pieces[0])
+        for offset, piece in enumerate(pieces[1:], start=1):
+            out_lines.append("".join(current))
+            current = [piece]
+            origins.append(token.line + offset)
+        prev = token
+    if current:
+        out_lines.append("".join(current))
+    return "\n".join(out_lines), origins
+
+
+def _significant(src: str) -> List[str]:
+    return [t.text for t in _tokens(src) if t.kind != "comment"]
+
+
+_VLQ_CHARS = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"
+
+
+def _vlq(value: int) -> str:
+    value = (-value << 1) | 1 if value < 0 else value << 1
+    out = ""
+    while True:
+        digit = value & 31
+        value >>= 5
+        out += _VLQ_CHARS[digit | (32 if value else 0)]
+        if not value:
+            return out
+
+
+def _unvlq(segment: str) -> List[int]:
+    values, shift, value = [], 0, 0
+    for ch in segment:
+        digit = _VLQ_CHARS.index(ch)
+        value += (digit & 31) << shift
+        if digit & 32:
+            shift += 5
+            continue
+        values.append(-(value >> 1) if value & 1 else value >> 1)
+        shift, value = 0, 0
+    return values
+
+
+def _source_map(name: str, origins: List[Tuple[str, int]], code: str) -> Dict[str, Any]:
+    """Source Map v3 with one segment per generated line (column 0)."""
+    sources: List[str] = []
+    mappings = []
+    last_source, last_line = 0, 0
+    for source, line in origins:
+        if source not in sources:
+            sources.append(source)
+        index = sources.index(source)
+        mappings.append(_vlq(0) + _vlq(index - last_source) + _vlq(line - last_line) + _vlq(0))
+        last_source, last_line = index, line
+    return {
+        "version": 3,
+        "file": name,
+        "sources": sources,
+        "names": [],
+        "mappings": ";".join(mappings),
+        "x_sha256": hashlib.sha256(code.encode("utf-8")).hexdigest(),
+    }
+
+
+def original_line(source_map: Dict[str, Any], line: int) -> Optional[Tuple[str, int]]:
+    """(source path, 1-based line) for a 1-based generated line, or None if out of range."""
+    source, src_line = 0, 0
+    for index, group in enumerate(source_map.get("mappings", "").split(";"), start=1):
+        segment = group.split(",")[0]
+        if segment:
+            values = _unvlq(segment)
+            source += values[1]
+            src_line += values[2]
+        if index == line:
+            return source_map["sources"][source], src_line + 1
+    return None
+
+
+@dataclass
+class Bundle:
+    code: str
+    source_map: Dict[str, Any]
+    bundled_bytes: int  # size with helpers inlined but before minification, i.e. what used to be pushed
+
+    @property
+    def size(self) -> int:
+        return len(self.code.encode("utf-8"))
+
+
+def minify_default() -> bool:
+    return os.environ.get("CODE_NODE_MINIFY", "true").lower() != "false"
+
+
+def bundle(path: Path, minify: Optional[bool] = None, name: Optional[str] = None) -> Bundle:
+    """Inline shared helpers into a code node source and (by default) minify it."""
+    lines = _expand(path)
+    bundled = "\n".join(text for text, _, _ in lines)
+    name = name or path.name
+    if minify is None:
+        minify = minify_default()
+    if not minify:
+        return Bundle(bundled, _source_map(name, [(s, l) for _, s, l in lines], bundled), len(bundled.encode("utf-8")))
+    tokens = _tokens(bundled)
+    code, origins = _minify(tokens)
+    if _significant(code) != [t.text for t in tokens if t.kind != "comment"]:
+        raise BundleError(f"{path.name}: minified token stream differs from the source")
+    return Bundle(code, _source_map(name, [lines[i][1:] for i in origins], code), len(bundled.encode("utf-8")))
+
+
+def build_code_nodes(sources: Dict[str, Path], minify: Optional[bool] = None) -> Dict[str, Bundle]:
+    return {name: bundle(path, minify, name) for name, path in sources.items()}
+
+
+def _maps_path() -> Path:
+    override = os.environ.get("CODE_NODE_MAPS_PATH")
+    return Path(override) if override else ROOT / "logs" / "code-node-maps.json"
+
+
+def load_source_maps() -> Dict[str, Dict[str, Any]]:
+    path = _maps_path()
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def record_source_maps(bundles: Dict[str, Bundle]) -> None:
+    """Keep the source map of what is deployed, per node, for mapping runtime error lines."""
+    maps = load_source_maps()
+    maps.update({name: built.source_map for name, built in bundles.items()})
+    path = _maps_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(maps, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+_ERROR_LINE = re.compile(r"\[line (\d+)\]|<anonymous>:(\d+)(?::\d+)?")
+
+
+def deployed_source_map(node: str, code: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Recorded map for `node`; with `code` (the jsCode that ran), only if the map was built from it."""
+    source_map = load_source_maps().get(node)
+    if source_map and code is not None and hashlib.sha256(code.encode("utf-8")).hexdigest() != source_map.get("x_sha256"):
+        return None
+    return source_map
+
+
+def error_origin(message: Optional[str], source_map: Optional[Dict[str, Any]], line_offset: int = 0) -> Optional[Tuple[str, int]]:
+    """Original (file, line) of the first line reference in a code node error."""
+    match = _ERROR_LINE.search(message or "")
+    if not match or not source_map:
+        return None
+    return original_line(source_map, int(match.group(1) or match.group(2)) - line_offset)
+
+
+def annotate_error(message: str, source_map: Optional[Dict[str, Any]], line_offset: int = 0) -> str:
+    """Append the original file:line to `[line N]` / `<anonymous>:N` references in a code node error.
+
+    `line_offset` is the number of wrapper lines the runtime put before the code.
+    """
+    if not source_map or not message:
+        return message
+
+    def replace(match: "re.Match[str]") -> str:
+        found = original_line(source_map, int(match.group(1) or match.group(2)) - line_offset)
+        return f"{match.group(0)} ({found[0]}:{found[1]})" if found else match.group(0)
+
+    return _ERROR_LINE.sub(replace, message)
@@ -0,0 +1,280 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from _ann import LSHIndex
+from _vector_store import VectorStore, is_binary_store
+
+
+DAY_MS = 24 * 60 * 60 * 1000
+# Rows of history per matrix product: bounds the (batch x block) similarity buffer.
+BLOCK_ROWS = 8192
+
+
+def default_store_path() -> Path:
+    return Path(os.environ.get("SEMANTIC_DEDUPE_STORE_PATH") or Path.home() / ".n8n" / "x-daily-pack-embeddings.json")
+
+
+def normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Unit-length float32 rows; zero rows stay zero (similarity 0, as in cosineSimilarity)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+@dataclass
+class Verdict:
+    duplicate: bool
+    similarity: float
+    similar_to: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"duplicate": self.duplicate, "similarity": round(self.similarity, 6), "similar_to": self.similar_to}
+
+
+class DedupeEngine:
+    """Semantic dedupe history as one contiguous matrix of unit vectors.
+
+    Same decisions as semantic-dedupe-node.js: an item is a duplicate when its
+    cosine similarity to any stored embedding, or to an item accepted earlier in
+    the same batch, reaches the threshold; accepted items join the history.
+    Norms are computed once on insert, so similarity is a matrix product.
+
+    index="lsh" answers lookups from an LSHIndex (re-scored exactly) instead of
+    scanning every row; it is kept in step with inserts, expiry and the cap.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.85,
+        expiry_days: float = 7,
+        max_embeddings: int = 500,
+        index: str = "exact",
+        lsh_bits: int = 14,
+        lsh_tables: int = 48,
+    ) -> None:
+        if index not in ("exact", "lsh"):
+            raise ValueError(f"unknown index {index!r} (exact, lsh)")
+        self.threshold = threshold
+        self.expiry_days = expiry_days
+        self.max_embeddings = max_embeddings
+        self.index = index
+        self.lsh_bits = lsh_bits
+        self.lsh_tables = lsh_tables
+        self._lsh: Optional[LSHIndex] = None
+        self._store: Optional[VectorStore] = None
+        self.dims: Optional[int] = None
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._timestamps = np.zeros(0, dtype=np.int64)
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._matrix[: len(self.ids)]
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps[: len(self.ids)]
+
+    def _reserve(self, rows: int, dims: int) -> None:
+        if self.dims != dims:
+            # A different embedding model: old vectors are not comparable (the node scores them 0).
+            self.dims = dims
+            self._matrix = np.zeros((0, dims), dtype=np.float32)
+            self._timestamps = np.zeros(0, dtype=np.int64)
+            self.ids, self.titles = [], []
+            if self.index == "lsh":
+                self._lsh = LSHIndex(dims, bits=self.lsh_bits, tables=self.lsh_tables)
+        needed = len(self.ids) + rows
+        if needed <= self._matrix.shape[0]:
+            return
+        capacity = max(needed, 2 * self._matrix.shape[0], 64)
+        matrix = np.zeros((capacity, dims), dtype=np.float32)
+        matrix[: len(self.ids)] = self.vectors
+        timestamps = np.zeros(capacity, dtype=np.int64)
+        timestamps[: len(self.ids)] = self.timestamps
+        self._matrix, self._timestamps = matrix, timestamps
+
+    def add(self, vectors: np.ndarray, ids: Sequence[str], titles: Sequence[str], timestamps: Sequence[int], normalized: bool = False) -> None:
+        """Append rows; a stored row with the same id is replaced (the node merges its store by id, newest wins)."""
+        if not len(ids):
+            return
+        vectors = np.asarray(vectors, dtype=np.float32) if normalized else normalize_rows(vectors)
+        incoming = set(ids)
+        if self.dims == vectors.shape[1] and not incoming.isdisjoint(self.ids):
+            self._keep(np.fromiter((id_ not in incoming for id_ in self.ids), dtype=bool, count=len(self.ids)))
+        self._reserve(len(ids), vectors.shape[1])
+        start = len(self.ids)
+        self._matrix[start : start + len(ids)] = vectors
+        self._timestamps[start : start + len(ids)] = np.asarray(timestamps, dtype=np.int64)
+        self.ids.extend(ids)
+        self.titles.extend(titles)
+        if self._lsh is not None:
+            self._lsh.add(vectors, start)
+
+    def _keep(self, mask: np.ndarray) -> int:
+        """Compact rows where mask is True to the front, in place; returns rows dropped."""
+        dropped = int(len(mask) - mask.sum())
+        if dropped:
+            kept = np.flatnonzero(mask)
+            self._matrix[: len(kept)] = self._matrix[kept]
+            self._timestamps[: len(kept)] = self._timestamps[kept]
+            self.ids = [self.ids[i] for i in kept]
+            self.titles = [self.titles[i] for i in kept]
+            if self._lsh is not None:
+                self._lsh.keep(mask)
+        return dropped
+
+    def expire(self, now_ms: int) -> int:
+        return self._keep((now_ms - self.timestamps) < self.expiry_days * DAY_MS)
+
+    def cap(self) -> int:
+        """Keep the newest max_embeddings rows (storage order preserved)."""
+        if len(self) <= self.max_embeddings:
+            return 0
+        newest = np.argsort(-self.timestamps, kind="stable")[: self.max_embeddings]
+        mask = np.zeros(len(self), dtype=bool)
+        mask[newest] = True
+        return self._keep(mask)
+
+    def search(self, queries: np.ndarray, k: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+        """Top-k similarities and history rows per (unit) query, best first; row -1 pads missing hits."""
+        best = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        where = np.full((len(queries), k), -1, dtype=np.int64)
+        history = self.vectors
+        if self._lsh is not None:
+            for q, rows in enumerate(self._lsh.candidates(queries)):
+                if not len(rows):
+                    continue
+                sims = history[rows] @ queries[q]
+                top = np.argsort(-sims, kind="stable")[:k]
+                best[q, : len(top)] = sims[top]
+                where[q, : len(top)] = rows[top]
+            return best, where
+        for start in range(0, len(history), BLOCK_ROWS):
+            sims = queries @ history[start : start + BLOCK_ROWS].T
+            if k == 1:
+                idx = sims.argmax(axis=1)[:, None]
+            else:
+                idx = np.argpartition(-sims, min(k, sims.shape[1]) - 1, axis=1)[:, :k]
+            merged_sims = np.hstack([best, np.take_along_axis(sims, idx, axis=1)])
+            merged_rows = np.hstack([where, idx + start])
+            order = np.argsort(-merged_sims, axis=1, kind="stable")[:, :k]
+            best = np.take_along_axis(merged_sims, order, axis=1)
+            where = np.take_along_axis(merged_rows, order, axis=1)
+        return best, where
+
+    def nearest(self, queries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Best similarity and history row per (unit) query; similarity 0 and row -1 when nothing is found."""
+        best, where = self.search(queries, 1)
+        return np.where(where[:, 0] >= 0, best[:, 0], 0).astype(np.float32), where[:, 0]
+
+    def dedupe(self, items: Sequence[Dict[str, Any]], now_ms: Optional[int] = None) -> List[Verdict]:
+        """Judge a batch of {id, title, embedding}; accepted items are added to the history."""
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        self.expire(now_ms)
+        if not items:
+            return []
+        queries = normalize_rows(np.asarray([item["embedding"] for item in items], dtype=np.float32))
+        if self.dims is not None and queries.shape[1] != self.dims:
+            self._reserve(0, queries.shape[1])
+
+        best, where = self.nearest(queries) if len(self) else (np.zeros(len(items), dtype=np.float32), np.full(len(items), -1))
+        gram = queries @ queries.T
+        accepted: List[int] = []
+        verdicts: List[Verdict] = []
+        for i, item in enumerate(items):
+            similarity = float(best[i])
+            similar_to = self.titles[where[i]] if where[i] >= 0 else ""
+            if accepted:
+                row = gram[i, accepted]
+                j = int(row.argmax())
+                if row[j] > similarity:
+                    similarity = float(row[j])
+                    similar_to = str(items[accepted[j]].get("title") or "")
+            duplicate = similarity >= self.threshold
+            verdicts.append(Verdict(duplicate, similarity, similar_to))
+            if not duplicate:
+                accepted.append(i)
+
+        self.add(
+            queries[accepted],
+            [str(items[i].get("id") or "") for i in accepted],
+            [str(items[i].get("title") or "") for i in accepted],
+            [now_ms] * len(accepted),
+            normalized=True,
+        )
+        self.cap()
+        return verdicts
+
+    # ---- stores: a .vec path is the binary store (scripts/_vector_store.py), anything else the node's JSON ----
+
+    def load(self, path: Path) -> int:
+        if not is_binary_store(path):
+            return self.load_json(path)
+        self._store = VectorStore(path)
+        vectors, entries = self._store.read()
+        self.add(vectors, [e.id for e in entries], [e.title for e in entries], [e.timestamp for e in entries])
+        return len(entries)
+
+    def save(self, path: Path, dtype: Optional[str] = None, compact: bool = False) -> Dict[str, Any]:
+        """Persist the history; for a .vec store only rows not yet on disk are written (see VectorStore.write)."""
+        if not is_binary_store(path):
+            self.save_json(path)
+            return {}
+        if self._store is None or self._store.path != path or (dtype and dtype != self._store.dtype):
+            self._store = VectorStore(path, dtype)
+            self._store.read()
+        return self._store.write(self.ids, self.titles, self.timestamps, self.vectors, compact=compact)
+
+    # JSON: the node's format, {"embeddings": [{id, embedding, title, timestamp}]}
+
+    def load_json(self, path: Path) -> int:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8") or "{}")
+        except FileNotFoundError:
+            return 0
+        entries = data.get("embeddings") if isinstance(data, dict) else None
+        # Same rule as mergeEmbeddings in the node: one entry per id, newest wins.
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for entry in entries or []:
+            if not isinstance(entry, dict) or not entry.get("id") or not isinstance(entry.get("embedding"), list):
+                continue
+            existing = by_id.get(entry["id"])
+            if existing is None or (entry.get("timestamp") or 0) > (existing.get("timestamp") or 0):
+                by_id[entry["id"]] = entry
+        usable = list(by_id.values())
+        if usable:
+            dims = Counter(len(e["embedding"]) for e in usable).most_common(1)[0][0]
+            usable = [e for e in usable if len(e["embedding"]) == dims]
+        self.add(
+            np.asarray([e["embedding"] for e in usable], dtype=np.float32).reshape(len(usable), -1),
+            [str(e["id"]) for e in usable],
+            [str(e.get("title") or "") for e in usable],
+            [int(e.get("timestamp") or 0) for e in usable],
+        )
+        return len(usable)
+
+    def save_json(self, path: Path) -> None:
+        # Unit vectors are stored; cosine similarity is unchanged, so the node reads them as before.
+        entries = [
+            {"id": id_, "embedding": [round(x, 7) for x in vector.tolist()], "title": title, "timestamp": int(ts)}
+            for id_, title, ts, vector in zip(self.ids, self.titles, self.timestamps, self.vectors)
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"embeddings": entries}, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, path)
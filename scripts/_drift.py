@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import _bundle
+import _feeds
+from _bundle import BundleError, bundle, minify_default, shared_inputs
+from _feeds import config_digest, live_digest
+from _n8n_api import N8NClient
+from deploy_daily_pack import CODE_NODE_SOURCES, ROOT, daily_pack_cron, digest, live_cron, workflow_nodes
+
+
+WORKFLOWS_DIR = ROOT / "workflows"
+PIPELINE_SPEC = ROOT / "config" / "pipeline.json"
+# A change to the bundler itself can change every build.
+_BUILD_TOOLS = [Path(_bundle.__file__).resolve(), Path(_feeds.__file__).resolve()]
+
+
+@dataclass(frozen=True)
+class DriftRecord:
+    """One difference between the repo and live n8n; `expected`/`live` are short hashes, never code."""
+
+    workflow: str
+    kind: str  # missing_workflow | cron_mismatch | missing_node | missing_source | bundle_error | feeds_config_mismatch | code_mismatch
+    workflow_id: Optional[str] = None
+    node: Optional[str] = None
+    expected: Optional[str] = None
+    live: Optional[str] = None
+    detail: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if value is not None}
+
+
+@dataclass
+class ManagedWorkflow:
+    """A live workflow the repo owns: how to find it, its cron, and sha256 of every managed jsCode."""
+
+    name: str
+    match: Callable[[Dict[str, Any]], bool]
+    cron: Optional[str]
+    # node name -> sha256 of the jsCode deploy would push, or None when it cannot be built
+    code: Dict[str, Optional[str]]
+    errors: Dict[str, DriftRecord] = field(default_factory=dict)
+    # Matched by a name substring: picks among the live workflows no exact match claimed.
+    loose: bool = False
+
+
+@dataclass
+class WorkflowReport:
+    name: str
+    workflow_id: Optional[str]
+    expected_cron: Optional[str]
+    live_cron: Optional[str]
+    code_checked: int
+    records: List[DriftRecord]
+
+
+def _cache_path() -> Path:
+    override = os.environ.get("DRIFT_HASH_CACHE_PATH")
+    return Path(override) if override else ROOT / "logs" / "drift-hash-cache.json"
+
+
+def _stamp(paths: Iterable[Path]) -> Dict[str, Optional[List[int]]]:
+    stamps: Dict[str, Optional[List[int]]] = {}
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            stamps[str(path)] = None
+            continue
+        stamps[str(path)] = [stat.st_mtime_ns, stat.st_size]
+    return stamps
+
+
+class HashCache:
+    """Hashes keyed by what they were computed from; an entry is reused while no input's mtime/size moved."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or _cache_path()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            data = {}
+        self._entries: Dict[str, Any] = data if isinstance(data, dict) else {}
+
+    def get(self, key: str, inputs: List[Path], compute: Callable[[], Any]) -> Any:
+        """compute() must return something JSON-serializable; errors it raises are not cached."""
+        stamps = _stamp(inputs)
+        entry = self._entries.get(key)
+        if entry and entry.get("inputs") == stamps:
+            self.hits += 1
+            return entry["value"]
+        self.misses += 1
+        value = compute()
+        self._entries[key] = {"inputs": stamps, "value": value}
+        self._dirty = True
+        return value
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._entries, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+def _daily_pack(cache: HashCache) -> ManagedWorkflow:
+    minify = minify_default()
+    shared = shared_inputs() + _BUILD_TOOLS
+    managed = ManagedWorkflow(
+        name="Daily Pack",
+        match=lambda w: "Daily Pack" in (w.get("name") or ""),
+        cron=daily_pack_cron(),
+        code={},
+        loose=True,
+    )
+    for name, source_path in CODE_NODE_SOURCES.items():
+        if not source_path.exists():
+            managed.code[name] = None
+            managed.errors[name] = DriftRecord("Daily Pack", "missing_source", node=name, detail=str(source_path.relative_to(ROOT)))
+            continue
+
+        def build(source_path: Path = source_path, name: str = name) -> str:
+            return digest(bundle(source_path, minify=minify, name=name).code)
+
+        try:
+            managed.code[name] = cache.get(f"bundle:{name}:minify={minify}", [source_path] + shared, build)
+        except BundleError as exc:
+            managed.code[name] = None
+            managed.errors[name] = DriftRecord("Daily Pack", "bundle_error", node=name, detail=str(exc))
+    return managed
+
+
+def _pipeline_output() -> Optional[Path]:
+    try:
+        output = json.loads(PIPELINE_SPEC.read_text(encoding="utf-8")).get("output")
+    except (OSError, json.JSONDecodeError):
+        return None
+    return (ROOT / output).resolve() if output else None
+
+
+def _file_workflow(path: Path, cache: HashCache) -> Optional[ManagedWorkflow]:
+    """A workflows/*.json file synced as-is (sync-workflow.py --deploy): its own code nodes and cron."""
+
+    def read() -> Dict[str, Any]:
+        workflow = json.loads(path.read_text(encoding="utf-8"))
+        nodes = list(workflow_nodes(workflow))
+        return {
+            "id": workflow.get("id"),
+            "name": workflow.get("name"),
+            "cron": live_cron(nodes),
+            "code": {
+                node["name"]: digest(node["parameters"]["jsCode"])
+                for node in nodes
+                if node.get("type") == "n8n-nodes-base.code" and "jsCode" in (node.get("parameters") or {})
+            },
+        }
+
+    try:
+        spec = cache.get(f"file:{path.name}", [path], read)
+    except (OSError, json.JSONDecodeError, KeyError):
+        return None
+    workflow_id, name = spec["id"], spec["name"]
+    if not name:
+        return None
+
+    def match(live: Dict[str, Any]) -> bool:
+        return live.get("id") == workflow_id if workflow_id else live.get("name") == name
+
+    return ManagedWorkflow(name=name, match=match, cron=spec["cron"], code=dict(spec["code"]))
+
+
+def managed_workflows(cache: HashCache) -> List[ManagedWorkflow]:
+    """The Daily Pack (built from CODE_NODE_SOURCES) plus every other workflows/*.json the repo syncs."""
+    managed = [_daily_pack(cache)]
+    compiled = _pipeline_output()
+    for path in sorted(WORKFLOWS_DIR.glob("*.json")):
+        if path.resolve() == compiled:
+            continue
+        workflow = _file_workflow(path, cache)
+        if workflow:
+            managed.append(workflow)
+    return managed
+
+
+def _pick(managed: ManagedWorkflow, live_workflows: List[Dict[str, Any]], claimed: set) -> Optional[Dict[str, Any]]:
+    candidates = [w for w in live_workflows if w.get("id") not in claimed and managed.match(w)]
+    candidates.sort(key=lambda w: not w.get("active"))
+    return candidates[0] if candidates else None
+
+
+def check_workflow(managed: ManagedWorkflow, live: Dict[str, Any]) -> WorkflowReport:
+    workflow_id = live.get("id")
+    nodes_by_name = {node.get("name"): node for node in workflow_nodes(live)}
+    actual_cron = live_cron(nodes_by_name.values())
+    records: List[DriftRecord] = []
+
+    def record(kind: str, **fields: Any) -> None:
+        records.append(DriftRecord(managed.name, kind, workflow_id=workflow_id, **fields))
+
+    if managed.cron and actual_cron != managed.cron:
+        record("cron_mismatch", expected=managed.cron, live=actual_cron)
+
+    checked = 0
+    feeds_expected: Optional[str] = None
+    for name, expected in managed.code.items():
+        node = nodes_by_name.get(name)
+        if not node or node.get("type") != "n8n-nodes-base.code":
+            record("missing_node", node=name)
+            continue
+        if expected is None:
+            error = managed.errors[name]
+            record(error.kind, node=name, detail=error.detail)
+            continue
+
+        checked += 1
+        live_code = (node.get("parameters") or {}).get("jsCode", "")
+        live_hash = digest(live_code)
+        if live_hash == expected:
+            continue
+        # A generated feed table carries the hash of the config it came from, which
+        # says why the node drifted without diffing the source.
+        live_feeds = live_digest(live_code)
+        if live_feeds:
+            feeds_expected = feeds_expected or config_digest()
+            if live_feeds != feeds_expected:
+                record("feeds_config_mismatch", node=name, expected=feeds_expected[:12], live=live_feeds[:12])
+                continue
+        record("code_mismatch", node=name, expected=expected[:12], live=live_hash[:12])
+
+    return WorkflowReport(managed.name, workflow_id, managed.cron, actual_cron, checked, records)
+
+
+def check_all(client: N8NClient, cache: Optional[HashCache] = None) -> List[WorkflowReport]:
+    """Drift for every managed workflow from one /workflows listing (no per-workflow GET when it carries nodes)."""
+    cache = cache or HashCache()
+    managed = managed_workflows(cache)
+    cache.save()
+
+    live_workflows = list(client.list_workflows())
+    claimed: set = set()
+    picked: Dict[int, Dict[str, Any]] = {}
+    for index in sorted(range(len(managed)), key=lambda i: managed[i].loose):
+        live = _pick(managed[index], live_workflows, claimed)
+        if live is not None:
+            claimed.add(live.get("id"))
+            picked[index] = live
+
+    reports: List[WorkflowReport] = []
+    for index, workflow in enumerate(managed):
+        live = picked.get(index)
+        if live is None:
+            record = DriftRecord(workflow.name, "missing_workflow")
+            reports.append(WorkflowReport(workflow.name, None, workflow.cron, None, 0, [record]))
+            continue
+        if not list(workflow_nodes(live)):
+            live = client.get_workflow(live["id"])
+        reports.append(check_workflow(workflow, live))
+    return reports
+
+
+def drift_records(reports: Iterable[WorkflowReport]) -> List[DriftRecord]:
+    return [record for report in reports for record in report.records]
+
+
+def summary(reports: List[WorkflowReport], cache: Optional[HashCache] = None) -> Dict[str, Any]:
+    records = drift_records(reports)
+    out: Dict[str, Any] = {
+        "drift": bool(records),
+        "workflows": [
+            {
+                "name": report.name,
+                "workflow_id": report.workflow_id,
+                "expected_cron": report.expected_cron,
+                "live_cron": report.live_cron,
+                "code_nodes_checked": report.code_checked,
+            }
+            for report in reports
+        ],
+        "records": [record.as_dict() for record in records],
+    }
+    if cache is not None:
+        out["hash_cache"] = {"hits": cache.hits, "misses": cache.misses}
+    return out
+
+
+def by_kind(records: Iterable[DriftRecord]) -> Dict[str, List[DriftRecord]]:
+    grouped: Dict[str, List[DriftRecord]] = {}
+    for record in records:
+        grouped.setdefault(record.kind, []).append(record)
+    return grouped
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+ROOT = Path(__file__).resolve().parents[1]
+FEEDS_CONFIG = ROOT / "config" / "rss-feeds.json"
+
+# The only fields rss-fetch-node.js reads; category/notes stay in the config.
+FEED_FIELDS = ("id", "name", "url", "tier")
+_LIVE_DIGEST = re.compile(r"FEEDS_CONFIG_SHA256\s*=\s*['\"]([0-9a-f]{64})['\"]")
+
+
+def load_feeds(path: Path = FEEDS_CONFIG) -> List[Dict[str, str]]:
+    """Enabled feeds from the config, trimmed to FEED_FIELDS, in config order."""
+    data = json.loads(path.read_text(encoding="utf-8"))
+    feeds = []
+    for feed in data.get("feeds") or []:
+        if feed.get("enabled") is False:
+            continue
+        missing = [field for field in FEED_FIELDS if not feed.get(field)]
+        if missing:
+            raise ValueError(f"{path.name}: feed {feed.get('id')!r} lacks {', '.join(missing)}")
+        feeds.append({field: str(feed[field]) for field in FEED_FIELDS})
+    return feeds
+
+
+def feeds_digest(feeds: List[Dict[str, str]]) -> str:
+    return hashlib.sha256(json.dumps(feeds, sort_keys=True, separators=(",", ":")).encode("utf-8")).hexdigest()
+
+
+def config_digest(path: Path = FEEDS_CONFIG) -> str:
+    """Digest of what the generated table would contain; no bundling needed."""
+    return feeds_digest(load_feeds(path))
+
+
+def live_digest(js_code: Optional[str]) -> Optional[str]:
+    match = _LIVE_DIGEST.search(js_code or "")
+    return match.group(1) if match else None
+
+
+def host_groups(feeds: List[Dict[str, str]]) -> List[List[int]]:
+    """Indexes into `feeds` grouped by URL host, in first-seen order."""
+    groups: Dict[str, List[int]] = {}
+    for index, feed in enumerate(feeds):
+        groups.setdefault(urlsplit(feed["url"]).netloc.lower(), []).append(index)
+    return list(groups.values())
+
+
+def feed_table(path: Path = FEEDS_CONFIG) -> Tuple[List[str], List[int]]:
+    """JS for `// @generate rss-feeds`: lines, and the 0-based config line each one comes from."""
+    feeds = load_feeds(path)
+    config_lines = path.read_text(encoding="utf-8").split("\n")
+    id_line = {}
+    for index, line in enumerate(config_lines):
+        match = re.search(r'"id"\s*:\s*"([^"]+)"', line)
+        if match:
+            id_line.setdefault(match.group(1), index)
+
+    lines: List[Tuple[str, int]] = [
+        ("// Generated from config/rss-feeds.json at deploy time - edit the config, not this table.", 0),
+        (f"const FEEDS_CONFIG_SHA256 = '{feeds_digest(feeds)}';", 0),
+        ("const feeds = [", 0),
+    ]
+    for index, feed in enumerate(feeds):
+        fields = ", ".join(f"{field}: {json.dumps(feed[field], ensure_ascii=False)}" for field in FEED_FIELDS)
+        lines.append((f"  {{ {fields} }}{',' if index < len(feeds) - 1 else ''}", id_line.get(feed["id"], 0)))
+    lines.append(("];", 0))
+    lines.append(("// Indexes into `feeds` by host: same-host feeds run one after another on a kept-alive", 0))
+    lines.append(("// connection (and stay under per-host rate limits); different hosts run in parallel.", 0))
+    lines.append((f"const feedHostGroups = {json.dumps(host_groups(feeds), separators=(', ', ': '))};", 0))
+    return [text for text, _ in lines], [origin for _, origin in lines]
+
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import base64
+import datetime as dt
+import gzip
+import hashlib
+import hmac
+import json
+import os
+import re
+import secrets
+import struct
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[1]
+FORMAT_VERSION = 1
+
+REDACTED = "[REDACTED]"
+
+# Keys whose values are dropped outright, wherever they appear.
+SECRET_KEY_RE = re.compile(
+    r"(token|secret|password|passwd|api[_-]?key|authorization|cookie|session|signature|credential|webhook)",
+    re.IGNORECASE,
+)
+# Keys holding an account handle; replaced by a stable pseudonym so duplicates stay duplicates.
+HANDLE_KEYS = frozenset({"author", "username", "screen_name", "user_name", "author_handle", "handle"})
+# Env vars whose values must never end up in the corpus, even embedded in free text.
+SECRET_ENV_RE = re.compile(r"(TOKEN|SECRET|PASSWORD|API_KEY|_KEY$|WEBHOOK)")
+
+_VALUE_PATTERNS: Tuple[Tuple[str, re.Pattern], ...] = (
+    ("openai_key", re.compile(r"\bsk-[A-Za-z0-9_-]{20,}")),
+    ("slack_token", re.compile(r"\bxox[abprs]-[A-Za-z0-9-]{10,}")),
+    ("telegram_token", re.compile(r"\b\d{8,10}:[A-Za-z0-9_-]{35}\b")),
+    ("github_token", re.compile(r"\bgh[pousr]_[A-Za-z0-9]{30,}")),
+    ("bearer", re.compile(r"\bBearer\s+[A-Za-z0-9._~+/=-]{8,}", re.IGNORECASE)),
+    (
+        "url_credential",
+        re.compile(r"([?&](?:token|key|api_key|apikey|access_token|sig|signature|secret)=)[^&#\s\"']+", re.IGNORECASE),
+    ),
+)
+_EMAIL_RE = re.compile(r"\b[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}\b")
+_PHONE_RE = re.compile(r"(?<![\w+])\+\d{1,3}[\s-]?\d(?:[\s-]?\d){6,12}\b")
+_PROFILE_URL_RE = re.compile(r"(https?://(?:www\.)?(?:twitter|x)\.com/)([A-Za-z0-9_]{1,15})(?=/|\b)", re.IGNORECASE)
+_MENTION_RE = re.compile(r"(?<![\w@/])@([A-Za-z0-9_]{1,15})\b")
+# Path segments under twitter.com / x.com that are not account handles.
+_RESERVED_PATHS = frozenset({"i", "home", "search", "hashtag", "intent", "share", "explore", "settings"})
+
+
+@dataclass
+class Scrubber:
+    """Redacts secrets and pseudonymizes PII in execution payloads.
+
+    Pseudonyms are HMACs under `salt` (GOLDEN_CORPUS_SALT, random per run if
+    unset), so the same handle or address maps to the same token across the
+    whole corpus and duplicate structure survives scrubbing.
+    """
+
+    salt: bytes = field(default_factory=lambda: (os.environ.get("GOLDEN_CORPUS_SALT") or secrets.token_hex(16)).encode())
+    env_secrets: List[str] = field(default_factory=list)
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_env(cls) -> "Scrubber":
+        values = {
+            value
+            for key, value in os.environ.items()
+            if SECRET_ENV_RE.search(key.upper()) and value and len(value) >= 8
+        }
+        # Longest first so a secret containing another is removed whole.
+        return cls(env_secrets=sorted(values, key=len, reverse=True))
+
+    def _count(self, rule: str, n: int = 1) -> None:
+        if n:
+            self.counts[rule] = self.counts.get(rule, 0) + n
+
+    def pseudonym(self, kind: str, value: str) -> str:
+        digest = hmac.new(self.salt, f"{kind}:{value.lower()}".encode("utf-8"), hashlib.sha256).hexdigest()
+        return f"{kind}_{digest[:10]}"
+
+    def _handle(self, handle: str) -> str:
+        if handle.lower() in _RESERVED_PATHS or handle.lower() == "unknown":
+            return handle
+        self._count("handle")
+        return self.pseudonym("user", handle)
+
+    def scrub_text(self, text: str) -> str:
+        for secret in self.env_secrets:
+            if secret in text:
+                self._count("env_secret", text.count(secret))
+                text = text.replace(secret, REDACTED)
+        for rule, pattern in _VALUE_PATTERNS:
+            if rule == "url_credential":
+                text, n = pattern.subn(lambda m: m.group(1) + REDACTED, text)
+            else:
+                text, n = pattern.subn(REDACTED, text)
+            self._count(rule, n)
+        text, n = _EMAIL_RE.subn(lambda m: f"{self.pseudonym('email', m.group(0))}@example.invalid", text)
+        self._count("email", n)
+        text, n = _PHONE_RE.subn(REDACTED, text)
+        self._count("phone", n)
+        text = _PROFILE_URL_RE.sub(lambda m: m.group(1) + self._handle(m.group(2)), text)
+        text = _MENTION_RE.sub(lambda m: "@" + self._handle(m.group(1)), text)
+        return text
+
+    def scrub(self, value: Any, key: Optional[str] = None) -> Any:
+        # String values only: `total_tokens` and friends are counts, not credentials.
+        if key is not None and isinstance(value, str) and value and SECRET_KEY_RE.search(key):
+            self._count("secret_key")
+            return REDACTED
+        if isinstance(value, dict):
+            return {k: self.scrub(v, k) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.scrub(v) for v in value]
+        if isinstance(value, str):
+            if key is not None and key.lower() in HANDLE_KEYS and value:
+                return self._handle(value.lstrip("@"))
+            return self.scrub_text(value)
+        return value
+
+
+def item_payloads(items: Iterable[Dict[str, Any]]) -> List[Any]:
+    """`json` of each n8n item; binary data and pairing metadata are not part of the corpus."""
+    return [item.get("json", item) if isinstance(item, dict) else item for item in items]
+
+
+def dumps_gz(value: Any) -> bytes:
+    raw = json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    # mtime=0 keeps identical content byte-identical across recordings.
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def loads_gz(path: Path) -> Any:
+    return json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+
+
+def encode_vectors(vectors: List[List[float]]) -> str:
+    """Little-endian float32, base64: ~4x smaller than JSON floats before gzip."""
+    flat = [float(v) for vector in vectors for v in vector]
+    return base64.b64encode(struct.pack(f"<{len(flat)}f", *flat)).decode("ascii")
+
+
+def decode_vectors(data: str, dims: int) -> List[List[float]]:
+    raw = base64.b64decode(data)
+    flat = struct.unpack(f"<{len(raw) // 4}f", raw)
+    return [list(flat[i : i + dims]) for i in range(0, len(flat), dims)]
+
+
+def default_corpus_dir() -> Path:
+    override = os.environ.get("GOLDEN_CORPUS_DIR")
+    return Path(override) if override else ROOT / "tests" / "fixtures" / "golden"
+
+
+def read_index(corpus_dir: Path) -> Dict[str, Any]:
+    path = corpus_dir / "index.json"
+    if not path.exists():
+        return {"format": FORMAT_VERSION, "latest": None, "versions": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def latest_version(corpus_dir: Optional[Path] = None) -> Optional[str]:
+    return read_index(corpus_dir or default_corpus_dir()).get("latest")
+
+
+def next_version(corpus_dir: Path) -> str:
+    numbers = [int(v["version"][1:]) for v in read_index(corpus_dir)["versions"] if v["version"][1:].isdigit()]
+    return f"v{max(numbers, default=0) + 1}"
+
+
+def write_version(corpus_dir: Path, version: str, files: Dict[str, bytes], manifest: Dict[str, Any]) -> Path:
+    """Write files + manifest under `<corpus_dir>/<version>/`, then publish it in index.json."""
+    target = corpus_dir / version
+    if target.exists():
+        raise SystemExit(f"corpus version already exists: {target}")
+    for rel, blob in files.items():
+        path = target / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(blob)
+    (target / "manifest.json").write_text(json.dumps(manifest, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    index = read_index(corpus_dir)
+    index["versions"].append(
+        {
+            "version": version,
+            "created_at": manifest["created_at"],
+            "executions": [e["id"] for e in manifest["executions"]],
+            "content_sha256": manifest["content_sha256"],
+        }
+    )
+    index["latest"] = version
+    tmp = corpus_dir / f"index.json.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(index, indent=2) + "\n", encoding="utf-8")
+    os.replace(tmp, corpus_dir / "index.json")
+    return target
+
+
+def content_sha256(files: Dict[str, bytes]) -> str:
+    digest = hashlib.sha256()
+    for rel in sorted(files):
+        digest.update(rel.encode("utf-8"))
+        digest.update(hashlib.sha256(files[rel]).digest())
+    return digest.hexdigest()
+
+
+def utc_now() -> str:
+    return dt.datetime.now(dt.timezone.utc).replace(microsecond=0).isoformat()
+
+
+@dataclass
+class CorpusNode:
+    execution_id: int
+    node: str
+    input: List[Any]
+    output: List[Any]
+    execution_time_ms: int
+
+
+def load_corpus(
+    version: Optional[str] = None,
+    nodes: Optional[Iterable[str]] = None,
+    corpus_dir: Optional[Path] = None,
+) -> List[CorpusNode]:
+    """Node snapshots of one corpus version (default: latest), in manifest order."""
+    corpus_dir = corpus_dir or default_corpus_dir()
+    version = version or latest_version(corpus_dir)
+    if not version:
+        raise FileNotFoundError(f"no golden corpus under {corpus_dir} (run scripts/record_golden_corpus.py)")
+    base = corpus_dir / version
+    manifest = json.loads((base / "manifest.json").read_text(encoding="utf-8"))
+    wanted = set(nodes) if nodes else None
+    out = []
+    for execution in manifest["executions"]:
+        for name, meta in execution["nodes"].items():
+            if wanted is not None and name not in wanted:
+                continue
+            snap = loads_gz(base / meta["file"])
+            out.append(
+                CorpusNode(
+                    execution_id=int(execution["id"]),
+                    node=name,
+                    input=snap["input"],
+                    output=snap["output"],
+                    execution_time_ms=int(snap.get("execution_time_ms") or 0),
+                )
+            )
+    return out
+
+
+def load_corpus_embeddings(
+    version: Optional[str] = None, corpus_dir: Optional[Path] = None
+) -> List[Dict[str, Any]]:
+    """Recorded semantic-dedupe store entries ({id, title, timestamp, embedding}); empty if none."""
+    corpus_dir = corpus_dir or default_corpus_dir()
+    version = version or latest_version(corpus_dir)
+    path = corpus_dir / str(version) / "embeddings.json.gz"
+    if not version or not path.exists():
+        return []
+    blob = loads_gz(path)
+    vectors = decode_vectors(blob["vectors"], int(blob["dims"]))
+    return [
+        {"id": e["id"], "title": e.get("title", ""), "timestamp": e.get("timestamp"), "embedding": vector}
+        for e, vector in zip(blob["entries"], vectors)
+    ]
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Set
+
+
+# <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+# Editors save in place (CLOSE_WRITE) or write a temp file and rename it over (MOVED_TO).
+_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_MODIFY
+_EVENT = struct.Struct("iIII")
+
+
+class _InotifyWatcher:
+    """Watches the parent directories of `paths`, so atomic-rename saves are seen too."""
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        self.paths = {p.resolve() for p in paths}
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._dirs: Dict[int, Path] = {}
+        for directory in {p.parent for p in self.paths}:
+            wd = libc.inotify_add_watch(self._fd, str(directory).encode(), _WATCH_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+            self._dirs[wd] = directory
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+        changed = set()
+        offset = 0
+        while offset + _EVENT.size <= len(buf):
+            wd, _mask, _cookie, length = _EVENT.unpack_from(buf, offset)
+            name = buf[offset + _EVENT.size : offset + _EVENT.size + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += _EVENT.size + length
+            path = self._dirs.get(wd, Path("/")) / name
+            if path in self.paths:
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingWatcher:
+    """mtime/size polling for platforms without inotify."""
+
+    def __init__(self, paths: Iterable[Path], interval: float = 0.25) -> None:
+        self.paths = {p.resolve() for p in paths}
+        self.interval = interval
+        self._seen = {p: self._stat(p) for p in self.paths}
+
+    @staticmethod
+    def _stat(path: Path) -> Optional[tuple]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def wait(self, timeout: Optional[float]) -> Set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            changed = set()
+            for path in self.paths:
+                current = self._stat(path)
+                if current != self._seen[path]:
+                    self._seen[path] = current
+                    changed.add(path)
+            if changed or (deadline is not None and time.monotonic() >= deadline):
+                return changed
+            time.sleep(self.interval if deadline is None else max(0.0, min(self.interval, deadline - time.monotonic())))
+
+    def close(self) -> None:
+        pass
+
+
+class FileWatcher:
+    """Change notification for a fixed set of files: inotify on Linux, polling elsewhere."""
+
+    def __init__(self, paths: Iterable[Path], force_polling: bool = False) -> None:
+        paths = list(paths)
+        self.backend = "polling"
+        if not force_polling and hasattr(select, "select") and os.uname().sysname == "Linux":
+            try:
+                self._impl = _InotifyWatcher(paths)
+                self.backend = "inotify"
+                return
+            except (OSError, AttributeError):
+                pass
+        self._impl = _PollingWatcher(paths)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[Path]:
+        return self._impl.wait(timeout)
+
+    def wait_settled(self, debounce: float, max_wait: float = 2.0) -> Set[Path]:
+        """Block for the first change, then keep collecting until `debounce` seconds pass quietly."""
+        changed = set()
+        while not changed:
+            changed = self.wait(None)
+        settle_by = time.monotonic() + max_wait
+        while time.monotonic() < settle_by:
+            more = self.wait(min(debounce, settle_by - time.monotonic()))
+            if not more:
+                break
+            changed |= more
+        return changed
+
+    def close(self) -> None:
+        self._impl.close()
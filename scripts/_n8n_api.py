@@ -54,6 +54,30 @@ class N8NClient:
     def update_workflow(self, workflow_id: str, workflow: Dict[str, Any]) -> Dict[str, Any]:
         return self.request("PUT", f"/workflows/{workflow_id}", workflow)
 
+    def list_executions(
+        self,
+        workflow_id: Optional[str] = None,
+        limit: int = 20,
+        include_data: bool = False,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """One page of executions, newest first: {"data": [...], "nextCursor": ...}."""
+        params: Dict[str, str] = {"limit": str(limit)}
+        if workflow_id:
+            params["workflowId"] = workflow_id
+        if include_data:
+            params["includeData"] = "true"
+        if status:
+            params["status"] = status
+        if cursor:
+            params["cursor"] = cursor
+        return self.request("GET", "/executions?" + urllib.parse.urlencode(params))
+
+    def get_execution(self, execution_id: int, include_data: bool = False) -> Dict[str, Any]:
+        suffix = "?includeData=true" if include_data else ""
+        return self.request("GET", f"/executions/{execution_id}{suffix}")
+
 
 def build_client() -> N8NClient:
     host = os.environ.get("N8N_HOST", "localhost")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import datetime as dt
 import json
 import os
 import sqlite3
@@ -8,6 +9,10 @@ from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
+# n8n only sets `finished` for successful runs; status is what marks a run as done.
+TERMINAL_STATUSES = frozenset({"success", "error", "crashed", "canceled"})
+
+
 def _db_path() -> Path:
     override = os.environ.get("N8N_DB_PATH")
     if override:
@@ -15,15 +20,28 @@ def _db_path() -> Path:
     return Path.home() / ".n8n" / "database.sqlite"
 
 
-def connect() -> sqlite3.Connection:
+def connect(check_same_thread: bool = True) -> sqlite3.Connection:
     path = _db_path()
     if not path.exists():
         raise RuntimeError(f"n8n database not found at {path}")
-    conn = sqlite3.connect(path)
+    conn = sqlite3.connect(path, check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+def parse_iso(value: Optional[str]) -> Optional[dt.datetime]:
+    """An n8n timestamp (startedAt/stoppedAt, "Z" or naive meaning UTC) as an aware UTC datetime."""
+    if not value:
+        return None
+    try:
+        parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=dt.timezone.utc)
+        return parsed.astimezone(dt.timezone.utc)
+    except ValueError:
+        return None
+
+
 def latest_execution_id(conn: sqlite3.Connection, workflow_id: str) -> Optional[int]:
     row = conn.execute(
         "select id from execution_entity where workflowId=? order by id desc limit 1",
@@ -47,6 +65,58 @@ def recent_executions(
     ).fetchall()
 
 
+def executions_after(
+    conn: sqlite3.Connection, workflow_id: str, after_id: int, limit: int = 100
+) -> List[sqlite3.Row]:
+    return conn.execute(
+        """
+        select id, status, finished, startedAt, stoppedAt
+        from execution_entity
+        where workflowId=? and id>?
+        order by id desc
+        limit ?
+        """,
+        (workflow_id, after_id, limit),
+    ).fetchall()
+
+
+def executions_since(conn: sqlite3.Connection, after_id: int, limit: int = 500) -> List[sqlite3.Row]:
+    """All workflows' executions above a watermark, oldest first."""
+    return conn.execute(
+        """
+        select id, workflowId, status, finished, startedAt, stoppedAt
+        from execution_entity
+        where id>?
+        order by id asc
+        limit ?
+        """,
+        (after_id, limit),
+    ).fetchall()
+
+
+def last_success_started(conn: sqlite3.Connection) -> List[sqlite3.Row]:
+    """Per workflow, when its most recent successful execution started."""
+    return conn.execute(
+        """
+        select workflowId, max(startedAt) as startedAt
+        from execution_entity
+        where status='success'
+        group by workflowId
+        """
+    ).fetchall()
+
+
+def executions_by_id(conn: sqlite3.Connection, execution_ids: Iterable[int]) -> List[sqlite3.Row]:
+    ids = list(execution_ids)
+    if not ids:
+        return []
+    placeholders = ",".join("?" for _ in ids)
+    return conn.execute(
+        f"select id, status, finished, startedAt, stoppedAt from execution_entity where id in ({placeholders})",
+        ids,
+    ).fetchall()
+
+
 def load_execution_data(conn: sqlite3.Connection, execution_id: int) -> Optional[List[Any]]:
     row = conn.execute(
         "select data from execution_data where executionId=?",
@@ -57,6 +127,18 @@ def load_execution_data(conn: sqlite3.Connection, execution_id: int) -> Optional
     return json.loads(row["data"])
 
 
+def load_execution_workflow(conn: sqlite3.Connection, execution_id: int) -> Optional[Dict[str, Any]]:
+    """Workflow snapshot (nodes + connections) stored alongside an execution."""
+    row = conn.execute(
+        "select workflowData from execution_data where executionId=?",
+        (execution_id,),
+    ).fetchone()
+    if not row or not row["workflowData"]:
+        return None
+    data = json.loads(row["workflowData"])
+    return data if isinstance(data, dict) else None
+
+
 def _deref(container: List[Any], value: Any) -> Any:
     if isinstance(value, str) and value.isdigit():
         idx = int(value)
@@ -76,6 +158,27 @@ def resolve_refs(container: List[Any], value: Any, depth: int = 0) -> Any:
     return value
 
 
+def flatten_refs(value: Dict[str, Any]) -> List[Any]:
+    """Inverse of resolve_refs: encode a dict into n8n's flatted container layout."""
+    container: List[Any] = [None]
+
+    def put(item: Any) -> Any:
+        if isinstance(item, (dict, list, str)):
+            idx = len(container)
+            container.append(None)
+            if isinstance(item, dict):
+                container[idx] = {k: put(v) for k, v in item.items()}
+            elif isinstance(item, list):
+                container[idx] = [put(v) for v in item]
+            else:
+                container[idx] = item
+            return str(idx)
+        return item
+
+    container[0] = {k: put(v) for k, v in value.items()}
+    return container
+
+
 def execution_result(container: List[Any]) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any], Any]:
     if not container:
         return None, {}, None
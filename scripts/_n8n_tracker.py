@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import os
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from _n8n_api import N8NClient
+from _n8n_db import TERMINAL_STATUSES
+
+
+# Query parameter / header carrying the correlation id into the Webhook node output.
+CORRELATION_PARAM = "correlationId"
+CORRELATION_HEADER = "X-Correlation-Id"
+
+
+def new_correlation_id() -> str:
+    return uuid.uuid4().hex
+
+
+def run_data_of(execution: Dict[str, Any]) -> Dict[str, Any]:
+    """runData from a REST execution payload (already de-referenced by the API)."""
+    result = ((execution.get("data") or {}).get("resultData")) or {}
+    run_data = result.get("runData")
+    return run_data if isinstance(run_data, dict) else {}
+
+
+def correlation_of(execution: Dict[str, Any]) -> Optional[str]:
+    """Correlation id echoed by the trigger node (Webhook output carries query + headers)."""
+    for runs in run_data_of(execution).values():
+        if not runs or not isinstance(runs, list):
+            continue
+        main = ((runs[0].get("data") or {}).get("main")) or []
+        items = main[0] if main and isinstance(main[0], list) else []
+        if not items or not isinstance(items[0], dict):
+            continue
+        payload = items[0].get("json") or {}
+        query = payload.get("query") if isinstance(payload.get("query"), dict) else {}
+        headers = payload.get("headers") if isinstance(payload.get("headers"), dict) else {}
+        value = query.get(CORRELATION_PARAM) or headers.get(CORRELATION_HEADER.lower())
+        if value:
+            return str(value)
+    return None
+
+
+@dataclass
+class _Backoff:
+    """Adaptive poll interval: fast right after a change, relaxing to `maximum` while idle."""
+
+    minimum: float
+    maximum: float
+    factor: float = 1.5
+    current: float = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.current = self.minimum
+
+    def reset(self) -> None:
+        self.current = self.minimum
+
+    def sleep(self, deadline: float) -> None:
+        time.sleep(max(0.0, min(self.current, deadline - time.monotonic())))
+        self.current = min(self.maximum, self.current * self.factor)
+
+
+class ExecutionTracker:
+    """Follow the execution started by a trigger through the n8n REST API.
+
+    Works against local or remote n8n; only the public API is used. With a
+    correlation id, candidates above the watermark are matched on the id the
+    Webhook node echoes back, so concurrent runs are never confused. Without
+    one, the first new execution of the workflow is taken.
+
+    The echoed id is only visible once n8n has saved the Webhook node's
+    runData, i.e. with EXECUTIONS_DATA_SAVE_ON_PROGRESS=true (see
+    docker-compose.yml) or after the run ends; undecided runs are re-polled
+    until then.
+    """
+
+    def __init__(
+        self,
+        client: N8NClient,
+        workflow_id: str,
+        after_id: int,
+        correlation_id: Optional[str] = None,
+        min_poll_seconds: Optional[float] = None,
+        max_poll_seconds: Optional[float] = None,
+    ) -> None:
+        self.client = client
+        self.workflow_id = workflow_id
+        self.after_id = after_id
+        self.correlation_id = correlation_id
+        self.min_poll = min_poll_seconds or float(os.environ.get("EXECUTION_POLL_MIN_SECONDS", "0.2"))
+        self.max_poll = max_poll_seconds or float(os.environ.get("EXECUTION_POLL_MAX_SECONDS", "1.0"))
+        self._rejected: Set[int] = set()
+
+    def _candidates(self) -> List[Dict[str, Any]]:
+        page = self.client.list_executions(self.workflow_id, limit=20)
+        rows = [e for e in page.get("data", []) if int(e["id"]) > self.after_id]
+        return sorted(rows, key=lambda e: int(e["id"]))
+
+    def _matches(self, execution: Dict[str, Any]) -> Optional[bool]:
+        """True/False once decidable; None while the trigger output is not visible yet."""
+        if self.correlation_id is None:
+            return True
+        full = self.client.get_execution(int(execution["id"]), include_data=True)
+        found = correlation_of(full)
+        if found is not None:
+            return found == self.correlation_id
+        if full.get("status") in TERMINAL_STATUSES or execution.get("mode") not in (None, "webhook"):
+            # Finished without our id (or not a webhook run): someone else's execution.
+            return False
+        return None
+
+    def wait_for_execution(self, timeout_seconds: float = 900) -> Optional[int]:
+        deadline = time.monotonic() + timeout_seconds
+        backoff = _Backoff(self.min_poll, self.max_poll)
+        while time.monotonic() < deadline:
+            for execution in self._candidates():
+                execution_id = int(execution["id"])
+                if execution_id in self._rejected:
+                    continue
+                verdict = self._matches(execution)
+                if verdict:
+                    return execution_id
+                if verdict is False:
+                    self._rejected.add(execution_id)
+            backoff.sleep(deadline)
+        return None
+
+    def wait_until_finished(
+        self,
+        execution_id: int,
+        timeout_seconds: float = 900,
+        on_poll: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """Poll until a terminal status; returns the execution with data included.
+
+        `on_poll`, when given, receives every intermediate payload (with data)
+        so callers can follow node progress; otherwise polls skip the data.
+        """
+        deadline = time.monotonic() + timeout_seconds
+        backoff = _Backoff(self.min_poll, self.max_poll)
+        last_status = None
+        while time.monotonic() < deadline:
+            execution = self.client.get_execution(execution_id, include_data=on_poll is not None)
+            if on_poll is not None:
+                on_poll(execution)
+            status = execution.get("status")
+            if status in TERMINAL_STATUSES:
+                if on_poll is None:
+                    execution = self.client.get_execution(execution_id, include_data=True)
+                return execution
+            if status != last_status:
+                last_status = status
+                backoff.reset()
+            backoff.sleep(deadline)
+        return None
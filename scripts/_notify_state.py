@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import fcntl
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+
+def _utc_now() -> dt.datetime:
+    return dt.datetime.now(tz=dt.timezone.utc)
+
+
+def _parse_ts(raw: Optional[str]) -> Optional[dt.datetime]:
+    if not raw:
+        return None
+    try:
+        parsed = dt.datetime.fromisoformat(raw)
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.astimezone(dt.timezone.utc)
+
+
+@dataclass
+class NotifyState:
+    """Signature records keyed by signature, least recently sent first.
+
+    `outbox` holds alerts queued per channel until the next digest flush;
+    `channels` holds per-channel flush/delivery bookkeeping.
+    """
+
+    records: "OrderedDict[str, Dict[str, Any]]"
+    max_records: int
+    outbox: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    channels: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    dirty: bool = False
+
+    def get(self, signature: str) -> Optional[Dict[str, Any]]:
+        return self.records.get(signature)
+
+    def within_cooldown(self, signature: str, minutes: float, now: Optional[dt.datetime] = None) -> bool:
+        record = self.records.get(signature)
+        last = _parse_ts(record.get("last_sent_at")) if record else None
+        if last is None:
+            return False
+        return ((now or _utc_now()) - last).total_seconds() < minutes * 60
+
+    def claim(self, signature: str, severity: str) -> None:
+        """Start this signature's cooldown now (failed deliveries are retried via requeue, not undone)."""
+        record = dict(self.records.pop(signature, None) or {})
+        record.update(
+            {
+                "last_sent_at": _utc_now().isoformat(timespec="seconds"),
+                "severity": severity,
+                "count": int(record.get("count", 0)) + 1,
+            }
+        )
+        self.records[signature] = record
+        while len(self.records) > self.max_records:
+            self.records.popitem(last=False)
+        self.dirty = True
+
+    def update(self, signature: str, **fields: Any) -> None:
+        record = self.records.get(signature)
+        if record is not None:
+            record.update(fields)
+            self.dirty = True
+
+    def channel(self, name: str) -> Dict[str, Any]:
+        self.dirty = True
+        return self.channels.setdefault(name, {})
+
+    def enqueue(self, channel: str, alert: Dict[str, Any], max_queued: int = 200) -> None:
+        queue = self.outbox.setdefault(channel, [])
+        queue.append(alert)
+        if len(queue) > max_queued:
+            dropped = len(queue) - max_queued
+            del queue[:dropped]
+            meta = self.channel(channel)
+            meta["dropped"] = int(meta.get("dropped", 0)) + dropped
+        self.dirty = True
+
+    def take(self, channel: str) -> List[Dict[str, Any]]:
+        queued = self.outbox.pop(channel, [])
+        if queued:
+            self.dirty = True
+        return queued
+
+    def requeue(self, channel: str, alerts: List[Dict[str, Any]]) -> None:
+        # Failed deliveries go back ahead of anything queued meanwhile.
+        self.outbox[channel] = alerts + self.outbox.get(channel, [])
+        self.dirty = True
+
+
+class NotifyStateStore:
+    """File-backed notify state shared by concurrent probe processes.
+
+    Every read-modify-write runs under an exclusive flock on a sidecar lock
+    file and lands via atomic replace, so overlapping cron runs and daemons
+    never interleave writes or observe a half-written file.
+    """
+
+    def __init__(self, path: Path, max_records: int = 5000) -> None:
+        self.path = path
+        self.lock_path = path.with_name(f"{path.name}.lock")
+        self.max_records = max(1, max_records)
+
+    @contextlib.contextmanager
+    def _flock(self) -> Iterator[None]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a+") as handle:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def _read(self) -> NotifyState:
+        raw: Dict[str, Any] = {}
+        if self.path.exists():
+            try:
+                raw = json.loads(self.path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                raw = {}
+        records: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        for signature, record in (raw.get("signatures") or {}).items():
+            records[signature] = record
+        # Pre-history files only carried the last signature; migrate it as a record.
+        legacy = raw.get("last_signature")
+        if legacy and legacy not in records:
+            records[legacy] = {
+                "last_sent_at": raw.get("last_sent_at"),
+                "severity": raw.get("last_severity"),
+                "slack_ts": raw.get("last_slack_ts") or "",
+                "count": 1,
+            }
+        return NotifyState(
+            records=records,
+            max_records=self.max_records,
+            outbox=dict(raw.get("outbox") or {}),
+            channels=dict(raw.get("channels") or {}),
+        )
+
+    def _write(self, state: NotifyState) -> None:
+        last_sig, last = next(reversed(state.records.items()), (None, {}))
+        payload = {
+            "last_signature": last_sig,
+            "last_sent_at": last.get("last_sent_at"),
+            "last_severity": last.get("severity"),
+            "last_slack_ts": last.get("slack_ts") or "",
+            "signatures": state.records,
+            "outbox": {channel: queued for channel, queued in state.outbox.items() if queued},
+            "channels": state.channels,
+        }
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        # Compact encoding keeps rewrites cheap with thousands of signature records.
+        encoded = json.dumps(payload, separators=(",", ":"))
+        with open(tmp, "w", encoding="utf-8") as handle:
+            handle.write(encoded)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp, self.path)
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[NotifyState]:
+        """Locked read-modify-write; changes are persisted when the block exits cleanly."""
+        with self._flock():
+            state = self._read()
+            yield state
+            if state.dirty:
+                self._write(state)
+
+    def snapshot(self) -> NotifyState:
+        with self._flock():
+            return self._read()
@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from _n8n_api import N8NClient
+from _n8n_db import node_item_count
+from _n8n_tracker import run_data_of
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def stage_timings(run_data: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Per node: end offset from the first node start, and summed execution time (seconds)."""
+    spans = {}
+    for name, runs in run_data.items():
+        if not isinstance(runs, list) or not runs:
+            continue
+        starts = [int(r.get("startTime") or 0) for r in runs]
+        ends = [int(r.get("startTime") or 0) + int(r.get("executionTime") or 0) for r in runs]
+        spans[name] = (min(starts), max(ends), sum(int(r.get("executionTime") or 0) for r in runs))
+    if not spans:
+        return {}
+    origin = min(start for start, _, _ in spans.values())
+    return {
+        name: {"end": (end - origin) / 1000.0, "duration": busy / 1000.0}
+        for name, (_, end, busy) in spans.items()
+    }
+
+
+@dataclass
+class StageProfile:
+    """Median stage timings over recent successful executions."""
+
+    end_offset: Dict[str, float] = field(default_factory=dict)
+    duration: Dict[str, float] = field(default_factory=dict)
+    total: float = 0.0
+    samples: int = 0
+
+    @classmethod
+    def from_timings(cls, timings: List[Dict[str, Dict[str, float]]]) -> "StageProfile":
+        timings = [t for t in timings if t]
+        if not timings:
+            return cls()
+        names = {name for t in timings for name in t}
+        return cls(
+            end_offset={n: statistics.median(t[n]["end"] for t in timings if n in t) for n in names},
+            duration={n: statistics.median(t[n]["duration"] for t in timings if n in t) for n in names},
+            total=statistics.median(max(s["end"] for s in t.values()) for t in timings),
+            samples=len(timings),
+        )
+
+
+def _profile_cache_path() -> Path:
+    override = os.environ.get("STAGE_PROFILE_CACHE_PATH")
+    return Path(override) if override else ROOT / "logs" / "stage-profile-cache.json"
+
+
+def load_stage_profile(client: N8NClient, workflow_id: str, samples: int = 5) -> StageProfile:
+    """Build the profile from the last `samples` successes, fetching only executions not cached yet."""
+    path = _profile_cache_path()
+    cache: Dict[str, Any] = {}
+    if path.exists():
+        try:
+            cache = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            cache = {}
+    cached: Dict[str, Any] = cache.get(workflow_id, {})
+
+    recent = client.list_executions(workflow_id, limit=samples, status="success").get("data") or []
+    timings: Dict[str, Any] = {}
+    for execution in recent:
+        key = str(execution["id"])
+        if key not in cached:
+            full = client.get_execution(int(execution["id"]), include_data=True)
+            cached[key] = stage_timings(run_data_of(full))
+        timings[key] = cached[key]
+
+    cache[workflow_id] = timings
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(cache, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, path)
+    return StageProfile.from_timings(list(timings.values()))
+
+
+def cached_stage_profile(workflow_id: Optional[str] = None) -> StageProfile:
+    """Profile from the on-disk cache only (no API); without an id, the best-sampled workflow."""
+    path = _profile_cache_path()
+    try:
+        cache = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    except (OSError, json.JSONDecodeError):
+        cache = {}
+    if workflow_id is None and cache:
+        workflow_id = max(cache, key=lambda wid: len(cache[wid]))
+    return StageProfile.from_timings(list((cache.get(workflow_id) or {}).values()))
+
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = max(0, int(round(seconds)))
+    if seconds < 60:
+        return f"{seconds}s"
+    return f"{seconds // 60}m{seconds % 60:02d}s"
+
+
+class ProgressPrinter:
+    """`on_poll` callback that prints node completions, slow stages and an ETA.
+
+    Needs n8n to persist progress while running (EXECUTIONS_DATA_SAVE_ON_PROGRESS=true
+    or the workflow's saveExecutionProgress setting); otherwise all stages land at the end.
+    """
+
+    def __init__(
+        self,
+        profile: StageProfile,
+        out: Callable[[str], None] = print,
+        slow_factor: float = 1.5,
+        slow_min_seconds: float = 10.0,
+        slow_repeat_seconds: float = 15.0,
+    ) -> None:
+        self.profile = profile
+        self.out = out
+        self.slow_factor = slow_factor
+        self.slow_min_seconds = slow_min_seconds
+        self.slow_repeat_seconds = slow_repeat_seconds
+        self.started = time.monotonic()
+        self.last_completion = self.started
+        self.last_slow_notice = 0.0
+        self.done: Set[str] = set()
+
+    def _eta(self, now: float) -> str:
+        if not self.profile.samples:
+            return "unknown"
+        reached = max((self.profile.end_offset.get(n, 0.0) for n in self.done), default=0.0)
+        remaining = self.profile.total - reached - (now - self.last_completion)
+        return _fmt_duration(remaining) if remaining > 0 else "overdue"
+
+    def _next_stage(self) -> Optional[str]:
+        # Stages that usually finish before the furthest completed one did not run this time
+        # (e.g. the schedule trigger on a webhook run).
+        reached = max((self.profile.end_offset.get(n, 0.0) for n in self.done), default=-1.0)
+        pending = [n for n, end in self.profile.end_offset.items() if n not in self.done and end > reached]
+        return min(pending, key=lambda n: self.profile.end_offset[n]) if pending else None
+
+    def __call__(self, execution: Dict[str, Any]) -> None:
+        now = time.monotonic()
+        run_data = run_data_of(execution)
+        fresh = [n for n in run_data if n not in self.done and isinstance(run_data[n], list) and run_data[n]]
+        fresh.sort(key=lambda n: max(int(r.get("startTime") or 0) + int(r.get("executionTime") or 0) for r in run_data[n]))
+        if fresh:
+            self.last_completion = now
+        for name in fresh:
+            runs = run_data[name]
+            self.done.add(name)
+            seconds = sum(int(r.get("executionTime") or 0) for r in runs) / 1000.0
+            status = "ERROR" if any(r.get("error") for r in runs) else "done"
+            typical = self.profile.duration.get(name)
+            versus = f" (typical {typical:.1f}s)" if typical is not None and seconds > typical * self.slow_factor else ""
+            self.out(
+                f"[progress] {name} {status}, {node_item_count(runs[-1])} items, {seconds:.1f}s{versus}"
+                f" | elapsed {_fmt_duration(now - self.started)} ETA {self._eta(now)}"
+            )
+        if fresh:
+            return
+
+        if execution.get("status") not in (None, "new", "running", "waiting"):
+            return
+        stage = self._next_stage()
+        waited = now - self.last_completion
+        typical = self.profile.duration.get(stage, 0.0) if stage else 0.0
+        if (
+            stage
+            and waited > max(self.slow_min_seconds, typical * self.slow_factor)
+            and now - self.last_slow_notice >= self.slow_repeat_seconds
+        ):
+            self.last_slow_notice = now
+            self.out(
+                f"[progress] waiting on {stage}: {_fmt_duration(waited)} since last stage"
+                f" (typical {typical:.1f}s) | elapsed {_fmt_duration(now - self.started)} ETA {self._eta(now)}"
+            )
@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import contextlib
+import datetime as dt
+import http.client
+import json
+import os
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PACK_MARKER = "Today's X Daily Pack"
+
+
+def _ts_key(ts: str) -> Tuple[int, int]:
+    # Slack ts strings carry 16 significant digits; compare them exactly.
+    seconds, _, micros = str(ts).partition(".")
+    return int(seconds or 0), int((micros or "0").ljust(6, "0")[:6])
+
+
+def _header_text(msg: Dict[str, Any]) -> str:
+    for block in msg.get("blocks") or []:
+        if block.get("type") == "header":
+            return (block.get("text") or {}).get("text") or ""
+    return ""
+
+
+def is_pack_message(msg: Dict[str, Any]) -> bool:
+    return PACK_MARKER in (msg.get("text") or "") or PACK_MARKER in (msg.get("header") or _header_text(msg))
+
+
+def _cache_entry(msg: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "ts": msg["ts"],
+        "text": (msg.get("text") or "")[:300],
+        "header": (msg.get("header") or _header_text(msg))[:300],
+    }
+
+
+@dataclass
+class SlackClient:
+    """Slack Web API client with keep-alive, cursor pagination and Retry-After handling.
+
+    Channel history is cached locally (keyed by ts, persisted to `cache_path`)
+    together with the ts range the cache covers contiguously, so repeated
+    delivery checks only download messages newer than the cached head.
+    """
+
+    token: str
+    api_url: str = "https://slack.com"
+    cache_path: Optional[Path] = None
+    max_cached_messages: int = 2000
+    max_retries: int = 3
+    page_size: int = 200
+    max_pages: int = 10
+    _conn: Optional[http.client.HTTPConnection] = field(default=None, init=False, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, init=False, repr=False)
+    _cache: Optional[Dict[str, Dict[str, Any]]] = field(default=None, init=False, repr=False)
+
+    # --- transport ------------------------------------------------------
+
+    @contextlib.contextmanager
+    def _locked(self, timeout: float) -> Iterator[None]:
+        # Bounded so a caller with a latency budget never queues behind a slow request.
+        if not self._lock.acquire(timeout=max(0.0, timeout)):
+            raise TimeoutError("Slack client busy with another request")
+        try:
+            yield
+        finally:
+            self._lock.release()
+
+    def _connection(self, timeout: float) -> http.client.HTTPConnection:
+        if self._conn is None:
+            parsed = urllib.parse.urlsplit(self.api_url)
+            conn_cls = http.client.HTTPSConnection if parsed.scheme == "https" else http.client.HTTPConnection
+            self._conn = conn_cls(parsed.netloc, timeout=timeout)
+        self._conn.timeout = timeout
+        if self._conn.sock is not None:
+            self._conn.sock.settimeout(timeout)
+        return self._conn
+
+    def _reset(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+
+    def call(
+        self,
+        method: str,
+        params: Optional[Dict[str, str]] = None,
+        body: Optional[Dict[str, Any]] = None,
+        timeout: float = 30,
+    ) -> Dict[str, Any]:
+        deadline = time.monotonic() + timeout
+        headers = {"Authorization": f"Bearer {self.token}", "Connection": "keep-alive"}
+        path = f"/api/{method}"
+        if params:
+            path += "?" + urllib.parse.urlencode(params)
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode("utf-8")
+            headers["Content-Type"] = "application/json; charset=utf-8"
+
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"Slack API {method} exceeded {timeout:.1f}s")
+            with self._locked(remaining):
+                try:
+                    conn = self._connection(remaining)
+                    conn.request("POST" if payload is not None else "GET", path, body=payload, headers=headers)
+                    resp = conn.getresponse()
+                    raw = resp.read()
+                    status = resp.status
+                    retry_after = resp.getheader("Retry-After")
+                    if (resp.getheader("Connection") or "").lower() == "close":
+                        self._reset()
+                except (http.client.HTTPException, OSError):
+                    # Stale keep-alive sockets surface here; reconnect once per attempt.
+                    self._reset()
+                    attempt += 1
+                    if attempt > self.max_retries:
+                        raise
+                    continue
+
+            if status == 429 and attempt < self.max_retries:
+                attempt += 1
+                wait = float(retry_after or 1)
+                if wait >= deadline - time.monotonic():
+                    raise TimeoutError(f"Slack API {method} rate limited (Retry-After={wait:.0f}s)")
+                time.sleep(wait)
+                continue
+
+            data = json.loads(raw.decode("utf-8") or "{}")
+            if status >= 400 or not data.get("ok"):
+                raise RuntimeError(f"Slack API {method} failed: {data.get('error') or status}")
+            return data
+
+    def post_message(self, channel: str, text: str, timeout: float = 30) -> str:
+        data = self.call("chat.postMessage", body={"channel": channel, "text": text}, timeout=timeout)
+        return str(data.get("ts"))
+
+    # --- history cache --------------------------------------------------
+
+    def _load_cache(self) -> Dict[str, Dict[str, Any]]:
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path and self.cache_path.exists():
+                try:
+                    self._cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+                except (OSError, json.JSONDecodeError):
+                    self._cache = {}
+        return self._cache
+
+    def _save_cache(self) -> None:
+        if not self.cache_path or self._cache is None:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f"{self.cache_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._cache, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def _channel(self, channel: str) -> Dict[str, Any]:
+        cache = self._load_cache()
+        return cache.setdefault(channel, {"messages": {}, "oldest": None, "newest": None})
+
+    def _prune(self, entry: Dict[str, Any]) -> None:
+        messages = entry["messages"]
+        if len(messages) <= self.max_cached_messages:
+            return
+        ordered = sorted(messages, key=_ts_key)
+        for ts in ordered[: len(ordered) - self.max_cached_messages]:
+            del messages[ts]
+        oldest_kept = ordered[len(ordered) - self.max_cached_messages]
+        if entry["oldest"] is None or _ts_key(entry["oldest"]) < _ts_key(oldest_kept):
+            entry["oldest"] = oldest_kept
+
+    def sync(self, channel: str, min_messages: int = 50, timeout: float = 30) -> Dict[str, Any]:
+        """Download channel messages newer than the cached head (or the latest page when cold)."""
+        deadline = time.monotonic() + timeout
+        with self._locked(timeout):
+            entry = self._channel(channel)
+            params = {"channel": channel, "limit": str(self.page_size)}
+            if entry["newest"]:
+                params["oldest"] = entry["newest"]
+            fetched: List[Dict[str, Any]] = []
+            cursor = None
+            has_more = False
+            for _ in range(self.max_pages):
+                if cursor:
+                    params["cursor"] = cursor
+                data = self.call("conversations.history", params, timeout=max(0.1, deadline - time.monotonic()))
+                fetched.extend(m for m in data.get("messages", []) if m.get("ts"))
+                has_more = bool(data.get("has_more"))
+                cursor = (data.get("response_metadata") or {}).get("next_cursor")
+                if not cursor or not has_more:
+                    break
+                if not entry["newest"] and len(fetched) >= min_messages:
+                    break
+
+            for msg in fetched:
+                entry["messages"][msg["ts"]] = _cache_entry(msg)
+            if fetched:
+                oldest = min((m["ts"] for m in fetched), key=_ts_key)
+                complete = not (cursor and has_more)
+                if not entry["newest"]:
+                    entry["oldest"] = "0.000000" if complete else oldest
+                elif not complete:
+                    # More new messages than max_pages: contiguous coverage restarts here.
+                    entry["oldest"] = oldest
+                entry["newest"] = max((m["ts"] for m in fetched), key=_ts_key)
+            elif not entry["newest"]:
+                entry["oldest"] = entry["newest"] = "0.000000"
+            self._prune(entry)
+            self._save_cache()
+            return entry
+
+    def recent_messages(self, channel: str, limit: int = 50, timeout: float = 30) -> List[Dict[str, str]]:
+        entry = self.sync(channel, min_messages=limit, timeout=timeout)
+        ordered = sorted(entry["messages"].values(), key=lambda m: _ts_key(m["ts"]), reverse=True)
+        return ordered[:limit]
+
+    def find_pack_messages(self, channel: str, limit: int = 50, timeout: float = 30) -> List[Tuple[str, dt.datetime]]:
+        found = []
+        for msg in self.recent_messages(channel, limit=limit, timeout=timeout):
+            if is_pack_message(msg):
+                found.append((msg["ts"], dt.datetime.fromtimestamp(float(msg["ts"]), tz=dt.timezone.utc)))
+        return found
+
+    def message_exists(self, channel: str, message_ts: str, timeout: float = 30) -> bool:
+        deadline = time.monotonic() + timeout
+        with self._locked(timeout):
+            entry = self._channel(channel)
+            if message_ts in entry["messages"]:
+                return True
+            key = _ts_key(message_ts)
+            if entry["newest"] and key > _ts_key(entry["newest"]):
+                entry = self.sync(channel, timeout=max(0.1, deadline - time.monotonic()))
+                if message_ts in entry["messages"]:
+                    return True
+            if entry["oldest"] and _ts_key(entry["oldest"]) <= key <= _ts_key(entry["newest"]):
+                return False
+
+            # Outside the cached range: targeted lookup around the ts.
+            oldest = str(max(0.0, float(message_ts) - 90))
+            data = self.call(
+                "conversations.history",
+                {
+                    "channel": channel,
+                    "latest": message_ts,
+                    "oldest": oldest,
+                    "inclusive": "true",
+                    "limit": "5",
+                },
+                timeout=max(0.1, deadline - time.monotonic()),
+            )
+            for msg in data.get("messages", []):
+                if msg.get("ts"):
+                    entry["messages"][msg["ts"]] = _cache_entry(msg)
+            self._prune(entry)
+            self._save_cache()
+            return message_ts in entry["messages"]
+
+
+def build_slack_client() -> SlackClient:
+    token = os.environ.get("SLACK_BOT_TOKEN")
+    if not token:
+        raise RuntimeError("SLACK_BOT_TOKEN is not set")
+    override = os.environ.get("SLACK_HISTORY_CACHE_PATH")
+    cache_path = Path(override) if override else ROOT / "logs" / "slack-history-cache.json"
+    if (os.environ.get("SLACK_HISTORY_CACHE", "true").strip().lower()) in {"0", "false", "no", "off"}:
+        cache_path = None
+    api_url = os.environ.get("SLACK_API_URL", "https://slack.com").rstrip("/")
+    return SlackClient(token=token, api_url=api_url, cache_path=cache_path)
@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Binary embedding store shared with scripts/lib/vector-store.js (the Semantic Dedupe node).
+#
+#   <name>.vec      32-byte header, then fixed-width rows, append-only between compactions
+#                   header: b"XVEC", u16 version, u16 dtype (1 float16, 2 int8), u32 dims, u32 generation
+#                   float16 row: dims x <f2;  int8 row: <f4 scale, then dims x i1 (value = q * scale)
+#   <name>.vec.idx  JSON index of the live rows:
+#                   {"version", "generation", "dtype", "dims", "rows", "entries": [[row, id, timestamp, title], ...]}
+#                   plus an optional free-form "meta" object, kept as is (the node's embedding cache counters)
+#
+# id is the node's URL hash (emb_...). `rows` is how many rows of the .vec file the index
+# covers; anything past it is a torn append and is cut off by the next write. A rewrite
+# (compaction, dims or dtype change) bumps the generation, and an index whose generation
+# does not match the .vec header is ignored rather than trusted.
+MAGIC = b"XVEC"
+VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+HEADER_BYTES = 32
+DTYPE_CODES = {"float16": 1, "int8": 2}
+# Rewrite the file once dead rows outnumber live ones (and are worth the I/O).
+COMPACT_MIN_DEAD = 64
+
+
+def is_binary_store(path: Path) -> bool:
+    return path.suffix == ".vec"
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(f"{path.name}.idx")
+
+
+def default_dtype() -> str:
+    dtype = os.environ.get("SEMANTIC_DEDUPE_STORE_DTYPE") or "float16"
+    if dtype not in DTYPE_CODES:
+        raise ValueError(f"SEMANTIC_DEDUPE_STORE_DTYPE must be one of {', '.join(DTYPE_CODES)}")
+    return dtype
+
+
+def row_dtype(dtype: str, dims: int) -> np.dtype:
+    if dtype == "int8":
+        return np.dtype([("scale", "<f4"), ("q", "i1", (dims,))])
+    return np.dtype(("<f2", (dims,)))
+
+
+def encode_rows(vectors: np.ndarray, dtype: str) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float16":
+        return vectors.astype("<f2")
+    rows = np.zeros(len(vectors), dtype=row_dtype(dtype, vectors.shape[1]))
+    scale = np.abs(vectors).max(axis=1, initial=0.0) / 127
+    rows["scale"] = scale
+    rows["q"] = np.rint(vectors / np.where(scale > 0, scale, 1)[:, None])
+    return rows
+
+
+def decode_rows(rows: np.ndarray, dtype: str) -> np.ndarray:
+    if dtype == "float16":
+        return rows.astype(np.float32)
+    return rows["q"].astype(np.float32) * rows["scale"].astype(np.float32)[:, None]
+
+
+@dataclass
+class StoreEntry:
+    row: int
+    id: str
+    timestamp: int
+    title: str
+
+
+class VectorStore:
+    """One .vec/.vec.idx pair. read() memory-maps the rows; write() appends new rows and compacts."""
+
+    def __init__(self, path: Path, dtype: Optional[str] = None) -> None:
+        self.path = Path(path)
+        self.index_path = index_path(self.path)
+        self.dtype = dtype or default_dtype()
+        if self.dtype not in DTYPE_CODES:
+            raise ValueError(f"unknown store dtype {self.dtype!r} ({', '.join(DTYPE_CODES)})")
+        # What is on disk, as far as the index says: set by read() and write().
+        self.generation = 0
+        self.dims: Optional[int] = None
+        self.disk_dtype: Optional[str] = None
+        self.rows = 0
+        self.meta: Dict[str, Any] = {}
+        self._row_of: Dict[Tuple[str, int], int] = {}
+
+    def _read_header(self) -> Optional[Tuple[str, int, int]]:
+        with self.path.open("rb") as fh:
+            raw = fh.read(HEADER_BYTES)
+        if len(raw) < HEADER_BYTES:
+            return None
+        magic, version, code, dims, generation = HEADER.unpack_from(raw)
+        names = {v: k for k, v in DTYPE_CODES.items()}
+        if magic != MAGIC or version != VERSION or code not in names:
+            return None
+        return names[code], dims, generation
+
+    def read(self) -> Tuple[np.ndarray, List[StoreEntry]]:
+        """Live vectors as float32 (one row per entry, in index order) and their entries."""
+        empty = np.zeros((0, 0), dtype=np.float32)
+        try:
+            index = json.loads(self.index_path.read_text(encoding="utf-8"))
+            header = self._read_header()
+        except FileNotFoundError:
+            return empty, []
+        if header is None:
+            raise ValueError(f"{self.path}: not an XVEC v{VERSION} embedding store")
+        dtype, dims, generation = header
+        self.generation = max(generation, int(index.get("generation") or 0))
+        rows = int(index.get("rows") or 0)
+        width = row_dtype(dtype, dims).itemsize
+        if (
+            index.get("generation") != generation
+            or index.get("dims") != dims
+            or index.get("dtype") != dtype
+            or self.path.stat().st_size < HEADER_BYTES + rows * width
+        ):
+            # Crashed between rewriting the .vec and its index: start over rather than mis-map rows.
+            return empty, []
+        self.dims, self.disk_dtype, self.rows = dims, dtype, rows
+        self.meta = index.get("meta") or {}
+
+        entries = [StoreEntry(int(r), str(i), int(t), str(title)) for r, i, t, title in index.get("entries") or [] if 0 <= int(r) < rows]
+        self._row_of = {(e.id, e.timestamp): e.row for e in entries}
+        if not entries:
+            return np.zeros((0, dims), dtype=np.float32), []
+        mapped = np.memmap(self.path, dtype=row_dtype(dtype, dims), mode="r", offset=HEADER_BYTES, shape=(rows,))
+        vectors = decode_rows(mapped[np.fromiter((e.row for e in entries), dtype=np.int64, count=len(entries))], dtype)
+        del mapped
+        return vectors, entries
+
+    def write(
+        self,
+        ids: Sequence[str],
+        titles: Sequence[str],
+        timestamps: Sequence[int],
+        vectors: np.ndarray,
+        compact: bool = False,
+    ) -> Dict[str, Any]:
+        """Persist exactly these live rows: unchanged (id, timestamp) rows stay where they are, the rest are appended."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        dims = vectors.shape[1] if vectors.ndim == 2 and len(vectors) else self.dims or 0
+        keys = [(str(i), int(t)) for i, t in zip(ids, timestamps)]
+        fresh = [n for n, key in enumerate(keys) if key not in self._row_of]
+        dead = self.rows + len(fresh) - len(keys)
+        rewrite = (
+            compact
+            or self.dims != dims
+            or self.disk_dtype != self.dtype
+            or not self.path.exists()
+            or (dead > len(keys) and dead >= COMPACT_MIN_DEAD)
+        )
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if rewrite:
+            self.generation += 1
+            rows = list(range(len(keys)))
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            with tmp.open("wb") as fh:
+                fh.write(HEADER.pack(MAGIC, VERSION, DTYPE_CODES[self.dtype], dims, self.generation).ljust(HEADER_BYTES, b"\0"))
+                fh.write(encode_rows(vectors, self.dtype).tobytes())
+            os.replace(tmp, self.path)
+            self.rows, self.dims, self.disk_dtype = len(keys), dims, self.dtype
+            appended = len(keys)
+        else:
+            width = row_dtype(self.dtype, dims).itemsize
+            rows = [self._row_of.get(key, -1) for key in keys]
+            for offset, n in enumerate(fresh):
+                rows[n] = self.rows + offset
+            with self.path.open("r+b") as fh:
+                # Anything past the indexed rows is an append whose index never landed.
+                fh.truncate(HEADER_BYTES + self.rows * width)
+                fh.seek(0, os.SEEK_END)
+                if fresh:
+                    fh.write(encode_rows(vectors[fresh], self.dtype).tobytes())
+            self.rows += len(fresh)
+            appended = len(fresh)
+
+        self._row_of = dict(zip(keys, rows))
+        index = {
+            "version": VERSION,
+            "generation": self.generation,
+            "dtype": self.dtype,
+            "dims": dims,
+            "rows": self.rows,
+            "entries": [[row, key[0], key[1], str(title)] for row, key, title in zip(rows, keys, titles)],
+        }
+        if self.meta:
+            index["meta"] = self.meta
+        tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.index_path)
+        return {"appended": appended, "compacted": rewrite, "rows": self.rows, "live": len(keys)}
+
+    def size_bytes(self) -> int:
+        return sum(p.stat().st_size for p in (self.path, self.index_path) if p.exists())
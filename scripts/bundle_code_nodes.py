@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Build the Daily Pack code nodes the way deploy ships them and report the savings.
+
+Each node source is bundled (`// @include` helpers from scripts/lib inlined)
+and minified (comments, indentation and blank lines dropped; line breaks
+kept so runtime `[line N]` errors map back exactly). The report compares the
+bundled-but-unminified code, i.e. what used to be pushed verbatim, with the
+minified build: jsCode bytes, and the median time V8 needs to compile it the
+way the task runner does on every execution (scripts/code-node-compile-bench.mjs).
+
+Run:
+  python3 scripts/bundle_code_nodes.py
+  python3 scripts/bundle_code_nodes.py --out /tmp/code-nodes --no-timing
+  python3 scripts/bundle_code_nodes.py --lookup "LLM Rank:120"
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List
+
+from _bundle import Bundle, BundleError, build_code_nodes, load_source_maps, original_line
+from deploy_daily_pack import CODE_NODE_SOURCES, ROOT
+
+
+BENCH = ROOT / "scripts" / "code-node-compile-bench.mjs"
+
+
+def compile_times(variants: Dict[str, Dict[str, str]], iterations: int) -> Dict[str, Dict[str, float]]:
+    proc = subprocess.run(
+        ["node", str(BENCH)],
+        input=json.dumps({"iterations": iterations, "nodes": variants}),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    if proc.returncode != 0:
+        raise SystemExit(f"compile bench failed: {proc.stderr.strip()[-500:]}")
+    return json.loads(proc.stdout)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def _write_out(out_dir: Path, bundles: Dict[str, Bundle]) -> None:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    for name, built in bundles.items():
+        target = out_dir / f"{_slug(name)}.js"
+        target.write_text(built.code + f"\n//# sourceMappingURL={target.name}.map\n", encoding="utf-8")
+        (out_dir / f"{target.name}.map").write_text(json.dumps(built.source_map), encoding="utf-8")
+
+
+def _lookup(spec: str, bundles: Dict[str, Bundle]) -> int:
+    node, _, line = spec.rpartition(":")
+    if not node or not line.isdigit():
+        raise SystemExit("--lookup expects NODE:LINE")
+    recorded = load_source_maps().get(node)
+    source_map = recorded or (bundles[node].source_map if node in bundles else None)
+    if not source_map:
+        raise SystemExit(f"No source map for node {node!r}")
+    found = original_line(source_map, int(line))
+    if not found:
+        print(f"[bundle] {node}:{line} is past the end of the generated code")
+        return 1
+    origin = "deployed" if recorded else "current build"
+    print(f"[bundle] {node}:{line} -> {found[0]}:{found[1]} ({origin} map)")
+    return 0
+
+
+def report(bundles: Dict[str, Bundle], plain: Dict[str, Bundle], timings: Dict[str, Dict[str, float]]) -> List[Dict[str, Any]]:
+    rows = []
+    for name, built in bundles.items():
+        row: Dict[str, Any] = {
+            "node": name,
+            "verbatim_bytes": plain[name].size,
+            "minified_bytes": built.size,
+            "saved_bytes": plain[name].size - built.size,
+        }
+        if name in timings:
+            row["compile_ms_verbatim"] = timings[name]["verbatim"]
+            row["compile_ms_minified"] = timings[name]["minified"]
+        rows.append(row)
+    return rows
+
+
+def _print_report(rows: List[Dict[str, Any]]) -> None:
+    timed = all("compile_ms_verbatim" in r for r in rows)
+    header = f"{'node':<20} {'verbatim':>9} {'minified':>9} {'saved':>6}"
+    if timed:
+        header += f" {'compile':>9} {'compile':>9}"
+    print(header)
+    for r in rows:
+        line = f"{r['node']:<20} {r['verbatim_bytes']:>9} {r['minified_bytes']:>9} {r['saved_bytes'] / r['verbatim_bytes']:>6.0%}"
+        if timed:
+            line += f" {r['compile_ms_verbatim']:>7.3f}ms {r['compile_ms_minified']:>7.3f}ms"
+        print(line)
+    before = sum(r["verbatim_bytes"] for r in rows)
+    after = sum(r["minified_bytes"] for r in rows)
+    total = f"{'total':<20} {before:>9} {after:>9} {(before - after) / before:>6.0%}"
+    if timed:
+        ms_before = sum(r["compile_ms_verbatim"] for r in rows)
+        ms_after = sum(r["compile_ms_minified"] for r in rows)
+        total += f" {ms_before:>7.3f}ms {ms_after:>7.3f}ms"
+        print(total)
+        print(f"[bundle] per execution: {before - after} fewer jsCode bytes, compile {ms_before - ms_after:+.3f}ms saved")
+    else:
+        print(total)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bundle/minify code nodes and report byte and compile-time savings")
+    parser.add_argument("--node", action="append", default=[], help="Node to build (repeatable; default: all)")
+    parser.add_argument("--out", default=None, help="Write <node>.js and <node>.js.map into this directory")
+    parser.add_argument("--iterations", type=int, default=30, help="Compile timing samples per variant")
+    parser.add_argument("--no-timing", action="store_true", help="Skip the node compile benchmark")
+    parser.add_argument("--lookup", default=None, metavar="NODE:LINE", help="Map a jsCode line back to its source")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    sources = {name: CODE_NODE_SOURCES[name] for name in args.node} if args.node else dict(CODE_NODE_SOURCES)
+    try:
+        bundles = build_code_nodes(sources, minify=True)
+        plain = build_code_nodes(sources, minify=False)
+    except BundleError as exc:
+        raise SystemExit(f"Bundling failed: {exc}")
+
+    if args.lookup:
+        return _lookup(args.lookup, bundles)
+    if args.out:
+        _write_out(Path(args.out), bundles)
+
+    timings: Dict[str, Dict[str, float]] = {}
+    if not args.no_timing:
+        variants = {name: {"verbatim": plain[name].code, "minified": bundles[name].code} for name in bundles}
+        timings = compile_times(variants, args.iterations)
+
+    rows = report(bundles, plain, timings)
+    if args.json:
+        print(json.dumps({"nodes": rows}, sort_keys=True))
+    else:
+        _print_report(rows)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
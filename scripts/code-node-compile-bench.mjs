@@ -0,0 +1,49 @@
+#!/usr/bin/env node
+/**
+ * Compile-time benchmark for n8n Code node sources.
+ *
+ * Reads { iterations, nodes: { name: { variant: code } } } as JSON on stdin and
+ * compiles every variant the way the task runner does on each execution: the
+ * code wrapped in an async function and handed to `vm.Script`. A unique
+ * trailing comment per iteration keeps V8's in-isolate compilation cache from
+ * answering repeat runs.
+ *
+ * Writes { name: { variant: medianMs } } to stdout.
+ */
+
+import vm from "vm";
+import { performance } from "perf_hooks";
+
+const readStdin = async () => {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return Buffer.concat(chunks).toString("utf8");
+};
+
+const median = (values) => {
+  const sorted = [...values].sort((a, b) => a - b);
+  const mid = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2;
+};
+
+const job = JSON.parse(await readStdin());
+const iterations = Math.max(1, job.iterations || 20);
+const out = {};
+let salt = 0;
+
+for (const [name, variants] of Object.entries(job.nodes || {})) {
+  out[name] = {};
+  const samples = Object.fromEntries(Object.keys(variants).map((variant) => [variant, []]));
+  // Interleave variants so drift in machine load hits both alike.
+  for (let i = 0; i < iterations; i++) {
+    for (const [variant, code] of Object.entries(variants)) {
+      const source = `(async function () {\n${code}\n})\n//${salt++}`;
+      const started = performance.now();
+      new vm.Script(source, { filename: `${name}.js` });
+      samples[variant].push(performance.now() - started);
+    }
+  }
+  for (const [variant, values] of Object.entries(samples)) out[name][variant] = median(values);
+}
+
+process.stdout.write(JSON.stringify(out));
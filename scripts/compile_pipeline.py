@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Compile the declarative pipeline spec (config/pipeline.json) into n8n workflow JSON.
+
+Spec elements:
+  - node:     {"name", "id", "source": "scripts/x.js"} (code node, built like deploy:
+              helpers inlined, minified unless CODE_NODE_MINIFY=false), or
+              {"name", "id", "type", "typeVersion", "parameters"} for any other node
+  - chain:    a list of elements, connected in order
+  - parallel: {"parallel": {"name", "id", "strategy"}, "branches": [element, ...]}
+              strategy "merge"  -> branches fan into a Merge node (n8n runs them one after another)
+              strategy "inline" -> one code node running all (code-node) branches concurrently
+  - fanout:   {"fanout": [element, ...]} as the last stage: every element gets the same input
+
+Besides writing the workflow, prints the static critical path: per-node cost
+comes from "estimateSeconds" in the spec, else the median stage duration of
+recent runs (logs/stage-profile-cache.json, filled by `trigger --live`).
+
+Run:
+  python3 scripts/compile_pipeline.py                       # write workflows/daily-pack-v5-fixed.json
+  python3 scripts/compile_pipeline.py --report-only --json
+  python3 scripts/compile_pipeline.py --check workflows/daily-pack-v5-fixed.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from _bundle import BundleError, bundle
+from _progress import cached_stage_profile
+
+
+ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_SPEC = ROOT / "config" / "pipeline.json"
+
+X_STEP = 220
+Y_STEP = 140
+BASE_Y = 300
+
+TRIGGER_NODES = {
+    "webhook": ("n8n-nodes-base.webhook", 2),
+    "manual": ("n8n-nodes-base.manualTrigger", 1),
+    "schedule": ("n8n-nodes-base.scheduleTrigger", 1.1),
+}
+
+Port = Tuple[str, int]
+
+
+class SpecError(ValueError):
+    pass
+
+
+@dataclass
+class Compiled:
+    nodes: List[Dict[str, Any]] = field(default_factory=list)
+    connections: Dict[str, Dict[str, List[List[Dict[str, Any]]]]] = field(default_factory=dict)
+    # Inline group name -> branch names it runs concurrently.
+    inline_groups: Dict[str, List[str]] = field(default_factory=dict)
+    # Merge group name -> its flattened leaf chains (for "run these inline" savings).
+    merge_groups: Dict[str, List[List[str]]] = field(default_factory=dict)
+    estimates: Dict[str, float] = field(default_factory=dict)
+
+    def add(self, node: Dict[str, Any]) -> str:
+        if any(n["name"] == node["name"] for n in self.nodes):
+            raise SpecError(f"duplicate node name: {node['name']}")
+        self.nodes.append(node)
+        return node["name"]
+
+    def connect(self, src: Port, dst: str, dst_index: int = 0) -> None:
+        name, output = src
+        outputs = self.connections.setdefault(name, {"main": []})["main"]
+        while len(outputs) <= output:
+            outputs.append([])
+        outputs[output].append({"node": dst, "type": "main", "index": dst_index})
+
+
+class _Compiler:
+    def __init__(self, spec: Dict[str, Any], root: Path) -> None:
+        self.spec = spec
+        self.root = root
+        self.out = Compiled()
+
+    def _read(self, rel: str) -> str:
+        path = self.root / rel
+        if not path.exists():
+            raise SpecError(f"missing source file: {rel}")
+        try:
+            return bundle(path).code
+        except BundleError as exc:
+            raise SpecError(f"cannot bundle {rel}: {exc}") from exc
+
+    def _node(self, el: Dict[str, Any], x: int, y: int) -> Dict[str, Any]:
+        if "source" in el:
+            node = {
+                "parameters": {"jsCode": self._read(el["source"])},
+                "name": el["name"],
+                "type": "n8n-nodes-base.code",
+                "typeVersion": 2,
+            }
+        elif "type" in el:
+            node = {
+                "parameters": el.get("parameters", {}),
+                "name": el["name"],
+                "type": el["type"],
+                "typeVersion": el.get("typeVersion", 1),
+            }
+        else:
+            raise SpecError(f"node {el.get('name')!r} needs `source` or `type`")
+        node["position"] = el.get("position", [x, y])
+        node["id"] = el.get("id") or el["name"].lower().replace(" ", "-")
+        if "estimateSeconds" in el:
+            self.out.estimates[el["name"]] = float(el["estimateSeconds"])
+        return node
+
+    def _width(self, el: Any) -> int:
+        """Vertical lanes an element occupies (for layout)."""
+        if isinstance(el, list):
+            return max((self._width(e) for e in el), default=1)
+        if "parallel" in el:
+            if el["parallel"].get("strategy") == "inline":
+                return 1
+            return sum(self._width(b) for b in el["branches"])
+        if "fanout" in el:
+            return sum(self._width(b) for b in el["fanout"])
+        return 1
+
+    def _leaves(self, el: Any) -> List[Dict[str, Any]]:
+        if isinstance(el, list):
+            raise SpecError("inline parallel branches must be single code nodes, not chains")
+        if "parallel" in el:
+            return [leaf for b in el["branches"] for leaf in self._leaves(b)]
+        if "source" not in el:
+            raise SpecError(f"inline branch {el.get('name')!r} must be a code node (`source`)")
+        return [el]
+
+    def _leaf_chains(self, el: Any) -> List[List[str]]:
+        """Independent chains under `el` once every nested group is flattened."""
+        if isinstance(el, list):
+            return [[n for e in el for chain in self._leaf_chains(e) for n in chain]]
+        if "parallel" in el:
+            return [chain for b in el["branches"] for chain in self._leaf_chains(b)]
+        return [[el["name"]]]
+
+    def emit(self, el: Any, inputs: List[Port], col: int, y: int) -> Tuple[List[Port], int]:
+        """Emit `el` fed by `inputs`; returns (output ports, next column)."""
+        if isinstance(el, list):
+            for item in el:
+                inputs, col = self.emit(item, inputs, col, y)
+            return inputs, col
+
+        if "fanout" in el:
+            lanes = [self._width(b) for b in el["fanout"]]
+            top = y - (sum(lanes) - 1) * Y_STEP // 2
+            end = col
+            for branch, width in zip(el["fanout"], lanes):
+                _, branch_end = self.emit(branch, inputs, col, top + (width - 1) * Y_STEP // 2)
+                end = max(end, branch_end)
+                top += width * Y_STEP
+            return [], end
+
+        if "parallel" in el:
+            group = el["parallel"]
+            strategy = group.get("strategy", "merge")
+            if strategy == "inline":
+                return self._emit_inline(el, inputs, col, y)
+            if strategy != "merge":
+                raise SpecError(f"unknown parallel strategy {strategy!r} for {group['name']}")
+            branches = el["branches"]
+            if len(branches) < 2:
+                raise SpecError(f"parallel group {group['name']} needs at least two branches")
+            lanes = [self._width(b) for b in branches]
+            top = y - (sum(lanes) - 1) * Y_STEP // 2
+            ports: List[Port] = []
+            end = col
+            for branch, width in zip(branches, lanes):
+                out, branch_end = self.emit(branch, inputs, col, top + (width - 1) * Y_STEP // 2)
+                if len(out) != 1:
+                    raise SpecError(f"branch of {group['name']} must end in a single node")
+                ports.append(out[0])
+                end = max(end, branch_end)
+                top += width * Y_STEP
+            params: Dict[str, Any] = {"mode": group.get("mode", "append")}
+            # Merge v2.1 takes exactly two inputs; v3 takes numberInputs.
+            version = 2.1 if len(ports) == 2 else 3
+            if len(ports) > 2:
+                params["numberInputs"] = len(ports)
+            name = self.out.add(
+                {
+                    "parameters": params,
+                    "name": group["name"],
+                    "type": "n8n-nodes-base.merge",
+                    "typeVersion": version,
+                    "position": group.get("position", [end * X_STEP, y]),
+                    "id": group.get("id") or group["name"].lower().replace(" ", "-"),
+                }
+            )
+            for index, port in enumerate(ports):
+                self.out.connect(port, name, index)
+            self.out.merge_groups[name] = self._leaf_chains(el)
+            return [(name, 0)], end + 1
+
+        name = self.out.add(self._node(el, col * X_STEP, y))
+        for port in inputs:
+            self.out.connect(port, name)
+        return [(name, 0)], col + 1
+
+    def _emit_inline(self, el: Dict[str, Any], inputs: List[Port], col: int, y: int) -> Tuple[List[Port], int]:
+        group = el["parallel"]
+        leaves = self._leaves(el)
+        tolerate = bool(group.get("tolerateFailures", False))
+        parts = [
+            "// Generated by scripts/compile_pipeline.py from config/pipeline.json - edit the branch sources, not this node.",
+            f"// Runs {len(leaves)} branches concurrently: {', '.join(l['name'] for l in leaves)}.",
+            "const __branches = [",
+        ]
+        for leaf in leaves:
+            parts.append(f"  [{json.dumps(leaf['name'])}, async function () {{")
+            parts.append(self._read(leaf["source"]).rstrip())
+            parts.append("  }],")
+        parts.append("];")
+        parts.append(
+            """const __asItems = (result) => (Array.isArray(result) ? result : result ? [result] : [])
+  .map((item) => (item && typeof item === 'object' && 'json' in item ? item : { json: item }));
+const __started = Date.now();
+const __settled = await Promise.allSettled(__branches.map(([, run]) => run.call(this)));
+const __out = [];
+const __failed = [];
+__settled.forEach((result, i) => {
+  const name = __branches[i][0];
+  if (result.status === 'fulfilled') __out.push(...__asItems(result.value));
+  else __failed.push(`${name}: ${result.reason && result.reason.message ? result.reason.message : result.reason}`);
+});
+console.log(`""" + group["name"] + """: ${__branches.length} branches in ${Date.now() - __started}ms, ${__out.length} items`);"""
+        )
+        if tolerate:
+            parts.append("if (__failed.length === __branches.length) throw new Error(`All branches failed: ${__failed.join('; ')}`);")
+            parts.append("if (__failed.length) console.log(`Branch failures: ${__failed.join('; ')}`);")
+        else:
+            parts.append("if (__failed.length) throw new Error(`Branch failed: ${__failed.join('; ')}`);")
+        parts.append("return __out;")
+        node = {
+            "parameters": {"jsCode": "\n".join(parts) + "\n"},
+            "name": group["name"],
+            "type": "n8n-nodes-base.code",
+            "typeVersion": 2,
+            "position": group.get("position", [col * X_STEP, y]),
+            "id": group.get("id") or group["name"].lower().replace(" ", "-"),
+        }
+        name = self.out.add(node)
+        for port in inputs:
+            self.out.connect(port, name)
+        self.out.inline_groups[name] = [leaf["name"] for leaf in leaves]
+        for leaf in leaves:
+            if "estimateSeconds" in leaf:
+                self.out.estimates[leaf["name"]] = float(leaf["estimateSeconds"])
+        return [(name, 0)], col + 1
+
+    def compile(self) -> Dict[str, Any]:
+        triggers = self.spec.get("triggers") or []
+        if not triggers:
+            raise SpecError("spec needs at least one trigger")
+        ports: List[Port] = []
+        top = BASE_Y - (len(triggers) - 1) * Y_STEP // 2
+        for index, trig in enumerate(triggers):
+            kind = trig.get("kind")
+            if kind not in TRIGGER_NODES:
+                raise SpecError(f"unknown trigger kind {kind!r}")
+            node_type, version = TRIGGER_NODES[kind]
+            params: Dict[str, Any] = {}
+            if kind == "schedule":
+                params = {"rule": {"interval": [{"field": "cronExpression", "expression": trig["cron"]}]}}
+            elif kind == "webhook":
+                params = {
+                    "path": trig["path"],
+                    "authentication": trig.get("authentication", "headerAuth"),
+                    "responseMode": trig.get("responseMode", "onReceived"),
+                    "options": {},
+                }
+            node: Dict[str, Any] = {
+                "parameters": params,
+                "name": trig["name"],
+                "type": node_type,
+                "typeVersion": version,
+                "position": trig.get("position", [0, top + index * Y_STEP]),
+                "id": trig.get("id") or trig["name"].lower().replace(" ", "-"),
+            }
+            if kind == "webhook":
+                node["webhookId"] = trig.get("webhookId", trig["path"])
+            if trig.get("credentials"):
+                node["credentials"] = trig["credentials"]
+            ports.append((self.out.add(node), 0))
+            self.out.estimates[trig["name"]] = 0.0
+
+        stages = self.spec.get("stages") or []
+        for index, stage in enumerate(stages):
+            if isinstance(stage, dict) and "fanout" in stage and index != len(stages) - 1:
+                raise SpecError("fanout must be the last stage")
+        self.emit(stages, ports, 1, BASE_Y)
+        return {
+            "name": self.spec["name"],
+            "nodes": self.out.nodes,
+            "connections": self.out.connections,
+            "settings": self.spec.get("settings", {"executionOrder": "v1"}),
+        }
+
+
+def compile_spec(spec: Dict[str, Any], root: Path = ROOT) -> Tuple[Dict[str, Any], Compiled]:
+    compiler = _Compiler(spec, root)
+    return compiler.compile(), compiler.out
+
+
+def _edges(workflow: Dict[str, Any]) -> List[Tuple[str, str]]:
+    return [
+        (src, target["node"])
+        for src, outputs in workflow["connections"].items()
+        for targets in outputs.get("main", [])
+        for target in targets
+    ]
+
+
+def critical_path(workflow: Dict[str, Any], compiled: Compiled, profile_duration: Dict[str, float]) -> Dict[str, Any]:
+    """Longest path through the DAG plus the serial estimate (n8n executes one node at a time)."""
+    unknown: List[str] = []
+
+    def cost(name: str) -> float:
+        if name in compiled.estimates:
+            return compiled.estimates[name]
+        if name in profile_duration:
+            return profile_duration[name]
+        if name in compiled.inline_groups:
+            return max((cost(b) for b in compiled.inline_groups[name]), default=0.0)
+        if name in compiled.merge_groups:
+            return 0.0
+        unknown.append(name)
+        return 0.0
+
+    names = [n["name"] for n in workflow["nodes"]]
+    costs = {name: cost(name) for name in names}
+    parents: Dict[str, List[str]] = {name: [] for name in names}
+    for src, dst in _edges(workflow):
+        parents[dst].append(src)
+
+    finish: Dict[str, float] = {}
+    via: Dict[str, Optional[str]] = {}
+
+    def visit(name: str, stack: Tuple[str, ...] = ()) -> float:
+        if name in finish:
+            return finish[name]
+        if name in stack:
+            raise SpecError(f"cycle through {name}")
+        best, best_parent = 0.0, None
+        for parent in parents[name]:
+            t = visit(parent, stack + (name,))
+            if t > best or best_parent is None:
+                best, best_parent = t, parent
+        finish[name] = best + costs[name]
+        via[name] = best_parent
+        return finish[name]
+
+    for name in names:
+        visit(name)
+    end = max(names, key=lambda n: finish[n])
+    path = []
+    node: Optional[str] = end
+    while node is not None:
+        path.append(node)
+        node = via[node]
+    path.reverse()
+
+    savings = {}
+    for group, chains in compiled.merge_groups.items():
+        branch_costs = [sum(costs.get(n, 0.0) for n in chain) for chain in chains]
+        savings[group] = round(sum(branch_costs) - max(branch_costs), 2)
+    return {
+        "critical_path": [{"node": n, "seconds": round(costs[n], 2), "finish": round(finish[n], 2)} for n in path],
+        "critical_path_seconds": round(finish[end], 2),
+        "serial_seconds": round(sum(costs.values()), 2),
+        "inline_savings_seconds": savings,
+        "unknown_cost": sorted(set(unknown)),
+    }
+
+
+def _normalized(workflow: Dict[str, Any], with_code: bool) -> Tuple[Dict[str, Any], set]:
+    nodes = {}
+    for node in workflow.get("nodes", []):
+        params = dict(node.get("parameters") or {})
+        if not with_code:
+            params.pop("jsCode", None)
+        nodes[node["name"]] = (node.get("type"), node.get("typeVersion"), json.dumps(params, sort_keys=True))
+    edges = {
+        (src, out, target["node"], target.get("index", 0))
+        for src, outputs in workflow.get("connections", {}).items()
+        for out, targets in enumerate(outputs.get("main", []))
+        for target in targets
+    }
+    return nodes, edges
+
+
+def diff_workflows(expected: Dict[str, Any], actual: Dict[str, Any], with_code: bool = False) -> List[str]:
+    """Structural differences (positions ignored; jsCode only with `with_code`)."""
+    exp_nodes, exp_edges = _normalized(expected, with_code)
+    act_nodes, act_edges = _normalized(actual, with_code)
+    problems = [f"missing node: {n}" for n in sorted(set(exp_nodes) - set(act_nodes))]
+    problems += [f"extra node: {n}" for n in sorted(set(act_nodes) - set(exp_nodes))]
+    problems += [f"node differs: {n}" for n in sorted(set(exp_nodes) & set(act_nodes)) if exp_nodes[n] != act_nodes[n]]
+    problems += [f"missing edge: {e[0]}[{e[1]}] -> {e[2]}[{e[3]}]" for e in sorted(exp_edges - act_edges)]
+    problems += [f"extra edge: {e[0]}[{e[1]}] -> {e[2]}[{e[3]}]" for e in sorted(act_edges - exp_edges)]
+    return problems
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"[pipeline] serial_estimate={report['serial_seconds']}s (n8n runs one node at a time)")
+    print(f"[pipeline] critical_path={report['critical_path_seconds']}s (lower bound if branches overlap):")
+    for step in report["critical_path"]:
+        print(f"  - {step['node']}: {step['seconds']}s (t={step['finish']}s)")
+    for group, seconds in report["inline_savings_seconds"].items():
+        if seconds > 0:
+            print(f"[pipeline] {group}: strategy=inline would save ~{seconds}s")
+    if report["unknown_cost"]:
+        print("[pipeline] no timing for:", ", ".join(report["unknown_cost"]), "(set estimateSeconds or run `trigger --live`)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compile config/pipeline.json into n8n workflow JSON")
+    parser.add_argument("--spec", default=str(DEFAULT_SPEC))
+    parser.add_argument("--out", default=None, help="Output path (default: spec `output`)")
+    parser.add_argument("--report-only", action="store_true", help="Do not write the workflow")
+    parser.add_argument("--check", default=None, help="Diff the compiled workflow against this file; exit 1 on differences")
+    parser.add_argument("--check-code", action="store_true", help="With --check, also compare jsCode")
+    parser.add_argument("--json", action="store_true", help="Print the critical-path report as JSON")
+    args = parser.parse_args()
+
+    spec = json.loads(Path(args.spec).read_text(encoding="utf-8"))
+    try:
+        workflow, compiled = compile_spec(spec)
+        report = critical_path(workflow, compiled, cached_stage_profile().duration)
+    except SpecError as exc:
+        raise SystemExit(f"[pipeline] spec error: {exc}")
+
+    if args.check:
+        problems = diff_workflows(json.loads(Path(args.check).read_text(encoding="utf-8")), workflow, args.check_code)
+        for problem in problems:
+            print(f"[pipeline] {problem}")
+        print(f"[pipeline] check {args.check}: {'OK' if not problems else f'{len(problems)} differences'}")
+        return 1 if problems else 0
+
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        _print_report(report)
+    if not args.report_only:
+        out = Path(args.out) if args.out else ROOT / spec.get("output", "workflows/pipeline.json")
+        out.write_text(json.dumps(workflow, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"[pipeline] wrote {out.relative_to(ROOT) if out.is_relative_to(ROOT) else out} nodes={len(workflow['nodes'])}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,9 +7,7 @@ const MAX_URLS = Number.parseInt($env.DEDUPE_MAX_URLS || '2000', 10);
 const FILE_STORE_ENABLED = String($env.DEDUPE_FILE_STORE || 'true').toLowerCase() !== 'false';
 const FILE_STORE_PATH = $env.DEDUPE_STORE_PATH || '/home/node/.n8n/x-daily-pack-dedupe.json';
 
-const safeRequire = (name) => {
-  try { return require(name); } catch (err) { return null; }
-};
+// @include safeRequire
 const fs = safeRequire('fs');
 const path = safeRequire('path');
 
@@ -0,0 +1,626 @@
+#!/usr/bin/env python3
+"""
+Vectorized semantic dedupe engine (NumPy) for the Semantic Dedupe node.
+
+`serve` runs it as a sidecar: the history lives in memory as one float32
+matrix of unit vectors, loaded from and persisted to the node's JSON store
+(SEMANTIC_DEDUPE_STORE_PATH). semantic-dedupe-node.js posts its embeddings to
+POST /dedupe when SEMANTIC_DEDUPE_ENGINE_URL is set and falls back to its own
+loop when the engine is unreachable. Threshold, expiry and history limit come
+with every request, so the node's env stays the single source of config.
+
+`bench` times the node's JS loop (scripts/semantic-dedupe-bench.mjs) against
+the engine on synthetic embeddings with planted duplicates, checks both reach
+the same verdicts, and scales the engine's history up to 100k vectors.
+
+`serve --index lsh` answers lookups from a random-hyperplane LSH index
+(scripts/_ann.py) instead of a full scan. `ann-bench` measures it against
+exact search on a topic-clustered history: recall@k of the neighbours at or
+above the threshold, dedupe verdict agreement, query/insert/build time and
+TTL expiry cost.
+
+The history can be kept in the binary store of scripts/_vector_store.py
+instead of JSON: give the store path a .vec suffix (the node does the same
+with SEMANTIC_DEDUPE_STORE_PATH). `convert` copies a store between formats,
+`compact` rewrites a .vec store without its dead rows, and `store-bench`
+compares both formats' size and load/save time, for the node
+(scripts/semantic-dedupe-store-bench.mjs) and for the engine.
+
+Needs numpy (`pip install numpy`).
+
+Run:
+  python3 scripts/dedupe_engine.py serve --port 8765
+  python3 scripts/dedupe_engine.py bench
+  python3 scripts/dedupe_engine.py bench --history 500,100000 --batch 300 --json
+  python3 scripts/dedupe_engine.py serve --index lsh
+  python3 scripts/dedupe_engine.py ann-bench --history 100000 --configs 12x32,14x48,16x64
+  python3 scripts/dedupe_engine.py convert ~/.n8n/x-daily-pack-embeddings.json ~/.n8n/x-daily-pack-embeddings.vec
+  python3 scripts/dedupe_engine.py store-bench --sizes 500,5000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+
+    from _dedupe_engine import DedupeEngine, default_store_path, normalize_rows
+    from _vector_store import DTYPE_CODES, VectorStore, default_dtype, index_path, is_binary_store
+except ImportError as exc:  # numpy is optional for the rest of scripts/
+    raise SystemExit(f"dedupe engine needs numpy ({exc}); pip install numpy")
+
+
+ROOT = Path(__file__).resolve().parents[1]
+JS_BENCH = ROOT / "scripts" / "semantic-dedupe-bench.mjs"
+JS_STORE_BENCH = ROOT / "scripts" / "semantic-dedupe-store-bench.mjs"
+
+
+# ---------------------------------------------------------------- sidecar
+
+
+class EngineService:
+    """One engine shared by all requests; dedupe calls are serialized (each one reads and extends the history).
+
+    The node's in-process fallback writes the same store when the engine is
+    unreachable, so a store that changed on disk since the engine last read or
+    wrote it is merged back in before deciding instead of being overwritten.
+    """
+
+    def __init__(self, store_path: Optional[Path], engine: Optional[DedupeEngine] = None) -> None:
+        self.store_path = store_path
+        self.engine = engine or DedupeEngine()
+        self.lock = threading.Lock()
+        self.loaded = self.engine.load(store_path) if store_path else 0
+        self._stamp = self._store_stamp()
+
+    def _store_stamp(self) -> Optional[Tuple[int, int]]:
+        if not self.store_path:
+            return None
+        # A .vec save lands its index last, so the index is what changes on every write.
+        path = index_path(self.store_path) if is_binary_store(self.store_path) else self.store_path
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _reload_if_changed(self) -> bool:
+        stamp = self._store_stamp()
+        if stamp is None or stamp == self._stamp:
+            return False
+        # Rows are merged by id (the store's copy wins); expiry and the cap apply right after.
+        self.engine.load(self.store_path)
+        self._stamp = stamp
+        return True
+
+    def dedupe(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        items = body.get("items")
+        if not isinstance(items, list) or not all(isinstance(i, dict) and isinstance(i.get("embedding"), list) for i in items):
+            raise ValueError("items must be a list of {id, title, embedding}")
+        if len({len(i["embedding"]) for i in items}) > 1:
+            raise ValueError("embeddings in one request must share a dimension")
+
+        now_ms = int(body.get("now") or time.time() * 1000)
+        started = time.perf_counter()
+        with self.lock:
+            engine = self.engine
+            engine.threshold = float(body.get("threshold", engine.threshold))
+            engine.expiry_days = float(body.get("expiry_days", engine.expiry_days))
+            engine.max_embeddings = int(body.get("max_embeddings", engine.max_embeddings))
+            reloaded = self._reload_if_changed()
+            if reloaded:
+                engine.cap()
+            expired = engine.expire(now_ms)
+            verdicts = engine.dedupe(items, now_ms=now_ms)
+            decided_ms = (time.perf_counter() - started) * 1000
+            saved = False
+            if self.store_path and (reloaded or expired or not all(v.duplicate for v in verdicts)):
+                engine.save(self.store_path)
+                self._stamp = self._store_stamp()
+                saved = True
+            stored = len(engine)
+        return {
+            "results": [v.as_dict() for v in verdicts],
+            "stats": {
+                "expired_cleaned": expired,
+                "total_stored_embeddings": stored,
+                "decide_ms": round(decided_ms, 3),
+                "store_saved": saved,
+                "store_reloaded": reloaded,
+            },
+        }
+
+
+def _handler(service: EngineService) -> type:
+    class EngineHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            return
+
+        def _send(self, status: int, body: Any) -> None:
+            raw = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(raw)))
+            self.end_headers()
+            self.wfile.write(raw)
+
+        def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+            if self.path.split("?")[0] == "/healthz":
+                self._send(200, {"ok": True, "stored": len(service.engine), "dims": service.engine.dims})
+                return
+            self._send(404, {"message": "not found"})
+
+        def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+            if self.path.split("?")[0] != "/dedupe":
+                self._send(404, {"message": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length).decode("utf-8") or "{}")
+                self._send(200, service.dedupe(body))
+            except (ValueError, TypeError, KeyError) as exc:
+                self._send(400, {"message": str(exc)})
+
+    return EngineHandler
+
+
+def serve(args: argparse.Namespace) -> int:
+    store_path = None if args.no_store else Path(args.store).expanduser()
+    engine = DedupeEngine(index=args.index, lsh_bits=args.lsh_bits, lsh_tables=args.lsh_tables)
+    service = EngineService(store_path, engine)
+    server = ThreadingHTTPServer((args.host, args.port), _handler(service))
+    print(
+        f"[dedupe-engine] serving http://{args.host}:{args.port}/dedupe"
+        f" loaded={service.loaded} index={args.index} store={store_path}"
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+# ---------------------------------------------------------------- benchmark
+
+
+def _random_unit(rng: np.random.Generator, rows: int, dims: int) -> np.ndarray:
+    out = np.empty((rows, dims), dtype=np.float32)
+    for start in range(0, rows, 4096):
+        out[start : start + 4096] = rng.standard_normal((min(4096, rows - start), dims), dtype=np.float32)
+    return normalize_rows(out)
+
+
+def _near(rng: np.random.Generator, vector: np.ndarray, similarity: float) -> np.ndarray:
+    """A unit vector at roughly `similarity` cosine from `vector`."""
+    noise = rng.standard_normal(vector.shape[0]).astype(np.float32)
+    noise -= noise.dot(vector) * vector
+    noise /= np.linalg.norm(noise)
+    return similarity * vector + np.sqrt(1 - similarity**2) * noise
+
+
+def synthetic_batch(rng: np.random.Generator, history: np.ndarray, size: int, dup_rate: float) -> np.ndarray:
+    """Mostly fresh stories, with near-copies of history rows and of earlier batch items mixed in."""
+    batch = _random_unit(rng, size, history.shape[1])
+    for i in range(size):
+        roll = rng.random()
+        if roll < dup_rate and len(history):
+            batch[i] = _near(rng, history[rng.integers(len(history))], float(rng.uniform(0.86, 0.97)))
+        elif roll < dup_rate * 1.5 and i:
+            batch[i] = _near(rng, batch[rng.integers(i)], float(rng.uniform(0.86, 0.97)))
+    return batch
+
+
+def _items(batch: np.ndarray) -> List[Dict[str, Any]]:
+    return [{"id": f"b{i}", "title": f"batch {i}", "embedding": row} for i, row in enumerate(batch)]
+
+
+def _engine_with(history: np.ndarray, now_ms: int) -> DedupeEngine:
+    engine = DedupeEngine(max_embeddings=len(history) + 10_000)
+    engine.add(history, [f"h{i}" for i in range(len(history))], [f"history {i}" for i in range(len(history))], [now_ms] * len(history), normalized=True)
+    return engine
+
+
+def _time_engine(history: np.ndarray, batch: np.ndarray, runs: int) -> Dict[str, Any]:
+    now_ms = int(time.time() * 1000)
+    items = _items(batch)
+    samples = []
+    verdicts = []
+    for _ in range(runs):
+        engine = _engine_with(history, now_ms)
+        started = time.perf_counter()
+        verdicts = engine.dedupe(items, now_ms=now_ms)
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"ms": float(np.median(samples)), "duplicates": [v.duplicate for v in verdicts]}
+
+
+def _time_js(history: np.ndarray, batch: np.ndarray, threshold: float, runs: int) -> Dict[str, Any]:
+    job = {
+        "threshold": threshold,
+        "runs": runs,
+        "history": np.round(history, 6).tolist(),
+        "batch": np.round(batch, 6).tolist(),
+    }
+    proc = subprocess.run(["node", str(JS_BENCH)], input=json.dumps(job), capture_output=True, text=True, check=False)
+    if proc.returncode != 0:
+        raise SystemExit(f"JS bench failed: {proc.stderr.strip()[-500:]}")
+    return json.loads(proc.stdout)
+
+
+def bench(args: argparse.Namespace) -> int:
+    rng = np.random.default_rng(args.seed)
+    sizes = sorted(int(n) for n in args.history.split(","))
+    history = _random_unit(rng, max(sizes), args.dims)
+    rows: List[Dict[str, Any]] = []
+    for size in sizes:
+        batch = synthetic_batch(rng, history[:size], args.batch, args.dup_rate)
+        engine = _time_engine(history[:size], batch, args.runs)
+        row: Dict[str, Any] = {
+            "history": size,
+            "batch": args.batch,
+            "engine_ms": round(engine["ms"], 3),
+            "duplicates": sum(engine["duplicates"]),
+        }
+        if size <= args.js_max:
+            js = _time_js(history[:size], batch, 0.85, args.runs)
+            row["js_ms"] = round(js["ms"], 3)
+            row["verdicts_match"] = js["duplicates"] == engine["duplicates"]
+        rows.append(row)
+        print(f"[dedupe-bench] {json.dumps(row, sort_keys=True)}", file=sys.stderr)
+
+    baseline = next((r["js_ms"] for r in rows if "js_ms" in r and r["history"] == min(sizes)), None)
+    if args.json:
+        print(json.dumps({"dims": args.dims, "rows": rows, "js_baseline_ms": baseline}, sort_keys=True))
+    else:
+        print(f"{'history':>8} {'batch':>6} {'js loop':>10} {'engine':>10} {'dups':>5} verdicts")
+        for r in rows:
+            js = f"{r['js_ms']:>8.1f}ms" if "js_ms" in r else f"{'-':>10}"
+            match = "" if "verdicts_match" not in r else ("same" if r["verdicts_match"] else "DIFFER")
+            print(f"{r['history']:>8} {r['batch']:>6} {js} {r['engine_ms']:>8.1f}ms {r['duplicates']:>5} {match}")
+        if baseline is not None:
+            largest = rows[-1]
+            print(
+                f"[dedupe-bench] engine at {largest['history']} vectors: {largest['engine_ms']:.1f}ms"
+                f" vs JS loop at {min(sizes)}: {baseline:.1f}ms"
+            )
+    mismatched = [r for r in rows if r.get("verdicts_match") is False]
+    return 1 if mismatched else 0
+
+
+def clustered_history(rng: np.random.Generator, rows: int, dims: int, topics: int, intra: float) -> np.ndarray:
+    """Unit vectors around `topics` random centres; two stories of one topic sit at cosine ~intra."""
+    centres = _random_unit(rng, topics, dims)
+    pull = np.float32(np.sqrt(intra / (1 - intra)))
+    out = np.empty((rows, dims), dtype=np.float32)
+    for start in range(0, rows, 4096):
+        count = min(4096, rows - start)
+        noise = _random_unit(rng, count, dims)
+        out[start : start + count] = normalize_rows(pull * centres[rng.integers(topics, size=count)] + noise)
+    return out
+
+
+def ann_queries(rng: np.random.Generator, history: np.ndarray, size: int, topics_like: np.ndarray) -> np.ndarray:
+    """30% near-copies above the threshold, 10% near misses just below it, the rest fresh stories of known topics."""
+    queries = np.empty((size, history.shape[1]), dtype=np.float32)
+    for i in range(size):
+        roll = rng.random()
+        if roll < 0.3:
+            queries[i] = _near(rng, history[rng.integers(len(history))], float(rng.uniform(0.86, 0.97)))
+        elif roll < 0.4:
+            queries[i] = _near(rng, history[rng.integers(len(history))], float(rng.uniform(0.70, 0.84)))
+        else:
+            queries[i] = topics_like[rng.integers(len(topics_like))]
+    return normalize_rows(queries)
+
+
+def _recall(exact: Tuple[np.ndarray, np.ndarray], approx: Tuple[np.ndarray, np.ndarray], threshold: float, k: int) -> Optional[float]:
+    found = wanted = 0
+    for q in range(len(exact[0])):
+        truth = {int(r) for s, r in zip(exact[0][q, :k], exact[1][q, :k]) if r >= 0 and s >= threshold}
+        got = {int(r) for s, r in zip(approx[0][q, :k], approx[1][q, :k]) if r >= 0 and s >= threshold}
+        wanted += len(truth)
+        found += len(truth & got)
+    return found / wanted if wanted else None
+
+
+def _median_ms(fn: Any, runs: int) -> float:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return float(np.median(samples))
+
+
+def ann_bench(args: argparse.Namespace) -> int:
+    rng = np.random.default_rng(args.seed)
+    threshold = 0.85
+    day_ms = 24 * 60 * 60 * 1000
+    now_ms = int(time.time() * 1000)
+    history = clustered_history(rng, args.history, args.dims, args.topics, args.intra)
+    # Spread over the expiry window, so expiring one day later drops ~1/expiry_days of the rows.
+    stamps = now_ms - rng.integers(0, args.expiry_days * day_ms, size=len(history))
+    ids = [f"h{i}" for i in range(len(history))]
+    titles = [""] * len(history)
+    queries = ann_queries(rng, history, args.batch, clustered_history(rng, 2000, args.dims, args.topics, args.intra))
+    fresh = clustered_history(rng, args.batch, args.dims, args.topics, args.intra)
+    k = args.k
+
+    exact = DedupeEngine(expiry_days=args.expiry_days, max_embeddings=len(history) * 2)
+    exact.add(history, ids, titles, stamps, normalized=True)
+    truth = exact.search(queries, k)
+    exact_ms = _median_ms(lambda: exact.search(queries, k), args.runs)
+    exact.expire(now_ms + day_ms)
+    truth_after = exact.search(queries, k)
+
+    rows: List[Dict[str, Any]] = [{"index": "exact", "query_ms": round(exact_ms, 2), "recall_at_1": 1.0, f"recall_at_{k}": 1.0}]
+    for config in args.configs.split(","):
+        bits, tables = (int(x) for x in config.lower().split("x"))
+        engine = DedupeEngine(expiry_days=args.expiry_days, max_embeddings=len(history) * 2, index="lsh", lsh_bits=bits, lsh_tables=tables)
+        started = time.perf_counter()
+        engine.add(history, ids, titles, stamps, normalized=True)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        approx = engine.search(queries, k)
+        query_ms = _median_ms(lambda: engine.search(queries, k), args.runs)
+        candidates = float(np.mean([len(c) for c in engine._lsh.candidates(queries)])) if engine._lsh else 0.0
+        agree = float(np.mean((truth[0][:, 0] >= threshold) == (approx[0][:, 0] >= threshold)))
+
+        started = time.perf_counter()
+        engine.expire(now_ms + day_ms)
+        expire_ms = (time.perf_counter() - started) * 1000
+        after = engine.search(queries, k)
+        live = engine.timestamps[after[1][after[1] >= 0]]
+        stale = int(np.sum(now_ms + day_ms - live >= args.expiry_days * day_ms))
+
+        started = time.perf_counter()
+        engine.add(fresh, [f"n{i}" for i in range(len(fresh))], [""] * len(fresh), [now_ms] * len(fresh), normalized=True)
+        insert_ms = (time.perf_counter() - started) * 1000
+
+        row = {
+            "index": f"lsh {bits}x{tables}",
+            "query_ms": round(query_ms, 2),
+            "speedup": round(exact_ms / query_ms, 1),
+            "recall_at_1": _recall(truth, approx, threshold, 1),
+            f"recall_at_{k}": _recall(truth, approx, threshold, k),
+            f"recall_at_{k}_after_expiry": _recall(truth_after, after, threshold, k),
+            "verdict_agreement": round(agree, 4),
+            "candidates_per_query": round(candidates, 1),
+            "build_ms": round(build_ms, 1),
+            "insert_batch_ms": round(insert_ms, 2),
+            "expire_ms": round(expire_ms, 2),
+            "expired_rows_returned": stale,
+        }
+        rows.append(row)
+        print(f"[ann-bench] {json.dumps(row, sort_keys=True)}", file=sys.stderr)
+        engine = None  # free the copy before building the next configuration
+
+    if args.json:
+        print(json.dumps({"history": args.history, "batch": args.batch, "dims": args.dims, "threshold": threshold, "rows": rows}, sort_keys=True))
+    else:
+        print(f"history={args.history} batch={args.batch} dims={args.dims} topics={args.topics} threshold={threshold}")
+        print(f"{'index':<12} {'query':>9} {'speedup':>7} {'R@1':>6} {f'R@{k}':>6} {f'R@{k}ttl':>7} {'agree':>6} {'cand/q':>7} {'build':>8} {'insert':>8} {'expire':>8}")
+        for r in rows:
+            def pct(value: Optional[float]) -> str:
+                return f"{value:>6.3f}" if value is not None else f"{'-':>6}"
+            print(
+                f"{r['index']:<12} {r['query_ms']:>7.1f}ms {r.get('speedup', 1.0):>6.1f}x {pct(r['recall_at_1'])} {pct(r[f'recall_at_{k}'])}"
+                f" {pct(r.get(f'recall_at_{k}_after_expiry', 1.0))} {r.get('verdict_agreement', 1.0):>6.3f} {r.get('candidates_per_query', len(history)):>7.0f}"
+                f" {r.get('build_ms', 0):>6.0f}ms {r.get('insert_batch_ms', 0):>6.1f}ms {r.get('expire_ms', 0):>6.1f}ms"
+            )
+    return 1 if any(r.get("expired_rows_returned") for r in rows) else 0
+
+
+# ---------------------------------------------------------------- stores
+
+
+def _store_size(path: Path) -> int:
+    return VectorStore(path).size_bytes() if is_binary_store(path) else path.stat().st_size
+
+
+def convert(args: argparse.Namespace) -> int:
+    source, target = Path(args.source).expanduser(), Path(args.target).expanduser()
+    if not source.exists():
+        raise SystemExit(f"{source} does not exist")
+    if source.resolve() == target.resolve():
+        raise SystemExit("source and target are the same store")
+    engine = DedupeEngine()
+    started = time.perf_counter()
+    loaded = engine.load(source)
+    engine.save(target, dtype=args.dtype)
+    print(
+        f"[dedupe-store] {source} ({_store_size(source):,} bytes) -> {target} ({_store_size(target):,} bytes):"
+        f" {loaded} embeddings in {(time.perf_counter() - started) * 1000:.0f}ms"
+    )
+    if is_binary_store(target):
+        print(f"[dedupe-store] point SEMANTIC_DEDUPE_STORE_PATH at {target} (node and engine) to use it")
+    return 0
+
+
+def compact(args: argparse.Namespace) -> int:
+    path = Path(args.store).expanduser()
+    if not is_binary_store(path):
+        raise SystemExit("compact works on a .vec store")
+    store = VectorStore(path, args.dtype)
+    vectors, entries = store.read()
+    if args.dtype is None and store.disk_dtype:
+        store.dtype = store.disk_dtype
+    before = store.size_bytes()
+    written = store.write([e.id for e in entries], [e.title for e in entries], [e.timestamp for e in entries], vectors, compact=True)
+    print(f"[dedupe-store] {path}: {before:,} -> {store.size_bytes():,} bytes, {written['live']} live rows ({store.dtype})")
+    return 0
+
+
+def _write_node_json(path: Path, ids: List[str], titles: List[str], stamps: np.ndarray, vectors: np.ndarray) -> None:
+    # The embeddings API returns values like -0.0060760034; the node stores them as received.
+    entries = [
+        {"id": id_, "embedding": np.round(vector.astype(np.float64), 10).tolist(), "title": title, "timestamp": int(ts)}
+        for id_, title, ts, vector in zip(ids, titles, stamps, vectors)
+    ]
+    path.write_text(json.dumps({"embeddings": entries}), encoding="utf-8")
+
+
+def _churn(engine: DedupeEngine, fresh: np.ndarray, now_ms: int, run: int) -> None:
+    """One node run's update: the oldest len(fresh) rows go, len(fresh) new ones arrive."""
+    engine.max_embeddings = len(engine)
+    engine.add(fresh, [f"new_{run}_{i}" for i in range(len(fresh))], [""] * len(fresh), [now_ms + run] * len(fresh), normalized=True)
+    engine.cap()
+
+
+def store_bench(args: argparse.Namespace) -> int:
+    rng = np.random.default_rng(args.seed)
+    now_ms = int(time.time() * 1000)
+    day_ms = 24 * 60 * 60 * 1000
+    rows: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory(prefix="dedupe-store-bench-") as tmp:
+        for size in sorted(int(n) for n in args.sizes.split(",")):
+            vectors = _random_unit(rng, size, args.dims)
+            ids = [f"emb_{i:x}" for i in range(size)]
+            titles = [f"Story {i}: a headline of typical length for the daily pack digest" for i in range(size)]
+            stamps = now_ms - rng.integers(0, 7 * day_ms, size=size)
+            json_path, vec_path = Path(tmp) / f"store-{size}.json", Path(tmp) / f"store-{size}.vec"
+            _write_node_json(json_path, ids, titles, stamps, vectors)
+            source = DedupeEngine()
+            source.load(json_path)
+            source.save(vec_path, dtype=args.dtype)
+            vec_bytes = _store_size(vec_path)
+
+            proc = subprocess.run(
+                ["node", str(JS_STORE_BENCH)],
+                input=json.dumps({"json": str(json_path), "vec": str(vec_path), "batch": args.batch, "runs": args.runs, "dtype": args.dtype}),
+                capture_output=True,
+                text=True,
+                check=False,
+            )
+            if proc.returncode != 0:
+                raise SystemExit(f"JS store bench failed: {proc.stderr.strip()[-500:]}")
+            node = json.loads(proc.stdout)
+
+            py_json_load = _median_ms(lambda: DedupeEngine().load(json_path), args.runs)
+            py_vec_load = _median_ms(lambda: DedupeEngine().load(vec_path), args.runs)
+
+            # Same verdicts from either copy of the history?
+            batch = synthetic_batch(rng, vectors, args.batch, 0.15)
+            from_json, from_vec = DedupeEngine(max_embeddings=size * 2), DedupeEngine(max_embeddings=size * 2)
+            from_json.load(json_path)
+            from_vec.load(vec_path)
+            a, b = from_json.dedupe(_items(batch), now_ms=now_ms), from_vec.dedupe(_items(batch), now_ms=now_ms)
+            agree = float(np.mean([x.duplicate == y.duplicate for x, y in zip(a, b)]))
+            drift = max(abs(x.similarity - y.similarity) for x, y in zip(a, b))
+
+            py_json_save = _median_ms(lambda: source.save(Path(tmp) / "engine.json"), args.runs)
+            saves = []
+            for run in range(args.runs):
+                _churn(source, _random_unit(rng, args.batch, args.dims), now_ms, run)
+                started = time.perf_counter()
+                source.save(vec_path, dtype=args.dtype)
+                saves.append((time.perf_counter() - started) * 1000)
+
+            row = {
+                "entries": size,
+                "json_bytes": json_path.stat().st_size,
+                "vec_bytes": vec_bytes,
+                "node_json_load_ms": round(node["json_load_ms"], 2),
+                "node_vec_load_ms": round(node["vec_load_ms"], 2),
+                "node_json_save_ms": round(node["json_save_ms"], 2),
+                "node_vec_save_ms": round(node["vec_save_ms"], 2),
+                "node_vec_rewrite_ms": round(node["vec_rewrite_ms"], 2),
+                "engine_json_load_ms": round(py_json_load, 2),
+                "engine_vec_load_ms": round(py_vec_load, 2),
+                "engine_json_save_ms": round(py_json_save, 2),
+                "engine_vec_save_ms": round(float(np.median(saves)), 2),
+                "max_abs_error": node["max_abs_error"],
+                "max_similarity_drift": round(drift, 6),
+                "verdict_agreement": agree,
+            }
+            rows.append(row)
+            print(f"[store-bench] {json.dumps(row, sort_keys=True)}", file=sys.stderr)
+
+    if args.json:
+        print(json.dumps({"dims": args.dims, "dtype": args.dtype, "batch": args.batch, "rows": rows}, sort_keys=True))
+        return 0
+    print(f"dims={args.dims} dtype={args.dtype} churn per save={args.batch} (load / save, JSON -> .vec)")
+    print(f"{'entries':>8} {'json':>9} {'vec':>9} {'size':>6} {'node load':>18} {'node save':>18} {'engine load':>18} {'engine save':>18} {'agree':>6} {'sim drift':>9}")
+    for r in rows:
+        def pair(a: float, b: float) -> str:
+            return f"{a:>7.1f} -> {b:>6.1f}ms"
+        print(
+            f"{r['entries']:>8} {r['json_bytes'] / 1e6:>7.2f}MB {r['vec_bytes'] / 1e6:>7.2f}MB {r['json_bytes'] / r['vec_bytes']:>5.1f}x"
+            f" {pair(r['node_json_load_ms'], r['node_vec_load_ms'])} {pair(r['node_json_save_ms'], r['node_vec_save_ms'])}"
+            f" {pair(r['engine_json_load_ms'], r['engine_vec_load_ms'])} {pair(r['engine_json_save_ms'], r['engine_vec_save_ms'])}"
+            f" {r['verdict_agreement']:>6.3f} {r['max_similarity_drift']:>9.6f}"
+        )
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="NumPy semantic dedupe engine: sidecar and benchmark")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_serve = sub.add_parser("serve", help="Serve POST /dedupe for semantic-dedupe-node.js")
+    p_serve.add_argument("--host", default=os.environ.get("SEMANTIC_DEDUPE_ENGINE_HOST", "127.0.0.1"))
+    p_serve.add_argument("--port", type=int, default=int(os.environ.get("SEMANTIC_DEDUPE_ENGINE_PORT", "8765")))
+    p_serve.add_argument("--store", default=str(default_store_path()), help="Embedding store to load and persist (.json, or binary .vec)")
+    p_serve.add_argument("--no-store", action="store_true", help="Keep the history in memory only")
+    p_serve.add_argument("--index", choices=("exact", "lsh"), default=os.environ.get("SEMANTIC_DEDUPE_INDEX", "exact"))
+    p_serve.add_argument("--lsh-bits", type=int, default=14, help="Sign bits per LSH table")
+    p_serve.add_argument("--lsh-tables", type=int, default=48, help="LSH tables (more = higher recall, more candidates)")
+
+    p_bench = sub.add_parser("bench", help="Compare the node's JS loop with the engine")
+    p_bench.add_argument("--history", default="500,5000,20000,100000", help="Comma-separated history sizes")
+    p_bench.add_argument("--batch", type=int, default=300, help="Items per run (embeddings judged against the history)")
+    p_bench.add_argument("--dims", type=int, default=1536)
+    p_bench.add_argument("--dup-rate", type=float, default=0.15)
+    p_bench.add_argument("--runs", type=int, default=3)
+    p_bench.add_argument("--js-max", type=int, default=5000, help="Largest history also timed with the JS loop")
+    p_bench.add_argument("--seed", type=int, default=7)
+    p_bench.add_argument("--json", action="store_true")
+
+    p_ann = sub.add_parser("ann-bench", help="Recall and speed of the LSH index against exact search")
+    p_ann.add_argument("--history", type=int, default=100000)
+    p_ann.add_argument("--batch", type=int, default=300)
+    p_ann.add_argument("--dims", type=int, default=1536)
+    p_ann.add_argument("--configs", default="12x32,14x48,16x64", help="Comma-separated BITSxTABLES LSH settings")
+    p_ann.add_argument("--k", type=int, default=10)
+    p_ann.add_argument("--topics", type=int, default=300, help="Topic clusters in the synthetic history")
+    p_ann.add_argument("--intra", type=float, default=0.35, help="Typical cosine between two stories of one topic")
+    p_ann.add_argument("--expiry-days", type=int, default=int(os.environ.get("SEMANTIC_DEDUPE_EXPIRY_DAYS", "7")))
+    p_ann.add_argument("--runs", type=int, default=3)
+    p_ann.add_argument("--seed", type=int, default=7)
+    p_ann.add_argument("--json", action="store_true")
+
+    p_convert = sub.add_parser("convert", help="Copy an embedding store between JSON and the binary .vec format")
+    p_convert.add_argument("source")
+    p_convert.add_argument("target")
+    p_convert.add_argument("--dtype", choices=sorted(DTYPE_CODES), default=default_dtype(), help="Row format of a .vec target")
+
+    p_compact = sub.add_parser("compact", help="Rewrite a .vec store without its dead rows")
+    p_compact.add_argument("store", nargs="?", default=str(default_store_path()))
+    p_compact.add_argument("--dtype", choices=sorted(DTYPE_CODES), default=None, help="Also change the row format")
+
+    p_store = sub.add_parser("store-bench", help="Size and load/save time of the JSON store vs the .vec store")
+    p_store.add_argument("--sizes", default="500,5000", help="Comma-separated history sizes")
+    p_store.add_argument("--dims", type=int, default=1536)
+    p_store.add_argument("--batch", type=int, default=300, help="Entries replaced per save (one run's churn)")
+    p_store.add_argument("--dtype", choices=sorted(DTYPE_CODES), default=default_dtype())
+    p_store.add_argument("--runs", type=int, default=5)
+    p_store.add_argument("--seed", type=int, default=7)
+    p_store.add_argument("--json", action="store_true")
+
+    args = parser.parse_args()
+    commands = {"serve": serve, "bench": bench, "ann-bench": ann_bench, "convert": convert, "compact": compact, "store-bench": store_bench}
+    return commands[args.command](args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
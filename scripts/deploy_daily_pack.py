@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import argparse
 import hashlib
+import json
 import os
+import time
 from pathlib import Path
-from typing import Dict, Iterable
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+from _bundle import Bundle, BundleError, build_code_nodes, record_source_maps
 from _env import load_env
-from _n8n_api import build_client
+from _n8n_api import N8NClient, build_client
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -16,6 +20,7 @@ CODE_NODE_SOURCES: Dict[str, Path] = {
     "RSS Fetch All": ROOT / "scripts" / "rss-fetch-node.js",
     "X Keyword Search": ROOT / "scripts" / "x-keyword-search-node.js",
     "X Account Search": ROOT / "scripts" / "x-account-search-node.js",
+    "Normalize": ROOT / "scripts" / "normalize-node.js",
     "Cross-Day Dedupe": ROOT / "scripts" / "cross-day-dedupe-node.js",
     "Semantic Dedupe": ROOT / "scripts" / "semantic-dedupe-node.js",
     "Event Clustering": ROOT / "scripts" / "event-clustering-node.js",
@@ -31,30 +36,78 @@ def _hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
 
 
-def _workflow_nodes(workflow: Dict) -> Iterable[Dict]:
-    return workflow.get("nodes") or workflow.get("data", {}).get("nodes") or []
-
+def digest(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
-def _expected_cron() -> str:
-    return os.environ.get("EXPECTED_DAILY_PACK_CRON", "0 0,12 * * *")
 
+def workflow_nodes(workflow: Dict) -> Iterable[Dict]:
+    return workflow.get("nodes") or workflow.get("data", {}).get("nodes") or []
 
-def main() -> int:
-    load_env()
-    client = build_client()
-
-    daily = client.find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
-    if not daily:
-        raise SystemExit("Daily Pack workflow not found")
 
-    workflow_id = daily["id"]
-    workflow = client.get_workflow(workflow_id)
-    nodes = list(_workflow_nodes(workflow))
-    if not nodes:
-        raise SystemExit(f"Workflow {workflow_id} has no nodes in API response")
+def daily_pack_cron() -> str:
+    return os.environ.get("EXPECTED_DAILY_PACK_CRON", "0 0,12 * * *")
 
-    expected_cron = _expected_cron()
 
+def _manifest_path() -> Path:
+    override = os.environ.get("DEPLOY_MANIFEST_PATH")
+    return Path(override) if override else ROOT / "logs" / "deploy-manifest.json"
+
+
+def load_manifest() -> Dict[str, Any]:
+    """Last successful deploy per workflow: live updatedAt, cron and sha256 of every source."""
+    path = _manifest_path()
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def record_deploy(workflow_id: str, updated_at: Optional[str], cron: str, digests: Dict[str, str]) -> None:
+    manifest = load_manifest()
+    manifest[workflow_id] = {
+        "updatedAt": updated_at,
+        "cron": cron,
+        "sources": digests,
+        "deployed_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    path = _manifest_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def build_sources() -> Dict[str, Bundle]:
+    """Deployable jsCode per node: shared helpers inlined, minified unless CODE_NODE_MINIFY=false."""
+    for name, source_path in CODE_NODE_SOURCES.items():
+        if not source_path.exists():
+            raise SystemExit(f"Missing source file for node {name}: {source_path}")
+    try:
+        return build_code_nodes(CODE_NODE_SOURCES)
+    except BundleError as exc:
+        raise SystemExit(f"Bundling code nodes failed: {exc}")
+
+
+def read_sources() -> Dict[str, str]:
+    return {name: built.code for name, built in build_sources().items()}
+
+
+def is_up_to_date(entry: Optional[Dict[str, Any]], live_updated_at: Optional[str], cron: str, digests: Dict[str, str]) -> bool:
+    """True when nothing changed on either side since the recorded deploy."""
+    return bool(
+        entry
+        and live_updated_at
+        and entry.get("updatedAt") == live_updated_at
+        and entry.get("cron") == cron
+        and entry.get("sources") == digests
+    )
+
+
+def sync_nodes(nodes: Iterable[Dict], sources: Dict[str, str], expected_cron: str) -> Tuple[int, int]:
+    """Apply cron + code sources to `nodes` in place; returns (schedule_updates, code_updates)."""
     schedule_updates = 0
     code_updates = 0
 
@@ -70,56 +123,95 @@ def main() -> int:
                 interval[0]["expression"] = expected_cron
                 schedule_updates += 1
 
-        if node_type == "n8n-nodes-base.code" and name in CODE_NODE_SOURCES:
-            source_path = CODE_NODE_SOURCES[name]
-            if not source_path.exists():
-                raise SystemExit(f"Missing source file for node {name}: {source_path}")
-            source_code = source_path.read_text(encoding="utf-8")
-            if params.get("jsCode") != source_code:
-                params["jsCode"] = source_code
+        if node_type == "n8n-nodes-base.code" and name in sources:
+            if params.get("jsCode") != sources[name]:
+                params["jsCode"] = sources[name]
                 code_updates += 1
 
-    print(f"[deploy] workflow_id={workflow_id} schedule_updates={schedule_updates} code_updates={code_updates}")
+    return schedule_updates, code_updates
+
 
+def put_workflow(client: N8NClient, workflow_id: str, workflow: Dict[str, Any]) -> Dict[str, Any]:
     # n8n update endpoint is strict about allowed top-level properties
     allowed_keys = ("name", "nodes", "connections", "settings")
     payload = {key: workflow.get(key) for key in allowed_keys if key in workflow}
-    client.update_workflow(workflow_id, payload)
+    updated = client.update_workflow(workflow_id, payload)
+    # The PUT response is the stored workflow; only fall back to a GET if it came back bare.
+    if not list(workflow_nodes(updated)):
+        updated = client.get_workflow(workflow_id)
+    return updated
 
-    # Verify after update
-    updated = client.get_workflow(workflow_id)
-    updated_nodes = list(_workflow_nodes(updated))
 
-    actual_cron = None
-    for node in updated_nodes:
+def live_cron(nodes: Iterable[Dict]) -> Optional[str]:
+    for node in nodes:
         if node.get("type") == "n8n-nodes-base.scheduleTrigger":
-            rule = node.get("parameters", {}).get("rule", {})
-            interval = rule.get("interval", [])
-            if interval:
-                actual_cron = interval[0].get("expression")
-            break
+            interval = node.get("parameters", {}).get("rule", {}).get("interval", [])
+            return interval[0].get("expression") if interval else None
+    return None
 
-    print(f"[deploy] expected_cron={expected_cron} actual_cron={actual_cron}")
 
-    # Verify code nodes by hash (no secrets printed)
+def code_mismatches(nodes: Iterable[Dict], sources: Dict[str, str]) -> List[Tuple[str, str, str]]:
+    """(name, src_hash, live_hash) for code nodes whose live jsCode differs (no secrets printed)."""
     mismatches = []
-    for node in updated_nodes:
+    for node in nodes:
         if node.get("type") != "n8n-nodes-base.code":
             continue
         name = node.get("name")
-        if name not in CODE_NODE_SOURCES:
+        if name not in sources:
             continue
         live_code = node.get("parameters", {}).get("jsCode", "")
-        src_code = CODE_NODE_SOURCES[name].read_text(encoding="utf-8")
-        if live_code != src_code:
-            mismatches.append((name, _hash(src_code), _hash(live_code)))
+        if live_code != sources[name]:
+            mismatches.append((name, _hash(sources[name]), _hash(live_code)))
+    return mismatches
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Sync code nodes and schedule of the Daily Pack workflow")
+    parser.add_argument("--force", action="store_true", help="Ignore the deploy manifest and compare against live")
+    args = parser.parse_args()
+
+    load_env()
+    client = build_client()
+
+    # The workflow listing already carries updatedAt, so a no-op deploy costs this one request.
+    daily = client.find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
+    if not daily:
+        raise SystemExit("Daily Pack workflow not found")
+
+    workflow_id = daily["id"]
+    expected_cron = daily_pack_cron()
+    bundles = build_sources()
+    sources = {name: built.code for name, built in bundles.items()}
+    digests = {name: digest(text) for name, text in sources.items()}
+
+    if not args.force and is_up_to_date(load_manifest().get(workflow_id), daily.get("updatedAt"), expected_cron, digests):
+        print(f"[deploy] workflow_id={workflow_id} up_to_date updatedAt={daily.get('updatedAt')} (manifest match)")
+        return 0
+
+    workflow = client.get_workflow(workflow_id)
+    nodes = list(workflow_nodes(workflow))
+    if not nodes:
+        raise SystemExit(f"Workflow {workflow_id} has no nodes in API response")
+
+    schedule_updates, code_updates = sync_nodes(nodes, sources, expected_cron)
+    print(f"[deploy] workflow_id={workflow_id} schedule_updates={schedule_updates} code_updates={code_updates}")
+    bundled = sum(built.bundled_bytes for built in bundles.values())
+    shipped = sum(built.size for built in bundles.values())
+    print(f"[deploy] jsCode_bytes={shipped} (unminified {bundled}, saved {bundled - shipped})")
+
+    updated = put_workflow(client, workflow_id, workflow) if schedule_updates or code_updates else workflow
+    updated_nodes = list(workflow_nodes(updated))
+    print(f"[deploy] expected_cron={expected_cron} actual_cron={live_cron(updated_nodes)}")
 
+    mismatches = code_mismatches(updated_nodes, sources)
     if mismatches:
         print("[deploy] code_mismatches_detected:")
         for name, src_hash, live_hash in mismatches:
             print(f"  - {name}: src={src_hash} live={live_hash}")
         return 2
 
+    record_deploy(workflow_id, updated.get("updatedAt"), expected_cron, digests)
+    record_source_maps(bundles)
     return 0
 
 
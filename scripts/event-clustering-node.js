@@ -36,18 +36,7 @@ if (items.length < MIN_PTS) {
 
 // ============== 工具函数 ==============
 
-// 余弦相似度计算（复用 semantic-dedupe 的实现）
-const cosineSimilarity = (a, b) => {
-  if (!a || !b || a.length !== b.length) return 0;
-  let dot = 0, normA = 0, normB = 0;
-  for (let i = 0; i < a.length; i++) {
-    dot += a[i] * b[i];
-    normA += a[i] * a[i];
-    normB += b[i] * b[i];
-  }
-  if (normA === 0 || normB === 0) return 0;
-  return dot / (Math.sqrt(normA) * Math.sqrt(normB));
-};
+// @include cosineSimilarity
 
 // 余弦距离 = 1 - 余弦相似度
 const cosineDistance = (a, b) => 1 - cosineSimilarity(a, b);
@@ -0,0 +1,49 @@
+// Helpers shared by the Daily Pack code nodes.
+// A node pulls in what it uses with `// @include name[, name...]`; scripts/_bundle.py
+// inlines the definitions (and the helpers they call) at deploy time.
+
+const safeRequire = (name) => {
+  try { return require(name); } catch (err) { return null; }
+};
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+const chunk = (arr, size) => {
+  const chunks = [];
+  for (let i = 0; i < arr.length; i += size) {
+    chunks.push(arr.slice(i, i + size));
+  }
+  return chunks;
+};
+
+// 余弦相似度计算
+const cosineSimilarity = (a, b) => {
+  if (!a || !b || a.length !== b.length) return 0;
+  let dot = 0, normA = 0, normB = 0;
+  for (let i = 0; i < a.length; i++) {
+    dot += a[i] * b[i];
+    normA += a[i] * a[i];
+    normB += b[i] * b[i];
+  }
+  if (normA === 0 || normB === 0) return 0;
+  return dot / (Math.sqrt(normA) * Math.sqrt(normB));
+};
+
+// Exponential backoff retry; the node defines maxRetries, retryDelayMs, RETRY_LABEL
+// and RETRYABLE_ERROR before including it.
+const retryWithBackoff = async (fn, maxAttempts = maxRetries, initialDelayMs = retryDelayMs) => {
+  let lastError;
+  for (let attempt = 1; attempt <= maxAttempts; attempt++) {
+    try {
+      return await fn();
+    } catch (error) {
+      lastError = error;
+      const isRetryable = RETRYABLE_ERROR.test(error.message);
+      if (!isRetryable || attempt === maxAttempts) throw error;
+      const delayMs = initialDelayMs * Math.pow(2, attempt - 1);
+      console.log(`[${RETRY_LABEL}] Attempt ${attempt}/${maxAttempts} failed, retrying in ${delayMs}ms`);
+      await sleep(delayMs);
+    }
+  }
+  throw lastError;
+};
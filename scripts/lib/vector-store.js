@@ -0,0 +1,198 @@
+// Binary embedding store, the same format as scripts/_vector_store.py:
+// <name>.vec is a 32-byte header (XVEC, version, dtype, dims, generation) followed by
+// fixed-width rows (float16, or float32 scale + int8); <name>.vec.idx is a JSON index
+// {version, generation, dtype, dims, rows, entries: [[row, id, timestamp, title]], meta?}.
+// Saving appends only rows the file does not hold yet and rewrites the file once dead
+// rows outnumber live ones.
+
+const VEC_STORE = { magic: 'XVEC', version: 1, headerBytes: 32, dtypes: { float16: 1, int8: 2 }, compactMinDead: 64 };
+
+const vecRowBytes = (dtype, dims) => (dtype === 'int8' ? 4 + dims : 2 * dims);
+
+// float16 bits -> number, for all 65536 patterns.
+const HALF_TO_FLOAT = (() => {
+  const table = new Float32Array(65536);
+  for (let h = 0; h < 65536; h++) {
+    const sign = h & 0x8000 ? -1 : 1;
+    const exp = (h >> 10) & 0x1f;
+    const frac = h & 0x3ff;
+    if (exp === 0) table[h] = sign * frac * 2 ** -24;
+    else if (exp === 31) table[h] = frac ? NaN : sign * Infinity;
+    else table[h] = sign * (1 + frac / 1024) * 2 ** (exp - 15);
+  }
+  return table;
+})();
+
+// number -> float16 bits, rounding to nearest even (as numpy does).
+const floatToHalf = (() => {
+  const f32 = new Float32Array(1);
+  const u32 = new Uint32Array(f32.buffer);
+  return (value) => {
+    f32[0] = value;
+    const bits = u32[0];
+    const sign = (bits >>> 16) & 0x8000;
+    const exp = ((bits >>> 23) & 0xff) - 112;
+    let mant = bits & 0x7fffff;
+    if (exp >= 31) return sign | 0x7c00 | (((bits >>> 23) & 0xff) === 0xff && mant ? 0x200 : 0);
+    let shift = 13;
+    if (exp <= 0) {
+      if (exp < -10) return sign;
+      mant |= 0x800000;
+      shift = 14 - exp;
+    }
+    const half = 1 << (shift - 1);
+    const rest = mant & ((1 << shift) - 1);
+    let out = mant >>> shift;
+    if (rest > half || (rest === half && (out & 1))) out += 1;
+    // A rounding carry out of the mantissa lands in the exponent (up to Infinity), as it should.
+    return sign | ((exp > 0 ? exp << 10 : 0) + out);
+  };
+})();
+
+const encodeVecRows = (embeddings, dtype, dims) => {
+  const width = vecRowBytes(dtype, dims);
+  const buf = Buffer.alloc(width * embeddings.length);
+  const halves = new Uint16Array(buf.buffer, buf.byteOffset, dtype === 'int8' ? 0 : buf.length / 2);
+  embeddings.forEach((embedding, n) => {
+    const base = n * width;
+    if (dtype === 'int8') {
+      let max = 0;
+      for (let i = 0; i < dims; i++) max = Math.max(max, Math.abs(embedding[i]));
+      const scale = Math.fround(max / 127);
+      buf.writeFloatLE(scale, base);
+      for (let i = 0; i < dims; i++) buf.writeInt8(scale > 0 ? Math.round(embedding[i] / scale) : 0, base + 4 + i);
+    } else {
+      for (let i = 0; i < dims; i++) halves[base / 2 + i] = floatToHalf(embedding[i]);
+    }
+  });
+  return buf;
+};
+
+// halves: the file's float16 words (little-endian, as on every host n8n runs on).
+const decodeVecRow = (buf, halves, offset, dtype, dims) => {
+  const out = new Array(dims);
+  if (dtype === 'int8') {
+    const scale = buf.readFloatLE(offset);
+    for (let i = 0; i < dims; i++) out[i] = buf.readInt8(offset + 4 + i) * scale;
+  } else {
+    const first = offset / 2;
+    for (let i = 0; i < dims; i++) out[i] = HALF_TO_FLOAT[halves[first + i]];
+  }
+  return out;
+};
+
+// What saveVecStore knows about the file: which (id, timestamp) sits in which row, the free-form
+// index `meta`, and (after readVecStore) the file contents for vecEmbedding.
+const newVecState = () => ({ generation: 0, dims: null, dtype: null, rows: 0, rowOf: new Map(), meta: {}, source: null });
+
+// { entries: [{id, title, timestamp, row}], state } without decoding any vector; entries is
+// empty when the files are missing or do not agree.
+const readVecStore = (fs, vecPath) => {
+  const state = newVecState();
+  if (!fs.existsSync(vecPath) || !fs.existsSync(`${vecPath}.idx`)) return { entries: [], state };
+  const index = JSON.parse(fs.readFileSync(`${vecPath}.idx`, 'utf8'));
+  const buf = fs.readFileSync(vecPath);
+  const codes = Object.fromEntries(Object.entries(VEC_STORE.dtypes).map(([name, code]) => [code, name]));
+  if (buf.length < VEC_STORE.headerBytes || buf.toString('latin1', 0, 4) !== VEC_STORE.magic
+    || buf.readUInt16LE(4) !== VEC_STORE.version || !codes[buf.readUInt16LE(6)]) {
+    throw new Error(`${vecPath}: not an XVEC v${VEC_STORE.version} embedding store`);
+  }
+  const dtype = codes[buf.readUInt16LE(6)];
+  const dims = buf.readUInt32LE(8);
+  const generation = buf.readUInt32LE(12);
+  const rows = Number(index.rows) || 0;
+  state.generation = Math.max(generation, Number(index.generation) || 0);
+  if (index.generation !== generation || index.dims !== dims || index.dtype !== dtype
+    || buf.length < VEC_STORE.headerBytes + rows * vecRowBytes(dtype, dims)) {
+    return { entries: [], state };
+  }
+  const words = Math.floor(buf.length / 2);
+  const halves = buf.byteOffset % 2 === 0
+    ? new Uint16Array(buf.buffer, buf.byteOffset, words)
+    : new Uint16Array(buf.buffer.slice(buf.byteOffset, buf.byteOffset + 2 * words));
+  Object.assign(state, { dims, dtype, rows, meta: index.meta || {}, source: { buf, halves } });
+  const entries = [];
+  for (const [row, id, timestamp, title] of index.entries || []) {
+    if (!(row >= 0 && row < rows)) continue;
+    state.rowOf.set(`${id}\n${timestamp}`, row);
+    entries.push({ id, title, timestamp, row });
+  }
+  return { entries, state };
+};
+
+// The vector in `row` of the file readVecStore read, as a plain array.
+const vecEmbedding = (state, row) => decodeVecRow(
+  state.source.buf, state.source.halves, VEC_STORE.headerBytes + row * vecRowBytes(state.dtype, state.dims), state.dtype, state.dims
+);
+
+// { embeddings: [{id, embedding, title, timestamp}], state } with every vector decoded.
+const loadVecStore = (fs, vecPath) => {
+  const { entries, state } = readVecStore(fs, vecPath);
+  const embeddings = entries.map(({ id, title, timestamp, row }) => ({ id, title, timestamp, embedding: vecEmbedding(state, row) }));
+  return { embeddings, state };
+};
+
+// Persist exactly `embeddings`; returns { appended, compacted, rows, live } and updates state.
+// An entry read by readVecStore may leave `embedding` out: its row is already on disk.
+const saveVecStore = (fs, vecPath, embeddings, state, dtype = 'float16', meta = state.meta) => {
+  if (!VEC_STORE.dtypes[dtype]) throw new Error(`unknown store dtype ${dtype}`);
+  const keyOf = (e) => `${e.id}\n${e.timestamp}`;
+  const dimsOf = (e) => (e.embedding ? e.embedding.length : (state.rowOf.has(keyOf(e)) ? state.dims : -1));
+  // The newest entry (by timestamp, not position: callers may sort either way) decides the
+  // dimension; a model change leaves older vectors incomparable.
+  let newest = null;
+  for (const e of embeddings) {
+    if (dimsOf(e) >= 0 && (newest === null || (e.timestamp || 0) >= (newest.timestamp || 0))) newest = e;
+  }
+  const dims = newest ? dimsOf(newest) : (state.dims || 0);
+  const live = embeddings.filter((e) => dimsOf(e) === dims);
+  const keys = live.map(keyOf);
+  const fresh = live.map((e, n) => n).filter((n) => !state.rowOf.has(keys[n]));
+  const dead = state.rows + fresh.length - live.length;
+  const rewrite = state.dims !== dims || state.dtype !== dtype || !fs.existsSync(vecPath)
+    || (dead > live.length && dead >= VEC_STORE.compactMinDead);
+
+  let rows;
+  let appended;
+  if (rewrite) {
+    state.generation += 1;
+    const header = Buffer.alloc(VEC_STORE.headerBytes);
+    header.write(VEC_STORE.magic, 0, 'latin1');
+    header.writeUInt16LE(VEC_STORE.version, 4);
+    header.writeUInt16LE(VEC_STORE.dtypes[dtype], 6);
+    header.writeUInt32LE(dims, 8);
+    header.writeUInt32LE(state.generation, 12);
+    const vectors = live.map((e, n) => e.embedding || vecEmbedding(state, state.rowOf.get(keys[n])));
+    const tmpPath = `${vecPath}.tmp`;
+    fs.writeFileSync(tmpPath, Buffer.concat([header, encodeVecRows(vectors, dtype, dims)]));
+    fs.renameSync(tmpPath, vecPath);
+    rows = live.map((e, n) => n);
+    // Rows were renumbered: what readVecStore read no longer matches the file.
+    Object.assign(state, { dims, dtype, rows: live.length, source: null });
+    appended = live.length;
+  } else {
+    rows = keys.map((key) => state.rowOf.get(key) ?? -1);
+    fresh.forEach((n, offset) => { rows[n] = state.rows + offset; });
+    // Anything past the indexed rows is an append whose index never landed.
+    fs.truncateSync(vecPath, VEC_STORE.headerBytes + state.rows * vecRowBytes(dtype, dims));
+    if (fresh.length) fs.appendFileSync(vecPath, encodeVecRows(fresh.map((n) => live[n].embedding), dtype, dims));
+    state.rows += fresh.length;
+    appended = fresh.length;
+  }
+
+  state.rowOf = new Map(keys.map((key, n) => [key, rows[n]]));
+  state.meta = meta || {};
+  const index = {
+    version: VEC_STORE.version,
+    generation: state.generation,
+    dtype,
+    dims,
+    rows: state.rows,
+    entries: live.map((e, n) => [rows[n], e.id, e.timestamp, e.title || ''])
+  };
+  if (Object.keys(state.meta).length) index.meta = state.meta;
+  const tmpIndex = `${vecPath}.idx.tmp`;
+  fs.writeFileSync(tmpIndex, JSON.stringify(index));
+  fs.renameSync(tmpIndex, `${vecPath}.idx`);
+  return { appended, compacted: rewrite, rows: state.rows, live: live.length };
+};
@@ -162,13 +162,7 @@ if (xSelected.length < xQuota) {
 
 const selected = xSelected.concat(rssItems.slice(0, rssQuota));
 
-const chunk = (arr, size) => {
-  const chunks = [];
-  for (let i = 0; i < arr.length; i += size) {
-    chunks.push(arr.slice(i, i + size));
-  }
-  return chunks;
-};
+// @include chunk
 
 const parseJson = (content) => {
   if (!content) return null;
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for the Daily Pack webhook.
+
+Fires N correlated webhook triggers (burst / uniform / poisson arrivals,
+at most --concurrency runs in flight), follows every resulting execution in
+n8n's SQLite from one poller thread, and reports throughput, queueing delay,
+end-to-end latency percentiles and per-node contention (node time under
+load vs. the recent solo baseline, and how many runs overlapped it).
+
+Run against the stand-in (no live n8n needed):
+  python3 scripts/load_test_daily_pack.py --standin --run-seconds 5 --triggers 12 --concurrency 4
+Against a real instance (uses N8N_* / WEBHOOK_* / N8N_DB_PATH from .env):
+  python3 scripts/load_test_daily_pack.py --triggers 4 --concurrency 2 --arrival uniform --rate 0.05
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from _env import load_env
+from _n8n_api import build_client
+from _n8n_db import (
+    TERMINAL_STATUSES,
+    connect,
+    execution_result,
+    executions_by_id,
+    executions_since,
+    load_execution_data,
+    parse_iso,
+    recent_executions,
+)
+from _n8n_tracker import correlation_of, new_correlation_id
+from _progress import StageProfile, stage_timings
+from n8n_standin import add_state_args, build_state, percentile, standin_env, start_server
+from trigger_daily_pack import run_webhook_execute
+
+
+@dataclass
+class TriggerRecord:
+    index: int
+    correlation_id: str
+    scheduled_offset: float
+    fired_at: Optional[float] = None
+    acked_at: Optional[float] = None
+    error: Optional[str] = None
+    execution_id: Optional[int] = None
+    status: Optional[str] = None
+    started_at: Optional[float] = None
+    stopped_at: Optional[float] = None
+    # node -> (start epoch s, end epoch s, busy s)
+    nodes: Dict[str, Tuple[float, float, float]] = field(default_factory=dict)
+
+    @property
+    def done(self) -> bool:
+        return self.error is not None or self.status is not None
+
+
+def _arrival_offsets(count: int, pattern: str, rate: float, seed: Optional[int]) -> List[float]:
+    if pattern == "burst" or rate <= 0:
+        return [0.0] * count
+    if pattern == "uniform":
+        return [i / rate for i in range(count)]
+    rng = random.Random(seed)
+    offsets, cursor = [], 0.0
+    for _ in range(count):
+        offsets.append(cursor)
+        cursor += rng.expovariate(rate)
+    return offsets
+
+
+def _epoch(value: Optional[str]) -> Optional[float]:
+    parsed = parse_iso(value)
+    return parsed.timestamp() if parsed else None
+
+
+def _node_windows(run_data: Dict[str, Any]) -> Dict[str, Tuple[float, float, float]]:
+    windows = {}
+    for name, runs in run_data.items():
+        if not isinstance(runs, list) or not runs:
+            continue
+        start = min(int(r.get("startTime") or 0) for r in runs) / 1000.0
+        end = max(int(r.get("startTime") or 0) + int(r.get("executionTime") or 0) for r in runs) / 1000.0
+        busy = sum(int(r.get("executionTime") or 0) for r in runs) / 1000.0
+        windows[name] = (start, end, busy)
+    return windows
+
+
+class _Follower(threading.Thread):
+    """Single poller matching new executions to triggers by correlation id."""
+
+    def __init__(
+        self,
+        workflow_id: str,
+        watermark: int,
+        records: Dict[str, TriggerRecord],
+        slots: threading.Semaphore,
+        poll_seconds: float,
+    ) -> None:
+        super().__init__(name="load-test-follower", daemon=True)
+        self.workflow_id = workflow_id
+        self.watermark = watermark
+        self.records = records
+        self.slots = slots
+        self.poll_seconds = poll_seconds
+        self.unmatched: Dict[int, Any] = {}
+        self.tracked: Dict[int, TriggerRecord] = {}
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+
+    def _finish(self, record: TriggerRecord, row: Any, run_data: Dict[str, Any]) -> None:
+        with self.lock:
+            record.status = row["status"]
+            record.started_at = _epoch(row["startedAt"])
+            record.stopped_at = _epoch(row["stoppedAt"])
+            record.nodes = _node_windows(run_data)
+        self.slots.release()
+
+    def _poll(self, conn: Any) -> None:
+        while True:
+            rows = executions_since(conn, self.watermark, limit=500)
+            if not rows:
+                break
+            for row in rows:
+                self.watermark = max(self.watermark, int(row["id"]))
+                if row["workflowId"] == self.workflow_id:
+                    self.unmatched[int(row["id"])] = row
+
+        statuses = {int(r["id"]): r["status"] for r in executions_by_id(conn, list(self.unmatched))}
+        for execution_id in list(self.unmatched):
+            payload = load_execution_data(conn, execution_id)
+            _, run_data, _ = execution_result(payload) if payload else (None, {}, None)
+            found = correlation_of({"data": {"resultData": {"runData": run_data}}})
+            if found is None:
+                # The trigger node runs first, so once any node has run data the echo is final:
+                # drop it now rather than decoding it again every tick until it finishes.
+                if run_data or statuses.get(execution_id) in TERMINAL_STATUSES or execution_id not in statuses:
+                    del self.unmatched[execution_id]
+                continue
+            del self.unmatched[execution_id]
+            record = self.records.get(found)
+            if record is not None:
+                record.execution_id = execution_id
+                self.tracked[execution_id] = record
+
+        for row in executions_by_id(conn, list(self.tracked)):
+            if row["status"] in TERMINAL_STATUSES:
+                record = self.tracked.pop(int(row["id"]))
+                payload = load_execution_data(conn, int(row["id"]))
+                _, run_data, _ = execution_result(payload) if payload else (None, {}, None)
+                self._finish(record, row, run_data)
+
+    def run(self) -> None:
+        conn = connect()
+        try:
+            while not self.stop.is_set():
+                self._poll(conn)
+                self.stop.wait(self.poll_seconds)
+        finally:
+            conn.close()
+
+
+def _baseline(workflow_id: str, samples: int) -> StageProfile:
+    conn = connect()
+    try:
+        timings = []
+        for row in recent_executions(conn, workflow_id, limit=samples * 4):
+            if row["status"] != "success":
+                continue
+            payload = load_execution_data(conn, int(row["id"]))
+            if payload:
+                timings.append(stage_timings(execution_result(payload)[1]))
+            if len(timings) >= samples:
+                break
+        return StageProfile.from_timings(timings)
+    finally:
+        conn.close()
+
+
+def _stats(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": max(values),
+    }
+
+
+def _overlap(records: List[TriggerRecord], record: TriggerRecord, at: float) -> int:
+    return sum(
+        1
+        for other in records
+        if other is not record and other.started_at and other.stopped_at and other.started_at <= at <= other.stopped_at
+    )
+
+
+def _report(records: List[TriggerRecord], baseline: StageProfile, args: argparse.Namespace) -> Dict[str, Any]:
+    completed = [r for r in records if r.status is not None]
+    ok = [r for r in completed if r.status == "success"]
+    fired = [r.fired_at for r in records if r.fired_at]
+    stops = [r.stopped_at for r in completed if r.stopped_at]
+    span = (max(stops) - min(fired)) if fired and stops else 0.0
+
+    # Peak concurrency: sweep over execution start/stop events.
+    events = sorted(
+        [(r.started_at, 1) for r in completed if r.started_at] + [(r.stopped_at, -1) for r in completed if r.stopped_at]
+    )
+    peak = running = 0
+    for _, delta in events:
+        running += delta
+        peak = max(peak, running)
+
+    nodes: Dict[str, Dict[str, Any]] = {}
+    names = sorted({name for r in ok for name in r.nodes})
+    for name in names:
+        busy = [r.nodes[name][2] for r in ok if name in r.nodes]
+        overlaps = [
+            _overlap(ok, r, (r.nodes[name][0] + r.nodes[name][1]) / 2.0) for r in ok if name in r.nodes
+        ]
+        base = baseline.duration.get(name)
+        p50 = percentile(busy, 0.50)
+        nodes[name] = {
+            "runs": len(busy),
+            "p50_seconds": p50,
+            "p95_seconds": percentile(busy, 0.95),
+            "baseline_seconds": base,
+            "slowdown": (p50 / base) if base else None,
+            "avg_overlap": sum(overlaps) / len(overlaps),
+        }
+
+    return {
+        "triggers": len(records),
+        "concurrency": args.concurrency,
+        "arrival": args.arrival,
+        "rate": args.rate,
+        "completed": len(completed),
+        "succeeded": len(ok),
+        "failed": len([r for r in records if r.error or (r.status and r.status != "success")]),
+        "timeouts": len([r for r in records if not r.done]),
+        "span_seconds": span,
+        "throughput_per_minute": (len(completed) / span * 60.0) if span > 0 else None,
+        "peak_concurrent_executions": peak,
+        "ack_latency": _stats([r.acked_at - r.fired_at for r in records if r.acked_at and r.fired_at]),
+        "queue_delay": _stats([r.started_at - r.fired_at for r in completed if r.started_at and r.fired_at]),
+        "e2e_latency": _stats([r.stopped_at - r.fired_at for r in completed if r.stopped_at and r.fired_at]),
+        "nodes": nodes,
+        "errors": [f"#{r.index}: {r.error}" for r in records if r.error],
+    }
+
+
+def _fmt_stats(stats: Dict[str, Optional[float]]) -> str:
+    return " ".join(f"{k}={v:.3f}s" if v is not None else f"{k}=-" for k, v in stats.items())
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"[load-test] triggers={report['triggers']} concurrency={report['concurrency']}"
+        f" arrival={report['arrival']} rate={report['rate']}/s"
+        f" succeeded={report['succeeded']} failed={report['failed']} timeouts={report['timeouts']}"
+    )
+    throughput = report["throughput_per_minute"]
+    print(
+        f"[load-test] throughput={throughput:.2f} runs/min" if throughput is not None else "[load-test] throughput=-",
+        f"span={report['span_seconds']:.1f}s peak_concurrent_executions={report['peak_concurrent_executions']}",
+    )
+    print("[load-test] ack_latency:", _fmt_stats(report["ack_latency"]))
+    print("[load-test] queue_delay:", _fmt_stats(report["queue_delay"]))
+    print("[load-test] e2e_latency:", _fmt_stats(report["e2e_latency"]))
+    ranked = sorted(report["nodes"].items(), key=lambda kv: -(kv[1]["slowdown"] or 0.0))
+    if ranked:
+        print("[load-test] node contention (by slowdown vs baseline):")
+    for name, node in ranked[:10]:
+        base = f"{node['baseline_seconds']:.2f}s" if node["baseline_seconds"] is not None else "-"
+        slowdown = f"x{node['slowdown']:.2f}" if node["slowdown"] is not None else "-"
+        print(
+            f"  - {name}: p50={node['p50_seconds']:.2f}s p95={node['p95_seconds']:.2f}s"
+            f" baseline={base} slowdown={slowdown} avg_overlap={node['avg_overlap']:.1f}"
+        )
+    for error in report["errors"]:
+        print("[load-test] ERROR", error)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Concurrent load test for the Daily Pack webhook")
+    parser.add_argument("--triggers", type=int, default=8, help="Number of webhook triggers to fire")
+    parser.add_argument("--concurrency", type=int, default=2, help="Max runs in flight at once")
+    parser.add_argument("--arrival", choices=("burst", "uniform", "poisson"), default="burst")
+    parser.add_argument("--rate", type=float, default=1.0, help="Arrivals per second for uniform/poisson")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for poisson arrivals")
+    parser.add_argument("--timeout", type=float, default=900.0, help="Seconds to wait after the last arrival")
+    parser.add_argument("--poll-seconds", type=float, default=0.2)
+    parser.add_argument("--baseline-samples", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    parser.add_argument("--standin", action="store_true", help="Run against an in-process n8n stand-in")
+    add_state_args(parser)
+    args = parser.parse_args()
+
+    server = None
+    if args.standin:
+        state = build_state(args)
+        server = start_server(state)
+        os.environ.update(standin_env(state, server))
+        print(f"[load-test] stand-in on port {server.server_address[1]} run_seconds={args.run_seconds}")
+    else:
+        load_env()
+
+    client = build_client()
+    daily = client.find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
+    if not daily:
+        raise SystemExit("Daily Pack workflow not found")
+    workflow_id = daily["id"]
+
+    baseline = _baseline(workflow_id, args.baseline_samples)
+    conn = connect()
+    row = conn.execute("select max(id) as max_id from execution_entity").fetchone()
+    watermark = int(row["max_id"] or 0) if row else 0
+    conn.close()
+
+    offsets = _arrival_offsets(args.triggers, args.arrival, args.rate, args.seed)
+    records = {cid: TriggerRecord(i, cid, off) for i, (cid, off) in enumerate((new_correlation_id(), o) for o in offsets)}
+    ordered = sorted(records.values(), key=lambda r: r.scheduled_offset)
+    slots = threading.Semaphore(max(1, args.concurrency))
+    follower = _Follower(workflow_id, watermark, records, slots, args.poll_seconds)
+    follower.start()
+
+    def fire(record: TriggerRecord) -> None:
+        record.fired_at = time.time()
+        try:
+            run_webhook_execute(record.correlation_id)
+            record.acked_at = time.time()
+        except Exception as exc:  # pragma: no cover - network variability
+            record.error = str(exc)
+            slots.release()
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, args.concurrency), thread_name_prefix="load-test") as pool:
+        for record in ordered:
+            time.sleep(max(0.0, record.scheduled_offset - (time.monotonic() - started)))
+            if not slots.acquire(timeout=args.timeout):
+                record.error = "no free slot within timeout (earlier runs never finished)"
+                continue
+            pool.submit(fire, record)
+
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline and not all(r.done for r in ordered):
+        time.sleep(args.poll_seconds)
+    follower.stop.set()
+    follower.join(timeout=5)
+    if server is not None:
+        server.shutdown()
+
+    with follower.lock:
+        report = _report(ordered, baseline, args)
+    if args.json:
+        print(json.dumps({**report, "records": [asdict(r) for r in ordered]}, sort_keys=True))
+    else:
+        _print_report(report)
+    return 1 if report["failed"] or report["timeouts"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
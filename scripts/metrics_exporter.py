@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Prometheus exporter for n8n execution and probe metrics.
+
+Reads execution_entity/execution_data incrementally (a global id watermark,
+plus re-checks of executions that were still running) and keeps counters and
+histograms in memory (the last success per workflow is seeded from the whole
+table), so a scrape costs one indexed query plus rendering.
+Probe results come from a warm ProbeSession that a background thread
+refreshes every --probe-interval seconds; a scrape only renders the cached
+result and never waits on n8n or Slack. Workflow names (the `workflow`
+label) are listed once before serving and refreshed with each probe.
+
+Run:
+  python3 scripts/metrics_exporter.py --port 9464
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+from _env import load_env
+from _n8n_db import (
+    TERMINAL_STATUSES,
+    connect,
+    execution_result,
+    executions_by_id,
+    executions_since,
+    last_success_started,
+    load_execution_data,
+    node_item_count,
+    parse_iso,
+)
+from probe_daily_pack import ProbeResult, ProbeSession
+
+
+WORKFLOW_BUCKETS = (10, 30, 60, 120, 300, 600, 900, 1800, 3600)
+NODE_BUCKETS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+class Histogram:
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+
+    def render(self, name: str, labels: Dict[str, str]) -> List[str]:
+        lines = []
+        for bound, count in zip(self.buckets, self.counts):
+            lines.append(f"{name}_bucket{_labels({**labels, 'le': _fmt(bound)})} {count}")
+        lines.append(f"{name}_bucket{_labels({**labels, 'le': '+Inf'})} {self.count}")
+        lines.append(f"{name}_sum{_labels(labels)} {_fmt(self.sum)}")
+        lines.append(f"{name}_count{_labels(labels)} {self.count}")
+        return lines
+
+
+def _fmt(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    parts = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        parts.append(f'{key}="{escaped}"')
+    return "{" + ",".join(parts) + "}"
+
+
+class ExecutionMetrics:
+    """Execution aggregates updated from the execution_entity id watermark."""
+
+    def __init__(self, window: int = 30) -> None:
+        self.conn = connect()
+        self.window = window
+        self.watermark = 0
+        self.pending: Dict[int, str] = {}
+        self.status_totals: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.durations: Dict[str, Histogram] = defaultdict(lambda: Histogram(WORKFLOW_BUCKETS))
+        self.last_duration: Dict[str, float] = {}
+        self.last_success_at: Dict[str, dt.datetime] = {}
+        self.recent: Dict[str, Deque[str]] = defaultdict(lambda: deque(maxlen=self.window))
+        self.node_items: Dict[Tuple[str, str], int] = {}
+        self.node_items_total: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.node_errors_total: Dict[Tuple[str, str], int] = defaultdict(int)
+        self.node_durations: Dict[Tuple[str, str], Histogram] = defaultdict(lambda: Histogram(NODE_BUCKETS))
+        self.last_refresh_seconds = 0.0
+
+    def bootstrap(self, executions: int) -> None:
+        row = self.conn.execute("select max(id) as max_id from execution_entity").fetchone()
+        max_id = int(row["max_id"] or 0) if row else 0
+        self.watermark = max(0, max_id - executions)
+        # The last success can be older than the replayed window (e.g. a week of failures).
+        for row in last_success_started(self.conn):
+            started_at = parse_iso(row["startedAt"])
+            if started_at:
+                self.last_success_at[row["workflowId"]] = started_at
+        self.refresh()
+
+    def refresh(self) -> None:
+        started = time.perf_counter()
+        if self.pending:
+            for row in executions_by_id(self.conn, list(self.pending)):
+                if row["status"] in TERMINAL_STATUSES:
+                    self._record(row, self.pending.pop(int(row["id"])))
+        while True:
+            rows = executions_since(self.conn, self.watermark, limit=500)
+            if not rows:
+                break
+            for row in rows:
+                execution_id = int(row["id"])
+                self.watermark = max(self.watermark, execution_id)
+                if row["status"] in TERMINAL_STATUSES:
+                    self._record(row, row["workflowId"])
+                else:
+                    self.pending[execution_id] = row["workflowId"]
+        self.last_refresh_seconds = time.perf_counter() - started
+
+    def _record(self, row: Any, workflow_id: str) -> None:
+        status = row["status"]
+        self.status_totals[(workflow_id, status)] += 1
+        self.recent[workflow_id].append(status)
+
+        started_at = parse_iso(row["startedAt"])
+        stopped_at = parse_iso(row["stoppedAt"])
+        if started_at and stopped_at:
+            seconds = max(0.0, (stopped_at - started_at).total_seconds())
+            self.durations[workflow_id].observe(seconds)
+            self.last_duration[workflow_id] = seconds
+        if status == "success" and started_at:
+            previous = self.last_success_at.get(workflow_id)
+            if previous is None or started_at > previous:
+                self.last_success_at[workflow_id] = started_at
+
+        payload = load_execution_data(self.conn, int(row["id"]))
+        if not payload:
+            return
+        _, run_data, _ = execution_result(payload)
+        for node, runs in run_data.items():
+            if not isinstance(runs, list) or not runs:
+                continue
+            key = (workflow_id, node)
+            items = node_item_count(runs[-1])
+            self.node_items[key] = items
+            self.node_items_total[key] += items
+            for run in runs:
+                if run.get("error"):
+                    self.node_errors_total[key] += 1
+                if run.get("executionTime") is not None:
+                    self.node_durations[key].observe(float(run["executionTime"]) / 1000.0)
+
+    def render(self, names: Dict[str, str]) -> List[str]:
+        def wf(workflow_id: str) -> str:
+            return names.get(workflow_id, workflow_id)
+
+        now = dt.datetime.now(tz=dt.timezone.utc)
+        lines = [
+            "# HELP n8n_executions_total Finished executions by workflow and status",
+            "# TYPE n8n_executions_total counter",
+        ]
+        for (workflow_id, status), count in sorted(self.status_totals.items()):
+            lines.append(f"n8n_executions_total{_labels({'workflow': wf(workflow_id), 'status': status})} {count}")
+
+        lines += [
+            "# HELP workflow_duration_seconds Execution wall time (startedAt to stoppedAt)",
+            "# TYPE workflow_duration_seconds histogram",
+        ]
+        for workflow_id, hist in sorted(self.durations.items()):
+            lines += hist.render("workflow_duration_seconds", {"workflow": wf(workflow_id)})
+
+        lines += [
+            "# HELP workflow_last_duration_seconds Wall time of the most recent finished execution",
+            "# TYPE workflow_last_duration_seconds gauge",
+        ]
+        for workflow_id, seconds in sorted(self.last_duration.items()):
+            lines.append(f"workflow_last_duration_seconds{_labels({'workflow': wf(workflow_id)})} {_fmt(seconds)}")
+
+        lines += [
+            f"# HELP n8n_workflow_success_rate Success ratio over the last {self.window} finished executions",
+            "# TYPE n8n_workflow_success_rate gauge",
+        ]
+        for workflow_id, statuses in sorted(self.recent.items()):
+            rate = statuses.count("success") / len(statuses) if statuses else 0.0
+            lines.append(f"n8n_workflow_success_rate{_labels({'workflow': wf(workflow_id)})} {_fmt(rate)}")
+
+        lines += [
+            "# HELP n8n_workflow_last_success_age_seconds Seconds since the last successful execution started",
+            "# TYPE n8n_workflow_last_success_age_seconds gauge",
+        ]
+        for workflow_id, started_at in sorted(self.last_success_at.items()):
+            age = (now - started_at).total_seconds()
+            lines.append(f"n8n_workflow_last_success_age_seconds{_labels({'workflow': wf(workflow_id)})} {_fmt(age)}")
+
+        lines += [
+            "# HELP n8n_node_items Items emitted by the node in its latest execution",
+            "# TYPE n8n_node_items gauge",
+        ]
+        for (workflow_id, node), items in sorted(self.node_items.items()):
+            lines.append(f"n8n_node_items{_labels({'workflow': wf(workflow_id), 'node': node})} {items}")
+
+        lines += [
+            "# HELP n8n_node_items_total Items emitted by the node across executions",
+            "# TYPE n8n_node_items_total counter",
+        ]
+        for (workflow_id, node), items in sorted(self.node_items_total.items()):
+            lines.append(f"n8n_node_items_total{_labels({'workflow': wf(workflow_id), 'node': node})} {items}")
+
+        lines += [
+            "# HELP n8n_node_errors_total Node runs that recorded an error",
+            "# TYPE n8n_node_errors_total counter",
+        ]
+        for (workflow_id, node), count in sorted(self.node_errors_total.items()):
+            lines.append(f"n8n_node_errors_total{_labels({'workflow': wf(workflow_id), 'node': node})} {count}")
+
+        lines += [
+            "# HELP n8n_node_duration_seconds Node executionTime per run",
+            "# TYPE n8n_node_duration_seconds histogram",
+        ]
+        for (workflow_id, node), hist in sorted(self.node_durations.items()):
+            lines += hist.render("n8n_node_duration_seconds", {"workflow": wf(workflow_id), "node": node})
+
+        lines += [
+            "# HELP n8n_exporter_watermark Highest execution id processed",
+            "# TYPE n8n_exporter_watermark gauge",
+            f"n8n_exporter_watermark {self.watermark}",
+            "# HELP n8n_exporter_pending_executions Executions seen but not yet finished",
+            "# TYPE n8n_exporter_pending_executions gauge",
+            f"n8n_exporter_pending_executions {len(self.pending)}",
+            "# HELP n8n_exporter_refresh_seconds Time spent on the last incremental refresh",
+            "# TYPE n8n_exporter_refresh_seconds gauge",
+            f"n8n_exporter_refresh_seconds {_fmt(self.last_refresh_seconds)}",
+        ]
+        return lines
+
+
+class Exporter:
+    def __init__(self, window: int, bootstrap: int, probe_interval: float) -> None:
+        self.executions = ExecutionMetrics(window=window)
+        self.executions.bootstrap(bootstrap)
+        self.probe_interval = probe_interval
+        self.session: Optional[ProbeSession] = None
+        # Written by the probe thread, read by scrapes; swapped together under the lock.
+        self.workflow_names: Dict[str, str] = {}
+        self.probe_result: Optional[ProbeResult] = None
+        self.probe_error: Optional[str] = None
+        self.probe_seconds = 0.0
+        self._probed_at = 0.0
+        self._probe_lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _list_names(self) -> Dict[str, str]:
+        if self.session is None:
+            self.session = ProbeSession(workflow_refresh_seconds=self.probe_interval)
+        return {w["id"]: w.get("name") or w["id"] for w in self.session.client.list_workflows()}
+
+    def probe(self) -> None:
+        started = time.perf_counter()
+        names, result, error = self.workflow_names, self.probe_result, None
+        try:
+            names = self._list_names()
+            result = self.session.probe()
+        except (Exception, SystemExit) as exc:  # pragma: no cover - network variability
+            error = str(exc)
+        with self._probe_lock:
+            self.workflow_names, self.probe_result, self.probe_error = names, result, error
+            self.probe_seconds = time.perf_counter() - started
+            self._probed_at = time.monotonic()
+
+    def _probe_loop(self) -> None:
+        while not self._stop.is_set():
+            self.probe()
+            self._stop.wait(self.probe_interval)
+
+    def start(self) -> None:
+        # Names are the `workflow` label: loading them before the first scrape keeps
+        # a restart from briefly exporting id-labelled series that alerts don't match.
+        try:
+            self.workflow_names = self._list_names()
+        except (Exception, SystemExit) as exc:  # pragma: no cover - network variability
+            print(f"[metrics-exporter] workflow names unavailable, labelling by id until a probe loads them: {exc}")
+        threading.Thread(target=self._probe_loop, name="probe", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def render(self) -> str:
+        self.executions.refresh()
+        with self._probe_lock:
+            names, result, error = self.workflow_names, self.probe_result, self.probe_error
+            probe_seconds, probed_at = self.probe_seconds, self._probed_at
+        lines = self.executions.render(names)
+
+        lines += [
+            "# HELP x_daily_pack_probe_up Whether the last probe completed",
+            "# TYPE x_daily_pack_probe_up gauge",
+            f"x_daily_pack_probe_up {1 if probed_at and not error else 0}",
+            "# HELP x_daily_pack_probe_duration_seconds Wall time of the last probe",
+            "# TYPE x_daily_pack_probe_duration_seconds gauge",
+            f"x_daily_pack_probe_duration_seconds {_fmt(probe_seconds)}",
+            "# HELP x_daily_pack_probe_age_seconds Seconds since the last probe finished",
+            "# TYPE x_daily_pack_probe_age_seconds gauge",
+            f"x_daily_pack_probe_age_seconds {_fmt(time.monotonic() - probed_at if probed_at else -1)}",
+        ]
+        if result is not None:
+            lines += [
+                "# HELP x_daily_pack_probe_issues Issues reported by the last probe",
+                "# TYPE x_daily_pack_probe_issues gauge",
+                f"x_daily_pack_probe_issues {len(result.issues)}",
+                "# HELP x_daily_pack_probe_warnings Warnings reported by the last probe",
+                "# TYPE x_daily_pack_probe_warnings gauge",
+                f"x_daily_pack_probe_warnings {len(result.warnings)}",
+                "# HELP x_daily_pack_schedule_drift Live cron differs from EXPECTED_DAILY_PACK_CRON",
+                "# TYPE x_daily_pack_schedule_drift gauge",
+                f"x_daily_pack_schedule_drift {1 if result.schedule_drift else 0}",
+            ]
+            if result.slack_last_success_ok is not None:
+                lines += [
+                    "# HELP x_daily_pack_slack_last_success_ok Send to Slack reported success on the last success",
+                    "# TYPE x_daily_pack_slack_last_success_ok gauge",
+                    f"x_daily_pack_slack_last_success_ok {1 if result.slack_last_success_ok else 0}",
+                ]
+        return "\n".join(lines) + "\n"
+
+
+def _handler(exporter: Exporter) -> type:
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+            return
+
+        def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+            if self.path.split("?")[0] == "/healthz":
+                body = b"ok\n"
+                content_type = "text/plain; charset=utf-8"
+            elif self.path.split("?")[0] == "/metrics":
+                body = exporter.render().encode("utf-8")
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Serve n8n execution and probe metrics for Prometheus")
+    parser.add_argument("--host", default=os.environ.get("METRICS_EXPORTER_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("METRICS_EXPORTER_PORT", "9464")))
+    parser.add_argument("--window", type=int, default=30, help="Executions in the success-rate window")
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=200,
+        help="Execution ids replayed at startup to seed counters and histograms",
+    )
+    parser.add_argument(
+        "--probe-interval",
+        type=float,
+        default=60.0,
+        help="Seconds between background probe refreshes (scrapes serve the last result)",
+    )
+    args = parser.parse_args()
+
+    load_env()
+    exporter = Exporter(window=args.window, bootstrap=args.bootstrap, probe_interval=args.probe_interval)
+    exporter.start()
+    # Scrapes are serialized on purpose: the exporter owns one SQLite handle.
+    server = HTTPServer((args.host, args.port), _handler(exporter))
+    print(f"[metrics-exporter] serving http://{args.host}:{args.port}/metrics watermark={exporter.executions.watermark}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        exporter.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -183,23 +183,10 @@ const maxRetries = Number.parseInt($env.NEWS_API_RETRY_MAX_ATTEMPTS || '2', 10);
 const retryDelayMs = Number.parseInt($env.NEWS_API_RETRY_INITIAL_DELAY_MS || '400', 10);
 const requestTimeoutMs = Number.parseInt($env.NEWS_API_REQUEST_TIMEOUT_MS || '10000', 10);
 
-// Exponential backoff retry function
-const retryWithBackoff = async (fn, maxAttempts = maxRetries, initialDelayMs = retryDelayMs) => {
-  let lastError;
-  for (let attempt = 1; attempt <= maxAttempts; attempt++) {
-    try {
-      return await fn();
-    } catch (error) {
-      lastError = error;
-      const isRetryable = /timeout|ETIMEDOUT|ECONNRESET|ECONNREFUSED|429|503|502|rate limit/i.test(error.message);
-      if (!isRetryable || attempt === maxAttempts) throw error;
-      const delayMs = initialDelayMs * Math.pow(2, attempt - 1);
-      console.log(`[NewsAPI Retry] Attempt ${attempt}/${maxAttempts} failed, retrying in ${delayMs}ms`);
-      await new Promise(r => setTimeout(r, delayMs));
-    }
-  }
-  throw lastError;
-};
+const RETRY_LABEL = 'NewsAPI Retry';
+const RETRYABLE_ERROR = /timeout|ETIMEDOUT|ECONNRESET|ECONNREFUSED|429|503|502|rate limit/i;
+
+// @include retryWithBackoff
 
 const allArticles = [];
 const errors = [];
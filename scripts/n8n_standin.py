@@ -0,0 +1,864 @@
+#!/usr/bin/env python3
+"""
+n8n stand-in server for offline benchmarking of the ops scripts.
+
+Serves the subset of n8n the Python tooling talks to:
+- /api/v1/workflows (list / get / PUT)
+- /api/v1/executions (list / get, with includeData)
+- /webhook/<path> (starts a replayed execution)
+
+State comes from recorded fixtures (or the repo's workflows/*.json when no
+fixtures exist) and executions live in a scratch SQLite DB shaped like n8n's
+execution_entity / execution_data tables, so the scripts can point
+N8N_DB_PATH at it unchanged.
+
+Run:
+  python3 scripts/n8n_standin.py record --out logs/standin-fixtures
+  python3 scripts/n8n_standin.py serve --fixtures logs/standin-fixtures --latency-ms 40
+  python3 scripts/n8n_standin.py bench --runs 5 --baseline logs/standin-bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import datetime as dt
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.parse
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from _n8n_db import execution_result, flatten_refs
+
+
+ROOT = Path(__file__).resolve().parents[1]
+WORKFLOWS_DIR = ROOT / "workflows"
+
+DEFAULT_API_KEY = "standin-api-key"
+# How often a playing execution re-reads the number of runs in flight.
+PLAY_TICK_SECONDS = 0.05
+DEFAULT_WEBHOOK_SECRET = "standin-webhook-secret"
+
+SCHEMA = """
+create table if not exists execution_entity (
+    id integer primary key autoincrement,
+    finished boolean not null default 0,
+    mode varchar not null default 'trigger',
+    retryOf varchar,
+    retrySuccessId varchar,
+    startedAt datetime,
+    stoppedAt datetime,
+    waitTill datetime,
+    status varchar not null,
+    workflowId varchar not null,
+    deletedAt datetime,
+    createdAt datetime
+);
+create index if not exists idx_execution_entity_workflow_id
+    on execution_entity (workflowId, id);
+create table if not exists execution_data (
+    executionId integer primary key,
+    workflowData text not null,
+    data text not null
+);
+"""
+
+# Scripts exercised by `bench`, with the exit code a healthy stand-in yields.
+BENCH_SCRIPTS: List[Tuple[str, List[str], int]] = [
+    ("deploy", ["deploy_daily_pack.py"], 0),
+    ("drift-check", ["drift_check_daily_pack.py"], 0),
+    ("probe", ["probe_daily_pack.py"], 0),
+    ("trigger", ["trigger_daily_pack.py", "--trigger", "webhook"], 0),
+]
+
+
+def _utc_now() -> dt.datetime:
+    return dt.datetime.now(tz=dt.timezone.utc)
+
+
+def _db_timestamp(value: dt.datetime) -> str:
+    # n8n's SQLite driver stores UTC timestamps without an offset.
+    return value.astimezone(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
+
+
+def _api_timestamp(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    parsed = dt.datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt.timezone.utc)
+    return parsed.astimezone(dt.timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f")[:-3] + "Z"
+
+
+def _webhook_path(workflow: Dict[str, Any]) -> Optional[str]:
+    for node in workflow.get("nodes", []):
+        if node.get("type") == "n8n-nodes-base.webhook":
+            return (node.get("parameters") or {}).get("path")
+    return None
+
+
+def _synthetic_run_data(
+    workflow: Dict[str, Any], started: dt.datetime, duration_ms: Optional[float] = None
+) -> Dict[str, Any]:
+    """Build plausible runData for every node, in connection order (spanning `duration_ms` when given)."""
+    nodes = [n for n in workflow.get("nodes", []) if n.get("name")]
+    start_ms = int(started.timestamp() * 1000)
+    run_data: Dict[str, Any] = {}
+    cursor = start_ms
+    for index, node in enumerate(nodes):
+        name = node["name"]
+        execution_time = 50 if "trigger" in (node.get("type") or "").lower() else 400 + 150 * index
+        items = [{"json": {"title": f"{name} item {i}", "url": f"https://example.invalid/{index}/{i}"}} for i in range(3)]
+        if name == "Send to Slack":
+            items = [{"json": {"success": True, "message_ts": f"{started.timestamp():.6f}"}}]
+        run_data[name] = [
+            {
+                "startTime": cursor,
+                "executionTime": execution_time,
+                "executionStatus": "success",
+                "source": [],
+                "data": {"main": [items]},
+            }
+        ]
+        cursor += execution_time
+    data = {"resultData": {"runData": run_data, "lastNodeExecuted": nodes[-1]["name"] if nodes else None}}
+    return _shift_run_data(data, started, duration_ms) if duration_ms else data
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    conn.executescript(SCHEMA)
+    conn.commit()
+
+
+def insert_execution(
+    conn: sqlite3.Connection,
+    workflow: Dict[str, Any],
+    data: Dict[str, Any],
+    status: str,
+    started: dt.datetime,
+    stopped: Optional[dt.datetime],
+    mode: str = "trigger",
+) -> int:
+    cur = conn.execute(
+        """
+        insert into execution_entity (finished, mode, startedAt, stoppedAt, status, workflowId, createdAt)
+        values (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            1 if stopped else 0,
+            mode,
+            _db_timestamp(started),
+            _db_timestamp(stopped) if stopped else None,
+            status,
+            workflow["id"],
+            _db_timestamp(started),
+        ),
+    )
+    execution_id = int(cur.lastrowid)
+    conn.execute(
+        "insert into execution_data (executionId, workflowData, data) values (?, ?, ?)",
+        (execution_id, json.dumps(workflow), json.dumps(flatten_refs(data))),
+    )
+    conn.commit()
+    return execution_id
+
+
+def load_fixtures(fixtures_dir: Optional[Path]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Return (workflows, executions) from a `record` directory or the repo's workflows/."""
+    if fixtures_dir and (fixtures_dir / "workflows.json").exists():
+        workflows = json.loads((fixtures_dir / "workflows.json").read_text(encoding="utf-8"))
+        executions_path = fixtures_dir / "executions.json"
+        executions = (
+            json.loads(executions_path.read_text(encoding="utf-8")) if executions_path.exists() else []
+        )
+        return workflows, executions
+
+    workflows = []
+    for path in sorted(WORKFLOWS_DIR.glob("*.json")):
+        workflow = json.loads(path.read_text(encoding="utf-8"))
+        workflow.setdefault("id", f"standin-{path.stem}")
+        workflows.append(workflow)
+    return workflows, []
+
+
+@dataclass
+class StandinState:
+    db_path: Path
+    api_key: str = DEFAULT_API_KEY
+    webhook_secret: Optional[str] = DEFAULT_WEBHOOK_SECRET
+    webhook_header: str = "X-Webhook-Secret"
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    route_latency_ms: Dict[str, float] = field(default_factory=dict)
+    run_seconds: float = 0.0
+    # Per-run spread of run_seconds (±fraction) and the slowdown each other in-flight run adds.
+    run_jitter: float = 0.0
+    contention: float = 0.0
+    workflows: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    run_templates: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    active_runs: int = 0
+
+    def connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def solo_run_ms(self) -> float:
+        """How long one webhook run takes on its own: run_seconds, give or take run_jitter."""
+        return self.run_seconds * 1000.0 * (1.0 + random.uniform(-self.run_jitter, self.run_jitter))
+
+    def seed(self, workflows: List[Dict[str, Any]], executions: List[Dict[str, Any]], history: int = 8) -> None:
+        now = _utc_now()
+        with self.lock, self.connect() as conn:
+            ensure_schema(conn)
+            for workflow in workflows:
+                workflow = copy.deepcopy(workflow)
+                workflow.setdefault("active", True)
+                workflow.setdefault("updatedAt", _api_timestamp(now.isoformat()))
+                self.workflows[workflow["id"]] = workflow
+
+            recorded = {e["row"]["workflowId"] for e in executions}
+            for entry in sorted(executions, key=lambda e: int(e["row"]["id"])):
+                row = entry["row"]
+                workflow = self.workflows.get(row["workflowId"])
+                if not workflow:
+                    continue
+                data = entry["data"]
+                started_at, stopped_at = row.get("startedAt"), row.get("stoppedAt")
+                if self.run_seconds > 0 and row.get("status") == "success" and started_at:
+                    # History on the played timeline, so load tests compare like with like.
+                    result, run_data, _ = execution_result(json.loads(data) if isinstance(data, str) else data)
+                    if result is not None and run_data:
+                        begun = dt.datetime.fromisoformat(str(started_at).replace("Z", "+00:00"))
+                        begun = begun if begun.tzinfo else begun.replace(tzinfo=dt.timezone.utc)
+                        scaled = _shift_run_data({"resultData": {**result, "runData": run_data}}, begun, self.solo_run_ms())
+                        data = json.dumps(flatten_refs(scaled))
+                        stopped_at = _db_timestamp(begun + dt.timedelta(milliseconds=_run_span_ms(scaled)))
+                conn.execute(
+                    """
+                    insert into execution_entity (finished, mode, startedAt, stoppedAt, status, workflowId, createdAt)
+                    values (?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (
+                        row.get("finished", 1),
+                        row.get("mode", "trigger"),
+                        started_at,
+                        stopped_at,
+                        row.get("status", "success"),
+                        row["workflowId"],
+                        row.get("startedAt"),
+                    ),
+                )
+                execution_id = conn.execute("select last_insert_rowid()").fetchone()[0]
+                conn.execute(
+                    "insert into execution_data (executionId, workflowData, data) values (?, ?, ?)",
+                    (execution_id, json.dumps(workflow), data if isinstance(data, str) else json.dumps(data)),
+                )
+                if row.get("status") == "success":
+                    result, run_data, _ = execution_result(json.loads(data) if isinstance(data, str) else data)
+                    if result is not None:
+                        self.run_templates[row["workflowId"]] = {"resultData": {**result, "runData": run_data}}
+            conn.commit()
+
+            # Fill in a plausible history for workflows without recordings.
+            for workflow_id, workflow in self.workflows.items():
+                if workflow_id in recorded:
+                    continue
+                for age in range(history, 0, -1):
+                    started = now - dt.timedelta(hours=12 * age - 11)
+                    if self.run_seconds > 0:
+                        data = _synthetic_run_data(workflow, started, self.solo_run_ms())
+                        stopped = started + dt.timedelta(milliseconds=_run_span_ms(data))
+                    else:
+                        data = _synthetic_run_data(workflow, started)
+                        stopped = started + dt.timedelta(seconds=90)
+                    insert_execution(conn, workflow, data, "success", started, stopped)
+                    self.run_templates[workflow_id] = data
+
+    # --- API operations -------------------------------------------------
+
+    def list_workflows(self) -> List[Dict[str, Any]]:
+        return [copy.deepcopy(w) for w in self.workflows.values()]
+
+    def get_workflow(self, workflow_id: str) -> Optional[Dict[str, Any]]:
+        workflow = self.workflows.get(workflow_id)
+        return copy.deepcopy(workflow) if workflow else None
+
+    def update_workflow(self, workflow_id: str, body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            workflow = self.workflows.get(workflow_id)
+            if not workflow:
+                return None
+            for key in ("name", "nodes", "connections", "settings"):
+                if key in body:
+                    workflow[key] = copy.deepcopy(body[key])
+            workflow["updatedAt"] = _api_timestamp(_utc_now().isoformat())
+            return copy.deepcopy(workflow)
+
+    def _execution_json(self, row: sqlite3.Row, data: Optional[str]) -> Dict[str, Any]:
+        payload: Dict[str, Any] = {
+            "id": int(row["id"]),
+            "finished": bool(row["finished"]),
+            "mode": row["mode"],
+            "retryOf": row["retryOf"],
+            "retrySuccessId": row["retrySuccessId"],
+            "startedAt": _api_timestamp(row["startedAt"]),
+            "stoppedAt": _api_timestamp(row["stoppedAt"]),
+            "workflowId": row["workflowId"],
+            "waitTill": row["waitTill"],
+            "status": row["status"],
+        }
+        if data is not None:
+            result, run_data, error = execution_result(json.loads(data))
+            result_data = dict(result or {})
+            result_data["runData"] = run_data
+            if error is not None:
+                result_data["error"] = error
+            payload["data"] = {"resultData": result_data}
+        return payload
+
+    def list_executions(self, query: Dict[str, str]) -> Dict[str, Any]:
+        limit = max(1, min(250, int(query.get("limit", "100"))))
+        include_data = query.get("includeData") == "true"
+        clauses = ["1=1"]
+        params: List[Any] = []
+        if query.get("workflowId"):
+            clauses.append("e.workflowId=?")
+            params.append(query["workflowId"])
+        if query.get("status"):
+            clauses.append("e.status=?")
+            params.append(query["status"])
+        if query.get("cursor"):
+            clauses.append("e.id<?")
+            params.append(int(query["cursor"]))
+        data_col = "d.data" if include_data else "null as data"
+        with self.connect() as conn:
+            rows = conn.execute(
+                f"""
+                select e.*, {data_col}
+                from execution_entity e left join execution_data d on d.executionId = e.id
+                where {' and '.join(clauses)}
+                order by e.id desc
+                limit ?
+                """,
+                (*params, limit + 1),
+            ).fetchall()
+        page = rows[:limit]
+        next_cursor = str(page[-1]["id"]) if len(rows) > limit else None
+        return {"data": [self._execution_json(r, r["data"]) for r in page], "nextCursor": next_cursor}
+
+    def get_execution(self, execution_id: int, include_data: bool) -> Optional[Dict[str, Any]]:
+        with self.connect() as conn:
+            row = conn.execute(
+                """
+                select e.*, d.data
+                from execution_entity e left join execution_data d on d.executionId = e.id
+                where e.id=?
+                """,
+                (execution_id,),
+            ).fetchone()
+        if not row:
+            return None
+        return self._execution_json(row, row["data"] if include_data else None)
+
+    def trigger_webhook(
+        self, path: str, headers: Dict[str, str], query: Optional[Dict[str, str]] = None
+    ) -> Tuple[int, Dict[str, Any]]:
+        workflow = next((w for w in self.workflows.values() if _webhook_path(w) == path), None)
+        if not workflow:
+            return 404, {"code": 404, "message": f'The requested webhook "{path}" is not registered.'}
+        if self.webhook_secret and headers.get(self.webhook_header.lower()) != self.webhook_secret:
+            return 403, {"code": 403, "message": "Authorization data is wrong!"}
+
+        template = self.run_templates.get(workflow["id"]) or _synthetic_run_data(workflow, _utc_now())
+        started = _utc_now()
+        data = _shift_run_data(template, started, self.solo_run_ms() if self.run_seconds > 0 else None)
+        _echo_webhook_request(workflow, data, started, headers, query or {})
+        with self.lock, self.connect() as conn:
+            if self.run_seconds <= 0:
+                stopped = started + dt.timedelta(milliseconds=_run_span_ms(data))
+                insert_execution(conn, workflow, data, "success", started, stopped, mode="webhook")
+                return 200, {"message": "Workflow was started"}
+            partial = {"resultData": {**data["resultData"], "runData": {}}}
+            execution_id = insert_execution(conn, workflow, partial, "running", started, None, mode="webhook")
+            self.active_runs += 1
+
+        thread = threading.Thread(
+            target=self._play_execution, args=(execution_id, data, started), daemon=True
+        )
+        thread.start()
+        return 200, {"message": "Workflow was started"}
+
+    def _play_execution(self, execution_id: int, data: Dict[str, Any], started: dt.datetime) -> None:
+        """Play the solo timeline in `data`, slowed by `contention` per other run in flight.
+
+        Node runs are revealed as they finish and re-stamped with the wall-clock
+        start and duration they actually took, as n8n would record them.
+        """
+        run_data = data["resultData"]["runData"]
+        order = sorted(run_data.items(), key=lambda kv: _run_end_ms(kv[1]))
+        origin = min((_run_start_ms(runs) for _, runs in order), default=0)
+        marks = sorted(
+            {int(r.get("startTime") or 0) - origin for _, runs in order for r in runs}
+            | {int(r.get("startTime") or 0) + int(r.get("executionTime") or 0) - origin for _, runs in order for r in runs}
+        )
+        played = 0.0  # ms of the solo timeline behind us
+        clock = started.timestamp()
+        reached: Dict[int, float] = {}  # solo-timeline ms -> epoch seconds when the run got there
+        done: Dict[str, Any] = {}
+        try:
+            while order:
+                with self.lock:
+                    rate = 1.0 / (1.0 + self.contention * max(0, self.active_runs - 1))
+                next_end = _run_end_ms(order[0][1]) - origin
+                time.sleep(max(0.0, min(PLAY_TICK_SECONDS, (next_end - played) / rate / 1000.0)))
+                now = time.time()
+                advanced = played + (now - clock) * 1000.0 * rate
+                for mark in marks:
+                    if mark not in reached and mark <= advanced:
+                        reached[mark] = clock + max(0.0, mark - played) / rate / 1000.0
+                played, clock = advanced, now
+                finished = False
+                while order and _run_end_ms(order[0][1]) - origin <= played:
+                    name, runs = order.pop(0)
+                    done[name] = [_retimed(run, origin, reached) for run in runs]
+                    finished = True
+                if finished:
+                    partial = {"resultData": {**data["resultData"], "runData": dict(done)}}
+                    with self.lock, self.connect() as conn:
+                        conn.execute(
+                            "update execution_data set data=? where executionId=?",
+                            (json.dumps(flatten_refs(partial)), execution_id),
+                        )
+                        conn.commit()
+            with self.lock, self.connect() as conn:
+                conn.execute(
+                    "update execution_entity set finished=1, status='success', stoppedAt=? where id=?",
+                    (_db_timestamp(_utc_now()), execution_id),
+                )
+                conn.commit()
+        finally:
+            with self.lock:
+                self.active_runs -= 1
+
+
+def _retimed(run: Dict[str, Any], origin: int, reached: Dict[int, float]) -> Dict[str, Any]:
+    start = int(run.get("startTime") or 0) - origin
+    end = start + int(run.get("executionTime") or 0)
+    return {**run, "startTime": int(reached[start] * 1000), "executionTime": int(round((reached[end] - reached[start]) * 1000))}
+
+
+def _run_start_ms(runs: List[Dict[str, Any]]) -> int:
+    return min(int(r.get("startTime") or 0) for r in runs) if runs else 0
+
+
+def _run_end_ms(runs: List[Dict[str, Any]]) -> int:
+    return max(int(r.get("startTime") or 0) + int(r.get("executionTime") or 0) for r in runs) if runs else 0
+
+
+def _run_span_ms(data: Dict[str, Any]) -> int:
+    run_data = data["resultData"]["runData"]
+    if not run_data:
+        return 0
+    start = min(_run_start_ms(runs) for runs in run_data.values())
+    end = max(_run_end_ms(runs) for runs in run_data.values())
+    return max(0, end - start)
+
+
+def _shift_run_data(template: Dict[str, Any], started: dt.datetime, duration_ms: Optional[float] = None) -> Dict[str, Any]:
+    """Move the run to `started`; with `duration_ms`, also stretch node times so the run spans it."""
+    data = copy.deepcopy(template)
+    run_data = data["resultData"]["runData"]
+    if not run_data:
+        return data
+    origin = min(_run_start_ms(runs) for runs in run_data.values())
+    span = _run_span_ms(data)
+    scale = duration_ms / span if duration_ms and span else 1.0
+    start_ms = int(started.timestamp() * 1000)
+    for runs in run_data.values():
+        for run in runs:
+            if run.get("startTime"):
+                run["startTime"] = start_ms + int(round((int(run["startTime"]) - origin) * scale))
+            if run.get("executionTime") is not None:
+                run["executionTime"] = int(round(int(run["executionTime"]) * scale))
+    slack = run_data.get("Send to Slack")
+    if slack:
+        for item in ((slack[-1].get("data") or {}).get("main") or [[]])[0]:
+            if isinstance(item, dict) and "message_ts" in (item.get("json") or {}):
+                item["json"]["message_ts"] = f"{started.timestamp():.6f}"
+    return data
+
+
+def _echo_webhook_request(
+    workflow: Dict[str, Any],
+    data: Dict[str, Any],
+    started: dt.datetime,
+    headers: Dict[str, str],
+    query: Dict[str, str],
+) -> None:
+    """Make the Webhook node output the request like n8n does ({headers, params, query, body})."""
+    node = next((n for n in workflow.get("nodes", []) if n.get("type") == "n8n-nodes-base.webhook"), None)
+    if not node:
+        return
+    run_data = data["resultData"]["runData"]
+    item = {"json": {"headers": headers, "params": {}, "query": query, "body": {}}}
+    runs = run_data.get(node["name"])
+    if runs:
+        runs[-1]["data"] = {"main": [[item]]}
+        return
+    run_data[node["name"]] = [
+        {
+            "startTime": int(started.timestamp() * 1000),
+            "executionTime": 5,
+            "executionStatus": "success",
+            "source": [],
+            "data": {"main": [[item]]},
+        }
+    ]
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    server_version = "n8n-standin/1.0"
+    state: StandinState
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - stdlib signature
+        if os.environ.get("STANDIN_VERBOSE") == "true":
+            super().log_message(format, *args)
+
+    def _delay(self, path: str) -> None:
+        state = self.state
+        latency = state.latency_ms
+        for prefix, value in state.route_latency_ms.items():
+            if prefix in path:
+                latency = value
+                break
+        if state.jitter_ms:
+            latency += random.uniform(0, state.jitter_ms)
+        if latency > 0:
+            time.sleep(latency / 1000.0)
+
+    def _send(self, status: int, body: Any) -> None:
+        raw = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def _dispatch(self, method: str) -> None:
+        parsed = urllib.parse.urlparse(self.path)
+        path = parsed.path.rstrip("/")
+        query = {k: v[-1] for k, v in urllib.parse.parse_qs(parsed.query).items()}
+        self._delay(path)
+
+        if path.startswith("/webhook/"):
+            headers = {k.lower(): v for k, v in self.headers.items()}
+            status, body = self.state.trigger_webhook(path[len("/webhook/"):], headers, query)
+            self._send(status, body)
+            return
+
+        if not path.startswith("/api/v1/"):
+            self._send(404, {"message": "not found"})
+            return
+        if self.headers.get("X-N8N-API-KEY") != self.state.api_key:
+            self._send(401, {"message": "unauthorized"})
+            return
+
+        parts = path[len("/api/v1/"):].split("/")
+        if parts[0] == "workflows":
+            if len(parts) == 1 and method == "GET":
+                self._send(200, {"data": self.state.list_workflows(), "nextCursor": None})
+                return
+            if len(parts) == 2 and method == "GET":
+                workflow = self.state.get_workflow(parts[1])
+                self._send(200 if workflow else 404, workflow or {"message": "Not Found"})
+                return
+            if len(parts) == 2 and method == "PUT":
+                workflow = self.state.update_workflow(parts[1], self._read_body())
+                self._send(200 if workflow else 404, workflow or {"message": "Not Found"})
+                return
+        if parts[0] == "executions" and method == "GET":
+            if len(parts) == 1:
+                self._send(200, self.state.list_executions(query))
+                return
+            if len(parts) == 2 and parts[1].isdigit():
+                execution = self.state.get_execution(int(parts[1]), query.get("includeData") == "true")
+                self._send(200 if execution else 404, execution or {"message": "Not Found"})
+                return
+        self._send(405 if parts[0] in {"workflows", "executions"} else 404, {"message": "unsupported"})
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        self._dispatch("POST")
+
+    def do_PUT(self) -> None:  # noqa: N802 - stdlib naming
+        self._dispatch("PUT")
+
+
+def start_server(state: StandinState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread; port 0 picks a free port."""
+    handler = type("BoundStandinHandler", (StandinHandler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def standin_env(state: StandinState, server: ThreadingHTTPServer) -> Dict[str, str]:
+    """Environment that points the ops scripts at a running stand-in."""
+    host, port = server.server_address[:2]
+    # The scripts' own state files default to the repo's logs/; keep them next to the scratch DB.
+    scratch = Path(state.db_path).parent
+    return {
+        "N8N_HOST": str(host),
+        "N8N_PORT": str(port),
+        "N8N_API_KEY": state.api_key,
+        "N8N_DB_PATH": str(state.db_path),
+        "WEBHOOK_SECRET": state.webhook_secret or "",
+        "WEBHOOK_HEADER_NAME": state.webhook_header,
+        # Keep benchmarks off the real Slack/Telegram APIs.
+        "SLACK_CHANNEL_ID": "",
+        "SLACK_BOT_TOKEN": "",
+        "TELEGRAM_ENABLED": "false",
+        "DEPLOY_MANIFEST_PATH": str(scratch / "deploy-manifest.json"),
+        "CODE_NODE_MAPS_PATH": str(scratch / "code-node-maps.json"),
+        "DRIFT_HASH_CACHE_PATH": str(scratch / "drift-hash-cache.json"),
+        "STAGE_PROFILE_CACHE_PATH": str(scratch / "stage-profile-cache.json"),
+        "PROBE_NOTIFY_STATE_PATH": str(scratch / "probe-notify-state.json"),
+        "SLACK_HISTORY_CACHE_PATH": str(scratch / "slack-history-cache.json"),
+        "SLO_STATE_PATH": str(scratch / "slo-state.json"),
+    }
+
+
+def _parse_route_latency(values: List[str]) -> Dict[str, float]:
+    routes: Dict[str, float] = {}
+    for raw in values:
+        prefix, _, ms = raw.partition("=")
+        if not prefix or not ms:
+            raise SystemExit(f"--route-latency expects PREFIX=MS, got: {raw}")
+        routes[prefix] = float(ms)
+    return routes
+
+
+def build_state(args: argparse.Namespace) -> StandinState:
+    db_path = Path(args.db) if args.db else Path(tempfile.mkdtemp(prefix="n8n-standin-")) / "database.sqlite"
+    if db_path.exists():
+        db_path.unlink()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    state = StandinState(
+        db_path=db_path,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        route_latency_ms=_parse_route_latency(args.route_latency),
+        run_seconds=args.run_seconds,
+        run_jitter=args.run_jitter,
+        contention=args.contention,
+    )
+    workflows, executions = load_fixtures(Path(args.fixtures) if args.fixtures else None)
+    state.seed(workflows, executions)
+    return state
+
+
+def cmd_record(args: argparse.Namespace) -> int:
+    from _env import load_env
+    from _n8n_api import build_client
+    from _n8n_db import connect, recent_executions
+
+    load_env()
+    client = build_client()
+    conn = connect()
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+
+    workflows = []
+    executions = []
+    for summary in client.list_workflows():
+        workflow = client.get_workflow(summary["id"])
+        workflows.append(workflow)
+        for row in recent_executions(conn, workflow["id"], limit=args.executions):
+            data_row = conn.execute(
+                "select data from execution_data where executionId=?", (int(row["id"]),)
+            ).fetchone()
+            if not data_row:
+                continue
+            executions.append(
+                {
+                    "row": {**dict(row), "workflowId": workflow["id"], "mode": "trigger"},
+                    "data": data_row["data"],
+                }
+            )
+
+    (out / "workflows.json").write_text(json.dumps(workflows, indent=2, ensure_ascii=False), encoding="utf-8")
+    (out / "executions.json").write_text(json.dumps(executions), encoding="utf-8")
+    print(f"[standin] recorded workflows={len(workflows)} executions={len(executions)} out={out}")
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    state = build_state(args)
+    server = start_server(state, host=args.host, port=args.port)
+    print(f"[standin] serving on http://{server.server_address[0]}:{server.server_address[1]}")
+    print(f"[standin] workflows={len(state.workflows)} db={state.db_path}")
+    for key, value in standin_env(state, server).items():
+        print(f"export {key}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+    return 0
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    idx = min(len(ordered) - 1, max(0, int(round(pct * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+def cmd_bench(args: argparse.Namespace) -> int:
+    state = build_state(args)
+    server = start_server(state)
+    env = {**os.environ, **standin_env(state, server)}
+    print(f"[bench] stand-in on port {server.server_address[1]} latency_ms={args.latency_ms} runs={args.runs}")
+
+    results: Dict[str, Dict[str, float]] = {}
+    failures: List[str] = []
+    for name, argv, expected_code in BENCH_SCRIPTS:
+        durations: List[float] = []
+        for _ in range(args.runs):
+            t0 = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, str(ROOT / "scripts" / argv[0]), *argv[1:]],
+                env=env,
+                capture_output=True,
+                text=True,
+            )
+            durations.append(time.perf_counter() - t0)
+            if proc.returncode != expected_code:
+                failures.append(f"{name}: exit={proc.returncode} expected={expected_code}")
+                tail = (proc.stdout + proc.stderr).strip().splitlines()[-5:]
+                for line in tail:
+                    print(f"[bench]   {name}> {line}")
+        results[name] = {
+            "p50_s": statistics.median(durations),
+            "p95_s": percentile(durations, 0.95),
+            "max_s": max(durations),
+        }
+        print(
+            f"[bench] {name}: p50={results[name]['p50_s']:.3f}s "
+            f"p95={results[name]['p95_s']:.3f}s max={results[name]['max_s']:.3f}s"
+        )
+
+    server.shutdown()
+
+    if args.baseline:
+        baseline_path = Path(args.baseline)
+        if baseline_path.exists() and not args.save_baseline:
+            baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+            for name, stats in results.items():
+                prior = (baseline.get(name) or {}).get("p50_s")
+                if prior and stats["p50_s"] > prior * args.max_regression:
+                    failures.append(
+                        f"{name}: p50 {stats['p50_s']:.3f}s exceeds baseline {prior:.3f}s x{args.max_regression}"
+                    )
+        else:
+            baseline_path.parent.mkdir(parents=True, exist_ok=True)
+            baseline_path.write_text(json.dumps(results, indent=2, sort_keys=True), encoding="utf-8")
+            print(f"[bench] baseline saved: {baseline_path}")
+
+    if failures:
+        print("[bench] REGRESSIONS:")
+        for failure in failures:
+            print("  -", failure)
+        return 1
+    print("[bench] OK")
+    return 0
+
+
+def add_state_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--fixtures", default=None, help="Directory written by `record` (default: repo workflows/)")
+    parser.add_argument("--db", default=None, help="Scratch SQLite path (default: temp dir, recreated)")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latency injected into every request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random jitter added to latency")
+    parser.add_argument(
+        "--route-latency",
+        action="append",
+        default=[],
+        metavar="PREFIX=MS",
+        help="Per-route latency override, e.g. /webhook=250 or /executions=80",
+    )
+    parser.add_argument(
+        "--run-seconds",
+        type=float,
+        default=0.0,
+        help="Wall time a webhook execution takes to finish on its own (0 = finished immediately)",
+    )
+    parser.add_argument(
+        "--run-jitter",
+        type=float,
+        default=0.1,
+        help="Per-run spread of --run-seconds, as a fraction (0.1 = ±10%%)",
+    )
+    parser.add_argument(
+        "--contention",
+        type=float,
+        default=0.5,
+        help="Slowdown each other in-flight execution adds to a running one (0.5 = +50%% per run)",
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Local n8n API/webhook stand-in for offline ops-script runs")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("record", help="Record live workflows and executions into a fixture directory")
+    record.add_argument("--out", default=str(ROOT / "logs" / "standin-fixtures"))
+    record.add_argument("--executions", type=int, default=10, help="Executions recorded per workflow")
+
+    serve = sub.add_parser("serve", help="Serve the stand-in until interrupted")
+    add_state_args(serve)
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=5679)
+
+    bench = sub.add_parser("bench", help="Benchmark deploy/drift-check/probe/trigger against the stand-in")
+    add_state_args(bench)
+    bench.add_argument("--runs", type=int, default=3)
+    bench.add_argument("--baseline", default=None, help="JSON file of p50 timings to compare against")
+    bench.add_argument("--save-baseline", action="store_true", help="Overwrite --baseline with this run")
+    bench.add_argument(
+        "--max-regression",
+        type=float,
+        default=1.5,
+        help="Fail when a script's p50 exceeds baseline by this factor",
+    )
+
+    args = parser.parse_args()
+    if args.command == "record":
+        return cmd_record(args)
+    if args.command == "serve":
+        return cmd_serve(args)
+    return cmd_bench(args)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,22 @@
+// Normalize all data
+const items = $input.all();
+const normalized = [];
+
+for (const item of items) {
+  const data = item.json;
+  const source = data.source || 'RSS';
+  const sourceType = source.startsWith('X -') ? 'X' : 'RSS';
+  normalized.push({
+    title: data.title || data.text || '',
+    url: data.link || data.url || '',
+    source,
+    sourceType,
+    tier: data.tier || 'B',
+    snippet: (data.description || data.summary || data.text || data.snippet || '').substring(0, 300),
+    publishedAt: data.pubDate || data.isoDate || data.created_at || data.publishedAt || new Date().toISOString(),
+    author: data.author || data.username || '',
+    metrics: data.metrics || data.public_metrics || {}
+  });
+}
+
+return normalized.map(item => ({ json: item }));
@@ -5,13 +5,17 @@ import datetime as dt
 import hashlib
 import json
 import os
+import time
 import urllib.parse
 import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, Optional
 
 from _env import load_env
-from probe_daily_pack import ProbeResult, run_probe
+from _notify_state import NotifyStateStore
+from _slack import build_slack_client
+from probe_daily_pack import ProbeResult, ProbeSession, run_probe
 
 
 ROOT = Path(__file__).resolve().parents[1]
@@ -47,18 +51,13 @@ def _state_path() -> Path:
     return Path(override) if override else ROOT / "logs" / "probe-notify-state.json"
 
 
-def _load_state(path: Path) -> Dict[str, str]:
-    if not path.exists():
-        return {}
+def _state_store() -> NotifyStateStore:
+    raw = os.environ.get("PROBE_NOTIFY_HISTORY_SIZE", "5000")
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except json.JSONDecodeError:
-        return {}
-
-
-def _save_state(path: Path, state: Dict[str, str]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(state, indent=2, sort_keys=True), encoding="utf-8")
+        max_records = max(1, int(raw))
+    except ValueError:
+        max_records = 5000
+    return NotifyStateStore(_state_path(), max_records=max_records)
 
 
 def _cooldown_minutes() -> int:
@@ -69,20 +68,6 @@ def _cooldown_minutes() -> int:
         return 120
 
 
-def _within_cooldown(last_ts: Optional[str], minutes: int) -> bool:
-    if not last_ts:
-        return False
-    try:
-        last = dt.datetime.fromisoformat(last_ts)
-    except ValueError:
-        return False
-    if last.tzinfo is None:
-        last = last.replace(tzinfo=dt.timezone.utc)
-    now = dt.datetime.now(tz=dt.timezone.utc)
-    delta = now - last.astimezone(dt.timezone.utc)
-    return delta.total_seconds() < minutes * 60
-
-
 def _build_message(result: ProbeResult, signature: str) -> str:
     sev = _severity(result)
     lines = [
@@ -136,30 +121,14 @@ def _telegram_enabled() -> bool:
     return os.environ.get("TELEGRAM_ENABLED", "").strip().lower() == "true"
 
 
-def _slack_post(text: str) -> str:
-    token = os.environ.get("SLACK_BOT_TOKEN")
+def _slack_post(text: str, timeout: float = 30) -> str:
     channel = os.environ.get("SLACK_CHANNEL_ID")
-    if not token or not channel:
+    if not os.environ.get("SLACK_BOT_TOKEN") or not channel:
         raise RuntimeError("SLACK_BOT_TOKEN or SLACK_CHANNEL_ID is not set")
-
-    body = json.dumps({"channel": channel, "text": text}).encode("utf-8")
-    req = urllib.request.Request(
-        "https://slack.com/api/chat.postMessage",
-        data=body,
-        headers={
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json; charset=utf-8",
-        },
-        method="POST",
-    )
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = json.load(resp)
-    if not data.get("ok"):
-        raise RuntimeError(f"Slack API chat.postMessage failed: {data.get('error')}")
-    return str(data.get("ts"))
+    return build_slack_client().post_message(channel, text, timeout=timeout)
 
 
-def _telegram_post(text: str) -> None:
+def _telegram_post(text: str, timeout: float = 30) -> None:
     token = os.environ.get("TELEGRAM_DAILY_BOT_TOKEN")
     chat_id = os.environ.get("TELEGRAM_DAILY_CHAT_ID")
     if not token or not chat_id:
@@ -168,28 +137,154 @@ def _telegram_post(text: str) -> None:
     url = f"https://api.telegram.org/bot{token}/sendMessage"
     payload = urllib.parse.urlencode({"chat_id": chat_id, "text": text}).encode("utf-8")
     req = urllib.request.Request(url, data=payload, method="POST")
-    with urllib.request.urlopen(req, timeout=30) as resp:
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
         data = json.load(resp)
     if not data.get("ok"):
         raise RuntimeError(f"Telegram sendMessage failed: {data}")
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="Run probe and send notifications on issues/warnings")
-    parser.add_argument(
-        "--send",
-        action="store_true",
-        help="Actually send notifications (default is dry-run)",
-    )
-    parser.add_argument(
-        "--notify-on-warnings",
-        action="store_true",
-        help="Send notifications when only warnings are present",
-    )
-    args = parser.parse_args()
+# Telegram rejects messages above 4096 characters; Slack truncates long text too.
+DIGEST_MAX_CHARS = 3900
 
-    load_env()
-    result = run_probe()
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return max(0.0, float(os.environ.get(name, str(default))))
+    except ValueError:
+        return default
+
+
+def _channels() -> Dict[str, Callable[..., Optional[str]]]:
+    channels: Dict[str, Callable[..., Optional[str]]] = {}
+    if _slack_enabled():
+        channels["slack"] = _slack_post
+    if _telegram_enabled():
+        channels["telegram"] = _telegram_post
+    return channels
+
+
+def _build_digest(alerts: List[Dict[str, Any]]) -> str:
+    if len(alerts) == 1:
+        return alerts[0]["message"]
+    issues = sum(1 for a in alerts if a["severity"] == "ISSUES")
+    lines = [
+        f"[Probe:DIGEST] X Daily Pack: {len(alerts)} alerts (issues={issues} warnings={len(alerts) - issues})",
+        f"window_utc: {alerts[0]['queued_at']} .. {alerts[-1]['queued_at']}",
+    ]
+    for alert in alerts:
+        lines.append(f"- {alert['queued_at']} [{alert['severity']}] signature={alert['signature']}")
+        lines.extend(f"    {line}" for line in alert.get("summary", [])[:4])
+    # Latest full report last: it reflects the current state of the workflow.
+    lines.append("latest:")
+    lines.append(alerts[-1]["message"])
+    text = "\n".join(lines)
+    if len(text) > DIGEST_MAX_CHARS:
+        text = text[: DIGEST_MAX_CHARS - 20] + "\n... (truncated)"
+    return text
+
+
+def _deliver(send: Callable[..., Optional[str]], text: str, retries: int, timeout: float) -> Dict[str, Any]:
+    started = time.monotonic()
+    error = None
+    for attempt in range(1, retries + 2):
+        try:
+            ref = send(text, timeout=timeout)
+            return {
+                "ok": True,
+                "ref": ref or "",
+                "attempts": attempt,
+                "latency_seconds": time.monotonic() - started,
+            }
+        except Exception as exc:  # pragma: no cover - network variability
+            error = str(exc)
+            if attempt <= retries:
+                time.sleep(min(8.0, 2 ** (attempt - 1)))
+    return {
+        "ok": False,
+        "error": error,
+        "attempts": retries + 1,
+        "latency_seconds": time.monotonic() - started,
+    }
+
+
+# One worker per channel; in-flight deliveries persist across daemon cycles.
+_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="probe-notify")
+_INFLIGHT: Dict[str, Future] = {}
+
+
+def _send_batch(
+    store: NotifyStateStore,
+    name: str,
+    send: Callable[..., Optional[str]],
+    alerts: List[Dict[str, Any]],
+) -> None:
+    retries = int(_env_float("PROBE_NOTIFY_RETRIES", 2))
+    timeout = _env_float("PROBE_NOTIFY_SEND_TIMEOUT_SECONDS", 15)
+    outcome = _deliver(send, _build_digest(alerts), retries, timeout)
+    with store.transaction() as state:
+        meta = state.channel(name)
+        meta.update(
+            {
+                "last_latency_seconds": round(outcome["latency_seconds"], 3),
+                "last_attempts": outcome["attempts"],
+                "last_error": outcome.get("error") or "",
+            }
+        )
+        if outcome["ok"]:
+            meta["delivered"] = int(meta.get("delivered", 0)) + len(alerts)
+            if name == "slack":
+                for alert in alerts:
+                    state.update(alert["signature"], slack_ts=outcome["ref"])
+        else:
+            state.requeue(name, alerts)
+    if outcome["ok"]:
+        print(
+            f"[probe-notify] {name}_sent: alerts={len(alerts)} ref={outcome['ref'] or '-'}"
+            f" attempts={outcome['attempts']} latency_seconds={outcome['latency_seconds']:.3f}"
+        )
+    else:
+        print(
+            f"[probe-notify] {name}_send_error: {outcome['error']} attempts={outcome['attempts']}"
+            f" latency_seconds={outcome['latency_seconds']:.3f} (requeued {len(alerts)})"
+        )
+
+
+def _flush(store: NotifyStateStore, force: bool = False, wait: bool = True) -> None:
+    """Send queued alerts as one digest per channel, each channel on its own worker."""
+    channels = _channels()
+    window = _env_float("PROBE_NOTIFY_COALESCE_SECONDS", 300)
+    now = dt.datetime.now(tz=dt.timezone.utc)
+    batches: Dict[str, List[Dict[str, Any]]] = {}
+    # Take batches under the lock so concurrent runs never send the same alerts.
+    with store.transaction() as state:
+        for name in channels:
+            if not state.outbox.get(name):
+                continue
+            inflight = _INFLIGHT.get(name)
+            if inflight is not None and not inflight.done():
+                # A slow channel keeps coalescing instead of blocking the others.
+                print(f"[probe-notify] {name}: previous delivery still in flight; {len(state.outbox[name])} queued")
+                continue
+            last = state.channels.get(name, {}).get("last_flush_at")
+            last_dt = dt.datetime.fromisoformat(last) if last else None
+            if not force and last_dt and (now - last_dt).total_seconds() < window:
+                print(f"[probe-notify] {name}: {len(state.outbox[name])} alert(s) coalescing until window ends")
+                continue
+            batches[name] = state.take(name)
+            state.channel(name)["last_flush_at"] = now.isoformat(timespec="seconds")
+
+    for name, alerts in batches.items():
+        _INFLIGHT[name] = _POOL.submit(_send_batch, store, name, channels[name], alerts)
+    if wait:
+        _drain()
+
+
+def _drain() -> None:
+    for future in list(_INFLIGHT.values()):
+        future.result()
+
+
+def _handle_result(result: ProbeResult, args: argparse.Namespace) -> int:
     sev = _severity(result)
     sig = _signature(result)
     message = _build_message(result, sig)
@@ -197,60 +292,113 @@ def main() -> int:
     print("[probe-notify] severity:", sev, "signature:", sig)
     print("[probe-notify] send_enabled:", args.send)
 
+    store = _state_store()
     should_notify = bool(result.issues) or (args.notify_on_warnings and bool(result.warnings))
     if not should_notify:
         print("[probe-notify] no issues (and warnings not configured to notify)")
+        if args.send:
+            # Still drain digests queued by earlier runs once their window ends.
+            _flush(store, wait=not args.daemon)
         return 0
 
-    state_path = _state_path()
-    state = _load_state(state_path)
     cooldown = _cooldown_minutes()
-    last_sig = state.get("last_signature")
-    last_ts = state.get("last_sent_at")
+    channels = _channels()
+    # Check and claim under one lock so overlapping runs cannot both queue the alert.
+    with store.transaction() as state:
+        if state.within_cooldown(sig, cooldown):
+            print(
+                "[probe-notify] duplicate signature within cooldown:",
+                f"cooldown_minutes={cooldown}",
+                f"last_sent_at={state.get(sig)['last_sent_at']}",
+            )
+        elif not args.send:
+            print("[probe-notify] DRY_RUN message:\n")
+            print(message)
+            return 2 if result.issues else 1
+        elif not channels:
+            print("[probe-notify] slack_disabled telegram_disabled")
+        else:
+            state.claim(sig, sev)
+            alert = {
+                "signature": sig,
+                "severity": sev,
+                "queued_at": _utc_now_iso(),
+                "summary": (result.issues + result.warnings)[:4],
+                "message": message,
+            }
+            for name in channels:
+                state.enqueue(name, alert)
+
+    if args.send:
+        _flush(store, force=args.flush, wait=not args.daemon)
+    return 2 if result.issues else 1
 
-    if last_sig == sig and _within_cooldown(last_ts, cooldown):
-        print(
-            "[probe-notify] duplicate signature within cooldown:",
-            f"cooldown_minutes={cooldown}",
-            f"last_sent_at={last_ts}",
-        )
-        return 2 if result.issues else 1
 
-    if not args.send:
-        print("[probe-notify] DRY_RUN message:\n")
-        print(message)
-        return 2 if result.issues else 1
+def _run_daemon(args: argparse.Namespace) -> int:
+    session = ProbeSession(workflow_refresh_seconds=args.workflow_refresh_seconds)
+    print(
+        "[probe-notify] daemon started:",
+        f"interval_seconds={args.interval}",
+        f"workflow_refresh_seconds={args.workflow_refresh_seconds}",
+    )
+    try:
+        while True:
+            started = time.monotonic()
+            try:
+                _handle_result(session.probe(), args)
+            except Exception as exc:  # pragma: no cover - network variability
+                print("[probe-notify] probe_error:", exc)
+            elapsed = time.monotonic() - started
+            print(f"[probe-notify] cycle_seconds={elapsed:.3f}")
+            time.sleep(max(0.0, args.interval - elapsed))
+    except KeyboardInterrupt:
+        print("[probe-notify] daemon stopped")
+        return 0
+    finally:
+        session.close()
+        _drain()
 
-    slack_ts = None
-    if _slack_enabled():
-        try:
-            slack_ts = _slack_post(message)
-            print("[probe-notify] slack_sent_ts:", slack_ts)
-        except Exception as exc:  # pragma: no cover - network variability
-            print("[probe-notify] slack_send_error:", exc)
-    else:
-        print("[probe-notify] slack_disabled")
 
-    if _telegram_enabled():
-        try:
-            _telegram_post(message)
-            print("[probe-notify] telegram_sent: True")
-        except Exception as exc:  # pragma: no cover - network variability
-            print("[probe-notify] telegram_send_error:", exc)
-    else:
-        print("[probe-notify] telegram_disabled")
-
-    state.update(
-        {
-            "last_signature": sig,
-            "last_sent_at": _utc_now_iso(),
-            "last_severity": sev,
-            "last_slack_ts": slack_ts or "",
-        }
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run probe and send notifications on issues/warnings")
+    parser.add_argument(
+        "--send",
+        action="store_true",
+        help="Actually send notifications (default is dry-run)",
+    )
+    parser.add_argument(
+        "--notify-on-warnings",
+        action="store_true",
+        help="Send notifications when only warnings are present",
+    )
+    parser.add_argument(
+        "--flush",
+        action="store_true",
+        help="Send queued alerts now instead of waiting for the coalescing window",
+    )
+    parser.add_argument(
+        "--daemon",
+        action="store_true",
+        help="Keep running and probe every --interval seconds with warm clients",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=float(os.environ.get("PROBE_DAEMON_INTERVAL_SECONDS", "60")),
+        help="Seconds between probes in daemon mode",
     )
-    _save_state(state_path, state)
+    parser.add_argument(
+        "--workflow-refresh-seconds",
+        type=float,
+        default=float(os.environ.get("PROBE_WORKFLOW_REFRESH_SECONDS", "600")),
+        help="How often daemon mode re-fetches the live workflow for schedule drift",
+    )
+    args = parser.parse_args()
 
-    return 2 if result.issues else 1
+    load_env()
+    if args.daemon:
+        return _run_daemon(args)
+    return _handle_result(run_probe(), args)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Fleet probe: evaluate every managed workflow in one pass.
+
+Expectations (cron, success rate, freshness, key nodes) live in
+config/probe-fleet.json. Each pass does a single /workflows listing and one
+read transaction against n8n's SQLite: executions above the global id
+watermark are folded into per-workflow windows, so the steady-state cost
+tracks the number of new executions rather than workflows x history.
+Slack delivery of the Daily Pack stays with probe_daily_pack.py.
+
+Run:
+  python3 scripts/probe_fleet.py [--json] [--daemon --interval 60]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import os
+import re
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from _env import load_env
+from _n8n_api import build_client
+from _n8n_db import (
+    TERMINAL_STATUSES,
+    connect,
+    execution_result,
+    executions_by_id,
+    executions_since,
+    load_execution_data,
+    parse_iso,
+    recent_executions,
+    summarize_nodes,
+)
+from probe_daily_pack import schedule_cron
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class WorkflowExpectation:
+    key: str
+    name_pattern: str
+    cron: Optional[str] = None
+    cron_env: Optional[str] = None
+    window: int = 30
+    min_success_rate: float = 0.7
+    max_success_age_hours: Optional[float] = None
+    key_nodes: List[str] = field(default_factory=list)
+    nonempty_nodes: List[str] = field(default_factory=list)
+
+    @property
+    def expected_cron(self) -> Optional[str]:
+        if self.cron_env and os.environ.get(self.cron_env):
+            return os.environ[self.cron_env]
+        return self.cron
+
+    def matches(self, workflow: Dict[str, Any]) -> bool:
+        return re.search(self.name_pattern, workflow.get("name") or "") is not None
+
+
+@dataclass
+class WorkflowHealth:
+    key: str
+    workflow_id: Optional[str]
+    name: Optional[str]
+    expected_cron: Optional[str]
+    actual_cron: Optional[str]
+    schedule_drift: bool
+    executions_count: int
+    success_count: int
+    error_count: int
+    success_rate: float
+    last_success_started_at: Optional[str]
+    last_success_age_hours: Optional[float]
+    issues: List[str]
+    warnings: List[str]
+
+
+@dataclass
+class FleetResult:
+    workflows: List[WorkflowHealth]
+    new_executions: int
+    watermark: int
+    seconds: float
+
+    @property
+    def issues(self) -> List[str]:
+        return [f"{w.key}: {issue}" for w in self.workflows for issue in w.issues]
+
+    @property
+    def warnings(self) -> List[str]:
+        return [f"{w.key}: {warning}" for w in self.workflows for warning in w.warnings]
+
+
+def _config_path() -> Path:
+    override = os.environ.get("PROBE_FLEET_CONFIG")
+    return Path(override) if override else ROOT / "config" / "probe-fleet.json"
+
+
+def load_expectations(path: Optional[Path] = None) -> List[WorkflowExpectation]:
+    raw = json.loads((path or _config_path()).read_text(encoding="utf-8"))
+    return [WorkflowExpectation(**entry) for entry in raw.get("workflows", [])]
+
+
+@dataclass
+class _Tracked:
+    expectation: WorkflowExpectation
+    workflow_id: str
+    name: str
+    actual_cron: Optional[str]
+    executions: Deque[Dict[str, Any]]
+    last_success: Optional[Dict[str, Any]] = None
+    node_warnings_for: Optional[int] = None
+    node_warnings: List[str] = field(default_factory=list)
+
+
+class FleetProbe:
+    """Warm, incremental probe over all workflows in config/probe-fleet.json."""
+
+    def __init__(self, expectations: Optional[List[WorkflowExpectation]] = None) -> None:
+        load_env()
+        self.expectations = expectations if expectations is not None else load_expectations()
+        self.client = build_client()
+        self.conn = connect()
+        self.watermark = 0
+        self._bootstrapped = False
+        self.tracked: Dict[str, _Tracked] = {}
+        self.pending: Dict[int, str] = {}
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _sync_workflows(self) -> Dict[str, Optional[str]]:
+        """One listing for the whole fleet; returns key -> workflow id (None if missing)."""
+        listing = list(self.client.list_workflows())
+        resolved: Dict[str, Optional[str]] = {}
+        for exp in self.expectations:
+            workflow = next((w for w in listing if exp.matches(w)), None)
+            if not workflow:
+                resolved[exp.key] = None
+                continue
+            # The public API listing already carries nodes; older builds may not.
+            if "nodes" not in workflow:
+                workflow = self.client.get_workflow(workflow["id"])
+            workflow_id = workflow["id"]
+            resolved[exp.key] = workflow_id
+            tracked = self.tracked.get(workflow_id)
+            if tracked is None:
+                tracked = _Tracked(
+                    expectation=exp,
+                    workflow_id=workflow_id,
+                    name=workflow.get("name") or workflow_id,
+                    actual_cron=None,
+                    executions=deque(maxlen=exp.window),
+                )
+                # Seed the window once; later passes only read the watermark delta.
+                for row in reversed(list(recent_executions(self.conn, workflow_id, limit=exp.window))):
+                    self._fold(tracked, dict(row))
+                self.tracked[workflow_id] = tracked
+            tracked.actual_cron = schedule_cron(workflow)
+        return resolved
+
+    def _fold(self, tracked: _Tracked, row: Dict[str, Any]) -> None:
+        execution_id = int(row["id"])
+        if row["status"] not in TERMINAL_STATUSES:
+            self.pending[execution_id] = tracked.workflow_id
+            return
+        self.pending.pop(execution_id, None)
+        if any(int(e["id"]) == execution_id for e in tracked.executions):
+            return
+        tracked.executions.append(row)
+        if row["status"] == "success":
+            if tracked.last_success is None or execution_id > int(tracked.last_success["id"]):
+                tracked.last_success = row
+
+    def _read_delta(self) -> int:
+        new_rows = 0
+        # One read transaction so every workflow is judged against the same snapshot.
+        self.conn.execute("begin")
+        try:
+            for row in executions_by_id(self.conn, list(self.pending)):
+                tracked = self.tracked.get(self.pending[int(row["id"])])
+                if tracked is not None:
+                    self._fold(tracked, dict(row))
+            while True:
+                rows = executions_since(self.conn, self.watermark, limit=500)
+                if not rows:
+                    break
+                for row in rows:
+                    self.watermark = max(self.watermark, int(row["id"]))
+                    new_rows += 1
+                    tracked = self.tracked.get(row["workflowId"])
+                    if tracked is not None:
+                        self._fold(tracked, dict(row))
+        finally:
+            self.conn.execute("commit")
+        return new_rows
+
+    def _node_warnings(self, tracked: _Tracked) -> List[str]:
+        exp = tracked.expectation
+        last = tracked.last_success
+        if not exp.key_nodes or last is None:
+            return []
+        if tracked.node_warnings_for == int(last["id"]):
+            return tracked.node_warnings
+        warnings: List[str] = []
+        payload = load_execution_data(self.conn, int(last["id"]))
+        if payload:
+            _, run_data, top_error = execution_result(payload)
+            if top_error:
+                warnings.append(f"Top-level error present on last success: {top_error}")
+            for node, status, items, message in summarize_nodes(run_data, exp.key_nodes):
+                if status == "ERROR":
+                    warnings.append(f"Node error on last success: {node} msg={message}")
+                if items == 0 and node in exp.nonempty_nodes:
+                    warnings.append(f"Node produced zero items: {node}")
+        tracked.node_warnings_for = int(last["id"])
+        tracked.node_warnings = warnings
+        return warnings
+
+    def _evaluate(self, exp: WorkflowExpectation, workflow_id: Optional[str]) -> WorkflowHealth:
+        if workflow_id is None:
+            return WorkflowHealth(
+                key=exp.key,
+                workflow_id=None,
+                name=None,
+                expected_cron=exp.expected_cron,
+                actual_cron=None,
+                schedule_drift=False,
+                executions_count=0,
+                success_count=0,
+                error_count=0,
+                success_rate=0.0,
+                last_success_started_at=None,
+                last_success_age_hours=None,
+                issues=[f"Workflow not found (name_pattern={exp.name_pattern!r})"],
+                warnings=[],
+            )
+        tracked = self.tracked[workflow_id]
+        executions = list(tracked.executions)
+        success_count = sum(1 for e in executions if e["status"] == "success")
+        error_count = sum(1 for e in executions if e["status"] == "error")
+        success_rate = (success_count / len(executions)) if executions else 0.0
+        last = tracked.last_success
+        last_dt = parse_iso(last["startedAt"]) if last else None
+        now = dt.datetime.now(tz=dt.timezone.utc)
+        age_hours = ((now - last_dt).total_seconds() / 3600.0) if last_dt else None
+
+        issues: List[str] = []
+        warnings: List[str] = []
+        expected_cron = exp.expected_cron
+        schedule_drift = expected_cron is not None and tracked.actual_cron != expected_cron
+        if schedule_drift:
+            issues.append(f"Schedule drift: expected '{expected_cron}' but live is '{tracked.actual_cron}'")
+        if exp.max_success_age_hours is not None and (age_hours is None or age_hours > exp.max_success_age_hours):
+            issues.append(f"Last success too old: age_hours={age_hours} threshold={exp.max_success_age_hours}")
+        if success_rate < exp.min_success_rate:
+            warnings.append(
+                f"Success rate below target: success_rate={success_rate:.2f} target={exp.min_success_rate:.2f}"
+            )
+        warnings.extend(self._node_warnings(tracked))
+
+        return WorkflowHealth(
+            key=exp.key,
+            workflow_id=workflow_id,
+            name=tracked.name,
+            expected_cron=expected_cron,
+            actual_cron=tracked.actual_cron,
+            schedule_drift=schedule_drift,
+            executions_count=len(executions),
+            success_count=success_count,
+            error_count=error_count,
+            success_rate=success_rate,
+            last_success_started_at=last["startedAt"] if last else None,
+            last_success_age_hours=age_hours,
+            issues=issues,
+            warnings=warnings,
+        )
+
+    def probe(self) -> FleetResult:
+        started = time.perf_counter()
+        if not self._bootstrapped:
+            # Take the watermark before seeding windows so nothing falls in between;
+            # overlap is de-duplicated in _fold.
+            row = self.conn.execute("select max(id) as max_id from execution_entity").fetchone()
+            self.watermark = int(row["max_id"] or 0) if row else 0
+            self._bootstrapped = True
+        resolved = self._sync_workflows()
+        new_rows = self._read_delta()
+        health = [self._evaluate(exp, resolved.get(exp.key)) for exp in self.expectations]
+        return FleetResult(
+            workflows=health,
+            new_executions=new_rows,
+            watermark=self.watermark,
+            seconds=time.perf_counter() - started,
+        )
+
+
+def _print_result(result: FleetResult, as_json: bool) -> None:
+    if as_json:
+        print(json.dumps({**asdict(result), "issues": result.issues, "warnings": result.warnings}, sort_keys=True))
+        return
+    print(
+        "[probe-fleet] workflows:", len(result.workflows),
+        "new_executions:", result.new_executions,
+        "watermark:", result.watermark,
+        f"seconds: {result.seconds:.3f}",
+    )
+    for health in result.workflows:
+        age = f"{health.last_success_age_hours:.2f}" if health.last_success_age_hours is not None else None
+        print(
+            f"[probe-fleet] {health.key}: id={health.workflow_id} cron={health.actual_cron}"
+            f" success_rate={health.success_rate:.2f} ({health.success_count}/{health.executions_count})"
+            f" last_success_age_hours={age}"
+        )
+    if result.issues:
+        print("[probe-fleet] ISSUES:")
+        for issue in result.issues:
+            print("  -", issue)
+    if result.warnings:
+        print("[probe-fleet] WARNINGS:")
+        for warning in result.warnings:
+            print("  -", warning)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Probe every managed workflow in one pass")
+    parser.add_argument("--json", action="store_true", help="Print one JSON document per pass")
+    parser.add_argument("--daemon", action="store_true", help="Keep running and probe every --interval seconds")
+    parser.add_argument("--interval", type=float, default=60.0)
+    args = parser.parse_args()
+
+    fleet = FleetProbe()
+    try:
+        if not args.daemon:
+            result = fleet.probe()
+            _print_result(result, args.json)
+            return 1 if result.issues else 0
+        while True:
+            started = time.monotonic()
+            try:
+                _print_result(fleet.probe(), args.json)
+            except Exception as exc:  # pragma: no cover - network variability
+                print("[probe-fleet] probe_error:", exc)
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        fleet.close()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Record a golden corpus of real Daily Pack node inputs/outputs for benchmarks and tests.
+
+Each selected execution contributes one gzipped JSON snapshot per node
+({node, execution_id, execution_time_ms, input, output}); the semantic
+dedupe embedding store is added as packed float32 vectors. Everything is
+scrubbed (secrets redacted, handles/emails pseudonymized) before it is
+written to a new version directory `tests/fixtures/golden/vN/` and
+published in `index.json`.
+
+Run:
+  python3 scripts/record_golden_corpus.py --latest 3
+  python3 scripts/record_golden_corpus.py --execution-id 812 --execution-id 815 --node "Semantic Dedupe"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Any, Dict, List
+
+from _env import load_env
+from _golden_corpus import (
+    FORMAT_VERSION,
+    Scrubber,
+    content_sha256,
+    default_corpus_dir,
+    dumps_gz,
+    encode_vectors,
+    item_payloads,
+    next_version,
+    read_index,
+    utc_now,
+    write_version,
+)
+from _n8n_db import connect, execution_result, load_execution_data, load_execution_workflow, recent_executions
+from replay_node import input_items
+
+
+# Stages whose inputs/outputs are worth benchmarking: sources, dedupe, clustering, ranking.
+CORPUS_NODES = (
+    "RSS Fetch All",
+    "X Keyword Search",
+    "X Account Search",
+    "Multi News API",
+    "Cross-Day Dedupe",
+    "Semantic Dedupe",
+    "Event Clustering",
+    "LLM Rank",
+    "Generate Tweets",
+)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-")
+
+
+def _successful_executions(conn: Any, limit: int) -> List[Any]:
+    from _n8n_api import build_client
+
+    daily = build_client().find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
+    if not daily:
+        raise SystemExit("Daily Pack workflow not found")
+    rows = [r for r in recent_executions(conn, daily["id"], limit=max(50, limit * 5)) if r["status"] == "success"]
+    return rows[:limit]
+
+
+def _store_entries(path: Path) -> List[Dict[str, Any]]:
+    """The node's store as [{id, title, timestamp, embedding}], from the JSON file or a binary .vec store."""
+    if path.suffix != ".vec":  # _vector_store.is_binary_store, without pulling in numpy
+        store = json.loads(path.read_text(encoding="utf-8"))
+        return [e for e in (store.get("embeddings") or []) if isinstance(e.get("embedding"), list) and e["embedding"]]
+    from _vector_store import VectorStore  # needs numpy, like the binary store itself
+
+    vectors, entries = VectorStore(path).read()
+    return [
+        {"id": e.id, "title": e.title, "timestamp": e.timestamp, "embedding": vector.tolist()}
+        for e, vector in zip(entries, vectors)
+    ]
+
+
+def _embedding_snapshot(path: Path, scrubber: Scrubber, limit: int) -> Dict[str, Any]:
+    entries = _store_entries(path)
+    entries.sort(key=lambda e: e.get("timestamp") or 0, reverse=True)
+    entries = entries[:limit]
+    dims = len(entries[0]["embedding"]) if entries else 0
+    entries = [e for e in entries if len(e["embedding"]) == dims]
+    return {
+        "dims": dims,
+        "dtype": "float32",
+        "entries": [
+            {
+                "id": scrubber.scrub(str(e.get("id", ""))),
+                "title": scrubber.scrub(str(e.get("title", ""))),
+                "timestamp": e.get("timestamp"),
+            }
+            for e in entries
+        ],
+        "vectors": encode_vectors([e["embedding"] for e in entries]),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Record a scrubbed, versioned golden corpus from executions")
+    parser.add_argument("--execution-id", type=int, action="append", default=[], help="Execution to record (repeatable)")
+    parser.add_argument("--latest", type=int, default=3, help="Without --execution-id: last N successful runs")
+    parser.add_argument("--node", action="append", default=[], help="Node to snapshot (repeatable; default: CORPUS_NODES)")
+    parser.add_argument("--out", default=None, help="Corpus directory (default: GOLDEN_CORPUS_DIR or tests/fixtures/golden)")
+    parser.add_argument(
+        "--embeddings-store",
+        default=None,
+        help="Semantic dedupe file store on the host, JSON or .vec (default: SEMANTIC_DEDUPE_STORE_PATH"
+        " or ~/.n8n/x-daily-pack-embeddings.json; skipped if missing)",
+    )
+    parser.add_argument("--max-embeddings", type=int, default=5000)
+    parser.add_argument("--no-embeddings", action="store_true")
+    parser.add_argument("--force", action="store_true", help="Write a new version even if content is unchanged")
+    parser.add_argument("--dry-run", action="store_true", help="Print the manifest without writing")
+    args = parser.parse_args()
+
+    load_env()
+    conn = connect()
+    corpus_dir = Path(args.out) if args.out else default_corpus_dir()
+    nodes = args.node or list(CORPUS_NODES)
+    scrubber = Scrubber.from_env()
+
+    if args.execution_id:
+        placeholders = ",".join("?" for _ in args.execution_id)
+        rows = conn.execute(
+            f"select id, status, startedAt, stoppedAt from execution_entity where id in ({placeholders}) order by id",
+            args.execution_id,
+        ).fetchall()
+    else:
+        rows = _successful_executions(conn, args.latest)
+    if not rows:
+        raise SystemExit("No executions to record")
+
+    files: Dict[str, bytes] = {}
+    executions = []
+    workflow_id = None
+    for row in rows:
+        execution_id = int(row["id"])
+        payload = load_execution_data(conn, execution_id)
+        if not payload:
+            print(f"[corpus] skip execution_id={execution_id}: execution_data missing")
+            continue
+        _, run_data, _ = execution_result(payload)
+        workflow = load_execution_workflow(conn, execution_id)
+        workflow_id = workflow_id or (workflow or {}).get("id")
+        entry: Dict[str, Any] = {
+            "id": execution_id,
+            "status": row["status"],
+            "startedAt": row["startedAt"],
+            "stoppedAt": row["stoppedAt"],
+            "nodes": {},
+        }
+        for name in nodes:
+            runs = run_data.get(name)
+            if not runs:
+                continue
+            last = runs[-1]
+            main = (last.get("data") or {}).get("main") or [[]]
+            snapshot = {
+                "node": name,
+                "execution_id": execution_id,
+                "execution_time_ms": sum(int(r.get("executionTime") or 0) for r in runs),
+                "input": scrubber.scrub(item_payloads(input_items(run_data, workflow, name))),
+                "output": scrubber.scrub(item_payloads(main[0] or [])),
+            }
+            rel = f"{execution_id}/{_slug(name)}.json.gz"
+            files[rel] = dumps_gz(snapshot)
+            entry["nodes"][name] = {
+                "file": rel,
+                "input_items": len(snapshot["input"]),
+                "output_items": len(snapshot["output"]),
+                "execution_time_ms": snapshot["execution_time_ms"],
+                "bytes": len(files[rel]),
+                "sha256": hashlib.sha256(files[rel]).hexdigest(),
+            }
+        executions.append(entry)
+
+    embeddings = None
+    if args.embeddings_store:
+        store_path = Path(args.embeddings_store).expanduser()
+    else:
+        from _dedupe_engine import default_store_path
+
+        store_path = default_store_path()
+    if not args.no_embeddings and store_path.exists():
+        snapshot = _embedding_snapshot(store_path, scrubber, args.max_embeddings)
+        files["embeddings.json.gz"] = dumps_gz(snapshot)
+        embeddings = {
+            "file": "embeddings.json.gz",
+            "count": len(snapshot["entries"]),
+            "dims": snapshot["dims"],
+            "bytes": len(files["embeddings.json.gz"]),
+        }
+
+    digest = content_sha256(files)
+    index = read_index(corpus_dir)
+    version = next_version(corpus_dir)
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "created_at": utc_now(),
+        "workflow_id": workflow_id,
+        "content_sha256": digest,
+        "scrubbed": dict(sorted(scrubber.counts.items())),
+        "executions": executions,
+        "embeddings": embeddings,
+    }
+
+    total = sum(len(b) for b in files.values())
+    print(
+        f"[corpus] executions={len(executions)} snapshots={sum(len(e['nodes']) for e in executions)}"
+        f" embeddings={embeddings['count'] if embeddings else 0} bytes={total}"
+        f" scrubbed={sum(scrubber.counts.values())}"
+    )
+    if args.dry_run:
+        print(json.dumps(manifest, indent=2, ensure_ascii=False))
+        return 0
+    latest = next((v for v in index["versions"] if v["version"] == index.get("latest")), None)
+    if latest and latest.get("content_sha256") == digest and not args.force:
+        print(f"[corpus] unchanged since {latest['version']}; nothing written (set GOLDEN_CORPUS_SALT for stable pseudonyms)")
+        return 0
+    target = write_version(corpus_dir, version, files, manifest)
+    print(f"[corpus] wrote {version} -> {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+#!/usr/bin/env node
+/**
+ * Offline replay harness for n8n Code nodes.
+ *
+ * Reads one job as JSON on stdin:
+ *   { code, items, env, runs, staticData, fixtures, embeddingDims }
+ * and runs `code` the way n8n's Code node does ("Run Once for All Items"):
+ * `$input`, `$env`, `require`, and `this.helpers.httpRequest` /
+ * `this.getWorkflowStaticData` are provided, but no request leaves the
+ * machine. HTTP calls are answered from `fixtures` ({ match, method,
+ * status, body, delayMs }) or, for OpenAI embeddings, by a deterministic
+ * hashed bag-of-words embedder; anything else throws like a failed request.
+ *
+ * Writes { items, durationsMs, httpCalls, logs, error, staticData } to stdout.
+ */
+
+import { createRequire } from "module";
+import { performance } from "perf_hooks";
+
+const require = createRequire(import.meta.url);
+const AsyncFunction = Object.getPrototypeOf(async () => {}).constructor;
+
+const readStdin = async () => {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return Buffer.concat(chunks).toString("utf8");
+};
+
+const clone = (value) => (value === undefined ? undefined : JSON.parse(JSON.stringify(value)));
+
+// FNV-1a, 32-bit.
+const hash32 = (text) => {
+  let h = 0x811c9dc5;
+  for (let i = 0; i < text.length; i++) {
+    h ^= text.charCodeAt(i);
+    h = Math.imul(h, 0x01000193);
+  }
+  return h >>> 0;
+};
+
+// Similar texts share tokens and therefore land close together, which keeps
+// dedupe/clustering thresholds meaningful without calling the real model.
+const fakeEmbedding = (text, dims) => {
+  const vector = new Array(dims).fill(0);
+  const tokens = String(text || "").toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+  const features = tokens.concat(tokens.slice(1).map((t, i) => `${tokens[i]} ${t}`));
+  for (const feature of features) {
+    const h = hash32(feature);
+    vector[h % dims] += h & 0x80000000 ? -1 : 1;
+  }
+  const norm = Math.sqrt(vector.reduce((sum, v) => sum + v * v, 0)) || 1;
+  return vector.map((v) => v / norm);
+};
+
+const makeHttpRequest = (job, calls) => async (options = {}) => {
+  const method = String(options.method || "GET").toUpperCase();
+  const url = String(options.url || options.uri || "");
+  const started = performance.now();
+  const record = { method, url, source: "unmatched" };
+  calls.push(record);
+
+  const fixture = (job.fixtures || []).find(
+    (f) => new RegExp(f.match).test(url) && (!f.method || f.method.toUpperCase() === method),
+  );
+  let body;
+  let statusCode = 200;
+  if (fixture) {
+    record.source = "fixture";
+    if (fixture.delayMs) await new Promise((resolve) => setTimeout(resolve, fixture.delayMs));
+    statusCode = fixture.status || 200;
+    body = clone(fixture.body);
+  } else if (/\/v1\/embeddings$/.test(url)) {
+    record.source = "embedder";
+    const input = options.body?.input;
+    const texts = Array.isArray(input) ? input : [input];
+    const dims = options.body?.dimensions || job.embeddingDims || 1536;
+    body = {
+      object: "list",
+      model: options.body?.model,
+      data: texts.map((text, index) => ({ object: "embedding", index, embedding: fakeEmbedding(text, dims) })),
+      usage: { prompt_tokens: 0, total_tokens: 0 },
+    };
+  } else {
+    record.ms = performance.now() - started;
+    throw new Error(`offline replay: no fixture for ${method} ${url}`);
+  }
+  record.ms = performance.now() - started;
+  if (statusCode >= 400 && !options.ignoreHttpStatusErrors) {
+    const error = new Error(`Request failed with status code ${statusCode}`);
+    error.httpCode = String(statusCode);
+    throw error;
+  }
+  return options.returnFullResponse ? { statusCode, headers: {}, body } : body;
+};
+
+const normalizeItems = (result) => {
+  if (result === undefined || result === null) return [];
+  const list = Array.isArray(result) ? result : [result];
+  return list.map((item) => (item && typeof item === "object" && "json" in item ? item : { json: item }));
+};
+
+const runOnce = async (job, runner, calls, logs) => {
+  const items = clone(job.items || []);
+  const staticData = clone(job.staticData || {});
+  const $input = {
+    all: () => items,
+    first: () => items[0],
+    last: () => items[items.length - 1],
+    item: items[0],
+  };
+  const context = {
+    helpers: { httpRequest: makeHttpRequest(job, calls) },
+    getWorkflowStaticData: () => staticData,
+  };
+  const sandboxConsole = {
+    log: (...args) => logs.push(args.map(String).join(" ")),
+    warn: (...args) => logs.push(args.map(String).join(" ")),
+    error: (...args) => logs.push(args.map(String).join(" ")),
+  };
+  const started = performance.now();
+  const result = await runner.call(context, $input, job.env || {}, require, sandboxConsole);
+  return { ms: performance.now() - started, items: normalizeItems(result), staticData };
+};
+
+const main = async () => {
+  const job = JSON.parse(await readStdin());
+  const runner = new AsyncFunction("$input", "$env", "require", "console", job.code);
+  const runs = Math.max(1, job.runs || 1);
+  const out = { items: [], durationsMs: [], httpCalls: [], logs: [], error: null, staticData: null };
+  for (let i = 0; i < runs; i++) {
+    const calls = [];
+    const logs = [];
+    try {
+      const result = await runOnce(job, runner, calls, logs);
+      out.durationsMs.push(result.ms);
+      out.items = result.items;
+      out.staticData = result.staticData;
+    } catch (err) {
+      out.error = String(err?.stack || err);
+    }
+    // First run's side channel is representative; later runs only add timings.
+    if (i === 0) {
+      out.httpCalls = calls;
+      out.logs = logs.slice(0, 200);
+    }
+    if (out.error) break;
+  }
+  process.stdout.write(JSON.stringify(out));
+};
+
+main().catch((err) => {
+  process.stdout.write(JSON.stringify({ error: String(err?.stack || err) }));
+  process.exit(1);
+});
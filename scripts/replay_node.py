@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Replay Daily Pack code nodes offline against a recorded execution.
+
+For each selected node, the input items are taken from the recorded
+execution's `execution_data` (the parent node's output, following runData
+`source` or the workflow snapshot's connections), and the node's current
+source from CODE_NODE_SOURCES, built the way deploy ships it, is re-run in scripts/replay-node-harness.mjs
+with mocked `$env` / `this.helpers.httpRequest`. The report compares replay
+timing with the recorded executionTime and diffs replay output against the
+recorded output.
+
+Run:
+  python3 scripts/replay_node.py --node "Semantic Dedupe" --node "Event Clustering" --runs 5
+  python3 scripts/replay_node.py --execution-id 1234 --source "Semantic Dedupe=/tmp/semantic-dedupe-node.js"
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from _bundle import BundleError, annotate_error, bundle
+from _env import load_env
+from _n8n_db import (
+    connect,
+    execution_result,
+    load_execution_data,
+    load_execution_workflow,
+    recent_executions,
+)
+from deploy_daily_pack import CODE_NODE_SOURCES
+
+
+ROOT = Path(__file__).resolve().parents[1]
+HARNESS = ROOT / "scripts" / "replay-node-harness.mjs"
+# The harness runs code through `new AsyncFunction(...)`, whose header takes two lines.
+HARNESS_LINE_OFFSET = 2
+
+# Replays must never touch the production dedupe stores (or the embedding cache) on this host.
+REPLAY_ENV_DEFAULTS = {
+    "DEDUPE_FILE_STORE": "false",
+    "SEMANTIC_DEDUPE_FILE_STORE": "false",
+    "SEMANTIC_DEDUPE_EMBED_CACHE": "false",
+}
+# Nodes skip their work without a key; the mocked transport never sends it anywhere.
+REPLAY_PLACEHOLDER_KEYS = ("OPENAI_API_KEY",)
+
+
+def _main_output(runs: List[Dict[str, Any]], run_index: int = -1, output: int = 0) -> List[Dict[str, Any]]:
+    if not runs:
+        return []
+    main = (runs[run_index].get("data") or {}).get("main") or []
+    if output < len(main) and isinstance(main[output], list):
+        return main[output]
+    return []
+
+
+def _parents(workflow: Optional[Dict[str, Any]], node: str) -> List[Tuple[str, int]]:
+    found = []
+    for parent, outputs in ((workflow or {}).get("connections") or {}).items():
+        for output_index, targets in enumerate((outputs or {}).get("main") or []):
+            for target in targets or []:
+                if target.get("node") == node and int(target.get("index", 0)) == 0:
+                    found.append((parent, output_index))
+    return found
+
+
+def input_items(run_data: Dict[str, Any], workflow: Optional[Dict[str, Any]], node: str) -> List[Dict[str, Any]]:
+    """Items the node received on its first input in the recorded run."""
+    runs = run_data.get(node) or []
+    sources = (runs[-1].get("source") or []) if runs else []
+    if sources and isinstance(sources[0], dict) and sources[0].get("previousNode"):
+        source = sources[0]
+        return _main_output(
+            run_data.get(source["previousNode"]) or [],
+            int(source.get("previousNodeRun") or 0),
+            int(source.get("previousNodeOutput") or 0),
+        )
+    for parent, output_index in _parents(workflow, node):
+        if parent in run_data:
+            return _main_output(run_data[parent], -1, output_index)
+    return []
+
+
+def _item_key(item: Dict[str, Any]) -> str:
+    payload = item.get("json", item) if isinstance(item, dict) else item
+    if isinstance(payload, dict):
+        for field in ("url", "link", "id", "tweet_id", "title", "text"):
+            if payload.get(field):
+                return f"{field}:{payload[field]}"
+    return "hash:" + hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+
+def diff_items(recorded: List[Dict[str, Any]], replayed: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rec = {_item_key(i): i.get("json", i) for i in recorded}
+    rep = {_item_key(i): i.get("json", i) for i in replayed}
+    common = [k for k in rec if k in rep]
+    changed = [k for k in common if rec[k] != rep[k]]
+    changed_fields: Dict[str, int] = {}
+    for key in changed:
+        a, b = rec[key], rep[key]
+        if isinstance(a, dict) and isinstance(b, dict):
+            for field in set(a) | set(b):
+                if a.get(field) != b.get(field):
+                    changed_fields[field] = changed_fields.get(field, 0) + 1
+    rep_order = [k for k in rep if k in rec]
+    return {
+        "recorded": len(recorded),
+        "replayed": len(replayed),
+        "added": sorted(set(rep) - set(rec))[:5],
+        "added_count": len(set(rep) - set(rec)),
+        "removed": sorted(set(rec) - set(rep))[:5],
+        "removed_count": len(set(rec) - set(rep)),
+        "changed_count": len(changed),
+        "changed_fields": dict(sorted(changed_fields.items(), key=lambda kv: -kv[1])[:8]),
+        "order_changed": common != rep_order,
+    }
+
+
+def _replay_env(overrides: List[str]) -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(REPLAY_ENV_DEFAULTS)
+    for key in REPLAY_PLACEHOLDER_KEYS:
+        env.setdefault(key, "replay-offline")
+    for raw in overrides:
+        key, _, value = raw.partition("=")
+        env[key] = value
+    return env
+
+
+def run_harness(job: Dict[str, Any], timeout: float = 600) -> Dict[str, Any]:
+    proc = subprocess.run(
+        ["node", str(HARNESS)],
+        input=json.dumps(job),
+        capture_output=True,
+        text=True,
+        timeout=timeout,
+    )
+    try:
+        return json.loads(proc.stdout or "{}")
+    except json.JSONDecodeError:
+        return {"error": (proc.stderr or proc.stdout or "harness produced no output")[-2000:]}
+
+
+def _latest_execution(conn: Any) -> int:
+    from _n8n_api import build_client
+
+    daily = build_client().find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
+    if not daily:
+        raise SystemExit("Daily Pack workflow not found")
+    for row in recent_executions(conn, daily["id"], limit=50):
+        if row["status"] == "success":
+            return int(row["id"])
+    raise SystemExit("No successful Daily Pack execution to replay")
+
+
+def replay_node(
+    node: str,
+    source: Path,
+    run_data: Dict[str, Any],
+    workflow: Optional[Dict[str, Any]],
+    env: Dict[str, str],
+    runs: int,
+    fixtures: List[Dict[str, Any]],
+    static_data: Dict[str, Any],
+) -> Dict[str, Any]:
+    recorded_runs = run_data.get(node) or []
+    items = input_items(run_data, workflow, node)
+    try:
+        built = bundle(source, name=node)
+    except BundleError as exc:
+        raise SystemExit(f"Cannot build {source}: {exc}")
+    result = run_harness(
+        {
+            "code": built.code,
+            "items": items,
+            "env": env,
+            "runs": runs,
+            "fixtures": fixtures,
+            "staticData": static_data.get(node, {}),
+        }
+    )
+    durations = result.get("durationsMs") or []
+    calls = result.get("httpCalls") or []
+    return {
+        "node": node,
+        "source": str(source),
+        "input_items": len(items),
+        "recorded_ms": sum(int(r.get("executionTime") or 0) for r in recorded_runs),
+        "replay_ms_min": min(durations) if durations else None,
+        "replay_ms_p50": statistics.median(durations) if durations else None,
+        "runs": len(durations),
+        "http_calls": len(calls),
+        "http_unmatched": sorted({f"{c['method']} {c['url']}" for c in calls if c.get("source") == "unmatched"}),
+        "diff": diff_items(_main_output(recorded_runs), result.get("items") or []),
+        "error": annotate_error(result.get("error"), built.source_map, HARNESS_LINE_OFFSET),
+        "logs": (result.get("logs") or [])[-5:],
+    }
+
+
+def _print_report(execution_id: int, reports: List[Dict[str, Any]]) -> None:
+    print(f"[replay] execution_id={execution_id} nodes={len(reports)}")
+    for r in reports:
+        p50 = f"{r['replay_ms_p50']:.1f}ms" if r["replay_ms_p50"] is not None else "-"
+        best = f"{r['replay_ms_min']:.1f}ms" if r["replay_ms_min"] is not None else "-"
+        d = r["diff"]
+        print(
+            f"[replay] {r['node']}: input={r['input_items']} recorded={r['recorded_ms']}ms"
+            f" replay_p50={p50} replay_min={best} runs={r['runs']} http_calls={r['http_calls']}"
+        )
+        print(
+            f"  output: recorded={d['recorded']} replayed={d['replayed']} added={d['added_count']}"
+            f" removed={d['removed_count']} changed={d['changed_count']} order_changed={d['order_changed']}"
+        )
+        if d["changed_fields"]:
+            print("  changed_fields:", ", ".join(f"{k}={v}" for k, v in d["changed_fields"].items()))
+        for key in d["removed"]:
+            print("  - removed", key[:140])
+        for key in d["added"]:
+            print("  + added", key[:140])
+        for call in r["http_unmatched"][:5]:
+            print("  http_unmatched:", call[:140])
+        if r["error"]:
+            print("  ERROR:", r["error"].splitlines()[0][:300])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Replay code nodes offline against a recorded execution")
+    parser.add_argument("--execution-id", type=int, default=None, help="Default: latest successful Daily Pack run")
+    parser.add_argument("--node", action="append", default=[], help="Node to replay (repeatable; default: all)")
+    parser.add_argument("--runs", type=int, default=3, help="Timed runs per node")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="Override $env for the replay")
+    parser.add_argument(
+        "--source",
+        action="append",
+        default=[],
+        metavar="NODE=PATH",
+        help="Replay an alternative source file for a node (default: CODE_NODE_SOURCES)",
+    )
+    parser.add_argument("--http-fixtures", default=None, help="JSON list of {match, method, status, body, delayMs}")
+    parser.add_argument("--static-data", default=None, help="JSON object: node name -> workflow static data")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    load_env()
+    conn = connect()
+    execution_id = args.execution_id or _latest_execution(conn)
+    payload = load_execution_data(conn, execution_id)
+    if not payload:
+        raise SystemExit(f"execution_data missing for execution {execution_id}")
+    _, run_data, _ = execution_result(payload)
+    workflow = load_execution_workflow(conn, execution_id)
+
+    sources = dict(CODE_NODE_SOURCES)
+    for raw in args.source:
+        name, _, path = raw.partition("=")
+        sources[name] = Path(path)
+    nodes = args.node or [name for name in sources if name in run_data]
+    missing = [n for n in nodes if n not in sources or n not in run_data]
+    if missing:
+        raise SystemExit(f"Not replayable (no source or not in execution {execution_id}): {', '.join(missing)}")
+
+    fixtures = json.loads(Path(args.http_fixtures).read_text(encoding="utf-8")) if args.http_fixtures else []
+    static_data = json.loads(Path(args.static_data).read_text(encoding="utf-8")) if args.static_data else {}
+    env = _replay_env(args.env)
+
+    reports = [
+        replay_node(node, sources[node], run_data, workflow, env, args.runs, fixtures, static_data) for node in nodes
+    ]
+    if args.json:
+        print(json.dumps({"execution_id": execution_id, "nodes": reports}, sort_keys=True))
+    else:
+        _print_report(execution_id, reports)
+    return 1 if any(r["error"] for r in reports) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env node
+/**
+ * Baseline for scripts/dedupe_engine.py bench: the Semantic Dedupe node's
+ * comparison loop, as written in semantic-dedupe-node.js, with the
+ * cosineSimilarity helper from scripts/lib/common.js.
+ *
+ * Reads { threshold, runs, history: [[...]], batch: [[...]] } as JSON on stdin
+ * and writes { ms, duplicates } (median loop time, verdict per batch item).
+ */
+
+import fs from "fs";
+import path from "path";
+import { fileURLToPath } from "url";
+import { performance } from "perf_hooks";
+
+const here = path.dirname(fileURLToPath(import.meta.url));
+const common = fs.readFileSync(path.join(here, "lib", "common.js"), "utf8");
+const { cosineSimilarity } = new Function(`${common}\nreturn { cosineSimilarity };`)();
+
+const readStdin = async () => {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return Buffer.concat(chunks).toString("utf8");
+};
+
+const median = (values) => {
+  const sorted = [...values].sort((a, b) => a - b);
+  const mid = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2;
+};
+
+const job = JSON.parse(await readStdin());
+const threshold = job.threshold ?? 0.85;
+const history = job.history.map((embedding) => ({ embedding }));
+
+const run = () => {
+  const duplicates = [];
+  const newEmbeddings = [];
+  for (const embedding of job.batch) {
+    let isDuplicate = false;
+    for (const historical of history) {
+      if (cosineSimilarity(embedding, historical.embedding) >= threshold) {
+        isDuplicate = true;
+        break;
+      }
+    }
+    if (!isDuplicate) {
+      for (const newEmb of newEmbeddings) {
+        if (cosineSimilarity(embedding, newEmb.embedding) >= threshold) {
+          isDuplicate = true;
+          break;
+        }
+      }
+    }
+    duplicates.push(isDuplicate);
+    if (!isDuplicate) newEmbeddings.push({ embedding });
+  }
+  return duplicates;
+};
+
+const samples = [];
+let duplicates = [];
+for (let i = 0; i < Math.max(1, job.runs || 3); i++) {
+  const started = performance.now();
+  duplicates = run();
+  samples.push(performance.now() - started);
+}
+
+process.stdout.write(JSON.stringify({ ms: median(samples), duplicates }));
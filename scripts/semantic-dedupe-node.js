@@ -2,7 +2,7 @@
 // 使用 OpenAI Embedding 进行语义级去重，识别"不同URL但话题相同"的内容
 //
 // 工作流程：
-// 1. 为每条内容生成 Embedding 向量
+// 1. 为每条内容生成 Embedding 向量（相同文本命中本地缓存则不调用 API）
 // 2. 与历史 Embedding 计算余弦相似度
 // 3. 相似度 > 阈值 → 判定为语义重复 → 过滤
 // 4. 通过的内容更新到历史存储
@@ -19,12 +19,22 @@ const BATCH_SIZE = Number.parseInt($env.SEMANTIC_DEDUPE_BATCH_SIZE || '20', 10);
 const DEBUG = $env.SEMANTIC_DEDUPE_DEBUG === 'true';
 const FILE_STORE_ENABLED = String($env.SEMANTIC_DEDUPE_FILE_STORE || 'true').toLowerCase() !== 'false';
 const FILE_STORE_PATH = $env.SEMANTIC_DEDUPE_STORE_PATH || '/home/node/.n8n/x-daily-pack-embeddings.json';
-
-const safeRequire = (name) => {
-  try { return require(name); } catch (err) { return null; }
-};
+// 路径以 .vec 结尾时使用二进制存储（scripts/lib/vector-store.js）：float16/int8 定长向量 + .vec.idx 元数据索引，只追加新行
+const BINARY_STORE = FILE_STORE_PATH.endsWith('.vec');
+const STORE_DTYPE = $env.SEMANTIC_DEDUPE_STORE_DTYPE || 'float16';
+// Embedding 缓存：同一模型 + 同一规范化文本（sha256）直接复用已有向量，不再调用 API；按创建时间 TTL、按最近使用 LRU 淘汰
+const EMBED_CACHE_ENABLED = String($env.SEMANTIC_DEDUPE_EMBED_CACHE || 'true').toLowerCase() !== 'false';
+const EMBED_CACHE_PATH = $env.SEMANTIC_DEDUPE_EMBED_CACHE_PATH || '/home/node/.n8n/x-daily-pack-embedding-cache.vec';
+const EMBED_CACHE_MAX = Number.parseInt($env.SEMANTIC_DEDUPE_EMBED_CACHE_MAX || '5000', 10);
+const EMBED_CACHE_TTL_DAYS = Number.parseInt($env.SEMANTIC_DEDUPE_EMBED_CACHE_TTL_DAYS || '30', 10);
+// scripts/dedupe_engine.py serve：设置后由向量化引擎判重并持有历史；不可用时回退到下面的逐条比较
+const ENGINE_URL = String($env.SEMANTIC_DEDUPE_ENGINE_URL || '').replace(/\/+$/, '');
+const ENGINE_TIMEOUT_MS = Number.parseInt($env.SEMANTIC_DEDUPE_ENGINE_TIMEOUT_MS || '10000', 10);
+
+// @include safeRequire, cosineSimilarity, chunk, loadVecStore, saveVecStore, newVecState, readVecStore, vecEmbedding
 const fs = safeRequire('fs');
 const path = safeRequire('path');
+const crypto = safeRequire('crypto');
 
 if (!apiKey) {
   console.log('Warning: Missing OPENAI_API_KEY, skipping semantic dedupe');
@@ -37,19 +47,6 @@ if (items.length === 0) {
 
 // ============== 工具函数 ==============
 
-// 余弦相似度计算
-const cosineSimilarity = (a, b) => {
-  if (!a || !b || a.length !== b.length) return 0;
-  let dot = 0, normA = 0, normB = 0;
-  for (let i = 0; i < a.length; i++) {
-    dot += a[i] * b[i];
-    normA += a[i] * a[i];
-    normB += b[i] * b[i];
-  }
-  if (normA === 0 || normB === 0) return 0;
-  return dot / (Math.sqrt(normA) * Math.sqrt(normB));
-};
-
 // 生成内容的文本表示（用于Embedding）
 const getContentText = (item) => {
   const data = item.json || item;
@@ -104,13 +101,86 @@ const getEmbeddings = async (texts) => {
   }
 };
 
-// 分批处理
-const chunk = (arr, size) => {
-  const chunks = [];
-  for (let i = 0; i < arr.length; i += size) {
-    chunks.push(arr.slice(i, i + size));
+// ============== Embedding 缓存 ==============
+
+// 缓存键：模型 + 规范化文本（NFKC、空白折叠）的 sha256；只用于查缓存，发给 API 的仍是原文本
+const embeddingCacheKey = (text) => {
+  const normalized = text.normalize('NFKC').replace(/\s+/g, ' ').trim();
+  return `${EMBEDDING_MODEL}:${crypto.createHash('sha256').update(normalized).digest('hex').slice(0, 32)}`;
+};
+
+// { entries: Map key -> {id, timestamp, title, row | embedding}（按最近使用排序，最旧在前）, state }
+const loadEmbeddingCache = () => {
+  if (!EMBED_CACHE_ENABLED || !fs || !crypto) return null;
+  try {
+    const { entries, state } = readVecStore(fs, EMBED_CACHE_PATH);
+    return { entries: new Map(entries.map(entry => [entry.id, entry])), state };
+  } catch (err) {
+    console.log(`[Semantic Dedupe] Embedding cache load failed: ${err.message}`);
+    return { entries: new Map(), state: newVecState() };
+  }
+};
+
+const cachedEmbedding = (cache, key, now, ttlMs) => {
+  const entry = cache.entries.get(key);
+  if (!entry || now - entry.timestamp >= ttlMs || (!entry.embedding && !cache.state.source)) return null;
+  if (!entry.embedding) entry.embedding = vecEmbedding(cache.state, entry.row);
+  // 移到末尾 = 最近使用
+  cache.entries.delete(key);
+  cache.entries.set(key, entry);
+  return entry.embedding;
+};
+
+// 过期（创建超过 TTL）与超出上限的最久未用条目被淘汰；累计命中数写在索引 meta 里
+const saveEmbeddingCache = (cache, now, ttlMs, runStats) => {
+  const fresh = [...cache.entries.values()].filter(entry => now - entry.timestamp < ttlMs);
+  const evicted = Math.max(0, fresh.length - EMBED_CACHE_MAX);
+  const kept = fresh.slice(evicted);
+  const meta = {
+    hits: (cache.state.meta.hits || 0) + runStats.hits,
+    misses: (cache.state.meta.misses || 0) + runStats.misses
+  };
+  try {
+    const dir = path ? path.dirname(EMBED_CACHE_PATH) : EMBED_CACHE_PATH.split('/').slice(0, -1).join('/');
+    if (dir) fs.mkdirSync(dir, { recursive: true });
+    saveVecStore(fs, EMBED_CACHE_PATH, kept, cache.state, 'float16', meta);
+  } catch (err) {
+    console.log(`[Semantic Dedupe] Embedding cache save failed: ${err.message}`);
+  }
+  return {
+    embedding_cache_size: kept.length,
+    embedding_cache_expired: cache.entries.size - fresh.length,
+    embedding_cache_evicted: evicted,
+    embedding_cache_lifetime_hit_rate: meta.hits + meta.misses ? Number((meta.hits / (meta.hits + meta.misses)).toFixed(3)) : null
+  };
+};
+
+// 交给 dedupe 引擎判重；失败返回 null
+const dedupeViaEngine = async (entries) => {
+  try {
+    const response = await this.helpers.httpRequest({
+      method: 'POST',
+      url: `${ENGINE_URL}/dedupe`,
+      headers: { 'Content-Type': 'application/json' },
+      body: {
+        threshold: SIMILARITY_THRESHOLD,
+        expiry_days: EXPIRY_DAYS,
+        max_embeddings: MAX_EMBEDDINGS,
+        items: entries.map((entry) => ({
+          id: entry.id,
+          title: String(entry.item.json?.title || entry.text.slice(0, 80)),
+          embedding: entry.embedding
+        }))
+      },
+      json: true,
+      timeout: ENGINE_TIMEOUT_MS
+    });
+    if (!Array.isArray(response?.results) || response.results.length !== entries.length) return null;
+    return response;
+  } catch (error) {
+    console.log(`[Semantic Dedupe] Engine unavailable (${error.message || error}), falling back to local compare`);
+    return null;
   }
-  return chunks;
 };
 
 // ============== 存储管理 ==============
@@ -121,9 +191,16 @@ const normalizeStore = (store) => {
   return store;
 };
 
+let vecState = null;
+
 const loadFileStore = () => {
   if (!FILE_STORE_ENABLED || !fs) return null;
   try {
+    if (BINARY_STORE) {
+      const { embeddings, state } = loadVecStore(fs, FILE_STORE_PATH);
+      vecState = state;
+      return { embeddings };
+    }
     if (!fs.existsSync(FILE_STORE_PATH)) return { embeddings: [] };
     const raw = fs.readFileSync(FILE_STORE_PATH, 'utf8');
     if (!raw) return { embeddings: [] };
@@ -139,6 +216,11 @@ const saveFileStore = (store) => {
   try {
     const dir = path ? path.dirname(FILE_STORE_PATH) : FILE_STORE_PATH.split('/').slice(0, -1).join('/');
     if (dir) fs.mkdirSync(dir, { recursive: true });
+    if (BINARY_STORE) {
+      const written = saveVecStore(fs, FILE_STORE_PATH, store.embeddings, vecState || newVecState(), STORE_DTYPE);
+      if (DEBUG) console.log('[Semantic Dedupe] Binary store write:', JSON.stringify(written));
+      return true;
+    }
     const tmpPath = `${FILE_STORE_PATH}.tmp`;
     fs.writeFileSync(tmpPath, JSON.stringify(store));
     fs.renameSync(tmpPath, FILE_STORE_PATH);
@@ -165,6 +247,130 @@ const mergeEmbeddings = (base, incoming) => {
   return Array.from(map.values());
 };
 
+// 输出统计与（DEBUG 时）重复明细
+const logResults = (stats, duplicates) => {
+  console.log('Semantic Dedupe Stats:', JSON.stringify(stats));
+  if (DEBUG && duplicates.length > 0) {
+    console.log('Semantic Duplicates Found:');
+    duplicates.forEach(d => {
+      console.log(`  - "${d.title.slice(0, 40)}..." (similarity: ${d.similarity.toFixed(3)}) similar to "${d.similarTo.slice(0, 40)}..."`);
+    });
+  }
+};
+
+// ============== 主处理逻辑 ==============
+
+// 准备内容文本
+const itemsWithText = items.map((item, index) => ({
+  item,
+  index,
+  text: getContentText(item),
+  id: getContentId(item)
+})).filter(entry => entry.text.length > 10); // 过滤空内容
+
+if (itemsWithText.length === 0) {
+  console.log('Semantic Dedupe: No valid content to process');
+  return items;
+}
+
+// 批量获取 Embedding：先查缓存，只把缓存里没有的文本（本批内相同文本只算一次）发给 API
+const embedCache = loadEmbeddingCache();
+const embedNow = Date.now();
+const embedTtlMs = EMBED_CACHE_TTL_DAYS * 24 * 60 * 60 * 1000;
+const pending = new Map(); // 缓存键（无缓存时为序号）-> 等待该文本 embedding 的条目
+let cacheHits = 0;
+let batchReused = 0; // 本批内重复的文本：不查缓存也不请求 API，不算缓存命中
+
+itemsWithText.forEach((entry, i) => {
+  const key = embedCache ? embeddingCacheKey(entry.text) : String(i);
+  const cached = embedCache ? cachedEmbedding(embedCache, key, embedNow, embedTtlMs) : null;
+  if (cached) {
+    entry.embedding = cached;
+    cacheHits++;
+  } else if (pending.has(key)) {
+    pending.get(key).push(entry);
+    batchReused++;
+  } else {
+    pending.set(key, [entry]);
+  }
+});
+
+const missKeys = Array.from(pending.keys());
+let apiRequests = 0;
+for (const keys of chunk(missKeys, BATCH_SIZE)) {
+  const batchEmbeddings = await getEmbeddings(keys.map(key => pending.get(key)[0].text));
+  apiRequests++;
+  if (batchEmbeddings.length === keys.length) {
+    keys.forEach((key, i) => {
+      pending.get(key).forEach(entry => { entry.embedding = batchEmbeddings[i]; });
+      if (embedCache) {
+        // 过期条目重新获取后也移到末尾（最近使用）
+        embedCache.entries.delete(key);
+        embedCache.entries.set(key, { id: key, timestamp: embedNow, title: '', embedding: batchEmbeddings[i] });
+      }
+    });
+  }
+  // 添加小延迟避免API限流
+  if (keys.length === BATCH_SIZE) {
+    await new Promise(resolve => setTimeout(resolve, 100));
+  }
+}
+
+// 如果 Embedding 获取失败，返回原始内容（缓存和累计计数都不更新）
+const embeddedCount = itemsWithText.filter(entry => entry.embedding).length;
+if (embeddedCount !== itemsWithText.length) {
+  console.log(`Semantic Dedupe: Embedding count mismatch (${embeddedCount} vs ${itemsWithText.length}), skipping`);
+  return items;
+}
+
+const cacheStats = {
+  embedding_cache_hits: cacheHits,
+  embedding_cache_misses: missKeys.length,
+  embedding_cache_hit_rate: Number((cacheHits / itemsWithText.length).toFixed(3)),
+  embedding_batch_reused: batchReused,
+  embedding_api_requests: apiRequests
+};
+if (embedCache) {
+  Object.assign(cacheStats, saveEmbeddingCache(embedCache, embedNow, embedTtlMs, { hits: cacheHits, misses: missKeys.length }));
+}
+
+// 向量化引擎判重：历史由引擎持有，本节点不读写 staticData / 文件存储
+if (ENGINE_URL) {
+  const withEmbedding = itemsWithText.filter(entry => entry.embedding && entry.embedding.length > 0);
+  const engineResult = withEmbedding.length > 0 ? await dedupeViaEngine(withEmbedding) : { results: [], stats: {} };
+  if (engineResult) {
+    const verdicts = new Map(withEmbedding.map((entry, i) => [entry, engineResult.results[i]]));
+    const unique = [];
+    const duplicates = [];
+    for (const entry of itemsWithText) {
+      const verdict = verdicts.get(entry);
+      if (verdict && verdict.duplicate) {
+        duplicates.push({
+          title: entry.item.json?.title || entry.text.slice(0, 50),
+          similarity: verdict.similarity,
+          similarTo: verdict.similar_to || ''
+        });
+      } else {
+        unique.push(entry.item);
+      }
+    }
+    logResults({
+      input_count: items.length,
+      processed_count: itemsWithText.length,
+      unique_count: unique.length,
+      duplicate_count: duplicates.length,
+      similarity_threshold: SIMILARITY_THRESHOLD,
+      expired_cleaned: engineResult.stats?.expired_cleaned ?? 0,
+      total_stored_embeddings: engineResult.stats?.total_stored_embeddings ?? null,
+      storage_mode: 'engine',
+      embedding_model: EMBEDDING_MODEL,
+      ...cacheStats,
+      engine_decide_ms: engineResult.stats?.decide_ms ?? null
+    }, duplicates);
+    return unique;
+  }
+}
+
 let storage = { embeddings: [] };
 let storageMode = 'volatile';
 let staticData = null;
@@ -197,45 +403,6 @@ const originalCount = storage.embeddings.length;
 storage.embeddings = storage.embeddings.filter(e => (now - e.timestamp) < expiryMs);
 const expiredCount = originalCount - storage.embeddings.length;
 
-// ============== 主处理逻辑 ==============
-
-// 准备内容文本
-const itemsWithText = items.map((item, index) => ({
-  item,
-  index,
-  text: getContentText(item),
-  id: getContentId(item)
-})).filter(entry => entry.text.length > 10); // 过滤空内容
-
-if (itemsWithText.length === 0) {
-  console.log('Semantic Dedupe: No valid content to process');
-  return items;
-}
-
-// 批量获取 Embedding
-const allTexts = itemsWithText.map(e => e.text);
-const allEmbeddings = [];
-
-for (const batch of chunk(allTexts, BATCH_SIZE)) {
-  const batchEmbeddings = await getEmbeddings(batch);
-  allEmbeddings.push(...batchEmbeddings);
-  // 添加小延迟避免API限流
-  if (batch.length === BATCH_SIZE) {
-    await new Promise(resolve => setTimeout(resolve, 100));
-  }
-}
-
-// 如果 Embedding 获取失败，返回原始内容
-if (allEmbeddings.length !== itemsWithText.length) {
-  console.log(`Semantic Dedupe: Embedding count mismatch (${allEmbeddings.length} vs ${itemsWithText.length}), skipping`);
-  return items;
-}
-
-// 为每个条目添加 Embedding
-itemsWithText.forEach((entry, i) => {
-  entry.embedding = allEmbeddings[i];
-});
-
 // 与历史 Embedding 比较，找出重复
 const unique = [];
 const duplicates = [];
@@ -323,18 +490,13 @@ const stats = {
   total_stored_embeddings: storage.embeddings.length,
   storage_mode: storageMode,
   embedding_model: EMBEDDING_MODEL,
+  ...cacheStats,
   file_store_enabled: FILE_STORE_ENABLED,
+  file_store_format: BINARY_STORE ? 'vec' : 'json',
   file_store_saved: fileStore ? saveFileStore({ embeddings: storage.embeddings }) : false
 };
 
-console.log('Semantic Dedupe Stats:', JSON.stringify(stats));
-
-if (DEBUG && duplicates.length > 0) {
-  console.log('Semantic Duplicates Found:');
-  duplicates.forEach(d => {
-    console.log(`  - "${d.title.slice(0, 40)}..." (similarity: ${d.similarity.toFixed(3)}) similar to "${d.similarTo.slice(0, 40)}..."`);
-  });
-}
+logResults(stats, duplicates);
 
 // 返回去重后的内容
 return unique;
@@ -0,0 +1,104 @@
+#!/usr/bin/env node
+/**
+ * Node side of scripts/dedupe_engine.py store-bench: how long the Semantic Dedupe
+ * node spends reading and writing its history as the JSON store versus the
+ * binary .vec store (scripts/lib/vector-store.js).
+ *
+ * Reads { json, vec, batch, runs, dtype } as JSON on stdin (paths to the same
+ * history in both formats) and writes { json_load_ms, json_save_ms, vec_load_ms,
+ * vec_save_ms, vec_rewrite_ms, max_abs_error, entries }. A save is one run's
+ * worth of churn: the oldest `batch` entries expire and `batch` new ones arrive.
+ */
+
+import fs from "fs";
+import path from "path";
+import { fileURLToPath } from "url";
+import { performance } from "perf_hooks";
+
+const here = path.dirname(fileURLToPath(import.meta.url));
+const lib = fs.readFileSync(path.join(here, "lib", "vector-store.js"), "utf8");
+const { loadVecStore, saveVecStore, newVecState } = new Function(`${lib}\nreturn { loadVecStore, saveVecStore, newVecState };`)();
+
+const readStdin = async () => {
+  const chunks = [];
+  for await (const chunk of process.stdin) chunks.push(chunk);
+  return Buffer.concat(chunks).toString("utf8");
+};
+
+const median = (values) => {
+  const sorted = [...values].sort((a, b) => a - b);
+  const mid = Math.floor(sorted.length / 2);
+  return sorted.length % 2 ? sorted[mid] : (sorted[mid - 1] + sorted[mid]) / 2;
+};
+
+const timed = (fn, runs) => {
+  const samples = [];
+  let result;
+  for (let i = 0; i < runs; i++) {
+    const started = performance.now();
+    result = fn(i);
+    samples.push(performance.now() - started);
+  }
+  return { ms: median(samples), result };
+};
+
+// The node's update step: expire the oldest, add fresh items (here: copies under new ids).
+const churn = (embeddings, batch, run) => {
+  const kept = [...embeddings].sort((a, b) => a.timestamp - b.timestamp).slice(batch);
+  const now = Date.now() + run;
+  const fresh = embeddings.slice(0, batch).map((e, i) => ({ ...e, id: `new_${run}_${i}`, timestamp: now }));
+  return kept.concat(fresh);
+};
+
+const job = JSON.parse(await readStdin());
+const runs = Math.max(1, job.runs || 3);
+const scratch = (file) => {
+  const copy = `${file}.bench`;
+  fs.copyFileSync(file, copy);
+  if (fs.existsSync(`${file}.idx`)) fs.copyFileSync(`${file}.idx`, `${copy}.idx`);
+  return copy;
+};
+
+const jsonLoad = timed(() => JSON.parse(fs.readFileSync(job.json, "utf8")), runs);
+const original = jsonLoad.result.embeddings;
+const jsonCopy = scratch(job.json);
+const jsonSave = timed((run) => {
+  const tmpPath = `${jsonCopy}.tmp`;
+  fs.writeFileSync(tmpPath, JSON.stringify({ embeddings: churn(original, job.batch, run) }));
+  fs.renameSync(tmpPath, jsonCopy);
+}, runs);
+
+const vecLoad = timed(() => loadVecStore(fs, job.vec), runs);
+const { embeddings: decoded } = vecLoad.result;
+const vecCopy = scratch(job.vec);
+// Each save starts from a freshly loaded copy so it appends one run's rows, as the node does.
+const vecSaves = [];
+for (let run = 0; run < runs; run++) {
+  const { embeddings, state } = loadVecStore(fs, vecCopy);
+  const next = churn(embeddings, job.batch, run);
+  const started = performance.now();
+  saveVecStore(fs, vecCopy, next, state, job.dtype);
+  vecSaves.push(performance.now() - started);
+}
+// A full rewrite (first save, compaction, dims or dtype change) for comparison.
+const latest = loadVecStore(fs, vecCopy).embeddings;
+const rewrite = timed(() => saveVecStore(fs, vecCopy, latest, newVecState(), job.dtype), runs);
+
+const byId = new Map(original.map((e) => [e.id, e.embedding]));
+let maxAbsError = 0;
+for (const entry of decoded) {
+  const source = byId.get(entry.id);
+  if (!source) continue;
+  for (let i = 0; i < source.length; i++) maxAbsError = Math.max(maxAbsError, Math.abs(source[i] - entry.embedding[i]));
+}
+
+for (const file of [jsonCopy, vecCopy, `${vecCopy}.idx`]) fs.rmSync(file, { force: true });
+process.stdout.write(JSON.stringify({
+  entries: decoded.length,
+  json_load_ms: jsonLoad.ms,
+  json_save_ms: jsonSave.ms,
+  vec_load_ms: vecLoad.ms,
+  vec_save_ms: median(vecSaves),
+  vec_rewrite_ms: rewrite.ms,
+  max_abs_error: maxAbsError
+}));
@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+"""
+Rolling-window SLO engine over n8n execution history.
+
+Executions are folded into hourly buckets per workflow (counts, a sparse
+log-scale duration histogram and per-node run/error counts). Each SLO window
+(1d/7d/30d) keeps a running aggregate that buckets are added to on insert and
+subtracted from when they age out, so success rates, duration quantiles,
+node error rates and burn rates are read from at most a few hundred counters
+regardless of how much history exists. Memory is bounded by
+30 days x 24 buckets per workflow.
+
+State (buckets + execution-id watermark) persists to logs/slo-state.json,
+so each run only reads executions newer than the last one.
+
+Run:
+  python3 scripts/slo_engine.py [--json] [--target 0.95]
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import json
+import math
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from _env import load_env
+from _n8n_db import (
+    TERMINAL_STATUSES,
+    connect,
+    execution_result,
+    executions_by_id,
+    executions_since,
+    load_execution_data,
+    parse_iso,
+)
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+WINDOWS_HOURS: Dict[str, int] = {"1d": 24, "7d": 24 * 7, "30d": 24 * 30}
+RETENTION_HOURS = max(WINDOWS_HOURS.values())
+
+# Duration bins grow by 15%, giving quantiles within ~7.5% from 0.1s to days.
+BIN_BASE = 1.15
+BIN_MIN_SECONDS = 0.1
+
+# Multi-window burn-rate rules: alert when both windows burn faster than threshold.
+BURN_RULES: List[Tuple[str, str, float, str]] = [
+    ("1d", "7d", 6.0, "critical"),
+    ("7d", "30d", 2.0, "warning"),
+]
+
+
+def _bin(seconds: float) -> int:
+    if seconds <= BIN_MIN_SECONDS:
+        return 0
+    return int(math.log(seconds / BIN_MIN_SECONDS, BIN_BASE)) + 1
+
+
+def _bin_upper(index: int) -> float:
+    return BIN_MIN_SECONDS * (BIN_BASE ** index)
+
+
+@dataclass
+class Counts:
+    total: int = 0
+    success: int = 0
+    durations: Dict[int, int] = field(default_factory=dict)
+    node_runs: Dict[str, int] = field(default_factory=dict)
+    node_errors: Dict[str, int] = field(default_factory=dict)
+
+    def merge(self, other: "Counts", sign: int = 1) -> None:
+        self.total += sign * other.total
+        self.success += sign * other.success
+        for target, source in (
+            (self.durations, other.durations),
+            (self.node_runs, other.node_runs),
+            (self.node_errors, other.node_errors),
+        ):
+            for key, value in source.items():
+                updated = target.get(key, 0) + sign * value
+                if updated:
+                    target[key] = updated
+                else:
+                    target.pop(key, None)
+
+    def quantile(self, q: float) -> Optional[float]:
+        observed = sum(self.durations.values())
+        if not observed:
+            return None
+        rank = q * observed
+        seen = 0
+        for index in sorted(self.durations):
+            seen += self.durations[index]
+            if seen >= rank:
+                return _bin_upper(index)
+        return _bin_upper(max(self.durations))
+
+    def to_json(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "success": self.success,
+            "durations": {str(k): v for k, v in self.durations.items()},
+            "node_runs": self.node_runs,
+            "node_errors": self.node_errors,
+        }
+
+    @classmethod
+    def from_json(cls, raw: Dict[str, Any]) -> "Counts":
+        return cls(
+            total=int(raw.get("total", 0)),
+            success=int(raw.get("success", 0)),
+            durations={int(k): int(v) for k, v in (raw.get("durations") or {}).items()},
+            node_runs=dict(raw.get("node_runs") or {}),
+            node_errors=dict(raw.get("node_errors") or {}),
+        )
+
+
+class WorkflowSLO:
+    """Hourly buckets plus one running aggregate per window for a single workflow."""
+
+    def __init__(self) -> None:
+        self.buckets: Dict[int, Counts] = {}
+        self.windows: Dict[str, Counts] = {name: Counts() for name in WINDOWS_HOURS}
+        # First hour still inside each window's running aggregate.
+        self.window_start: Dict[str, Optional[int]] = {name: None for name in WINDOWS_HOURS}
+
+    def advance(self, now_hour: int) -> None:
+        for name, hours in WINDOWS_HOURS.items():
+            start = now_hour - hours + 1
+            current = self.window_start[name]
+            if current is None:
+                self.window_start[name] = start
+                continue
+            if start - current > len(self.buckets):
+                # Long gap: cheaper to drop whatever aged out than to walk every hour.
+                for hour in [h for h in self.buckets if current <= h < start]:
+                    self.windows[name].merge(self.buckets[hour], sign=-1)
+            else:
+                for hour in range(current, start):
+                    bucket = self.buckets.get(hour)
+                    if bucket is not None:
+                        self.windows[name].merge(bucket, sign=-1)
+            self.window_start[name] = max(current, start)
+        cutoff = now_hour - RETENTION_HOURS + 1
+        for hour in [h for h in self.buckets if h < cutoff]:
+            del self.buckets[hour]
+
+    def add(self, hour: int, sample: Counts) -> None:
+        bucket = self.buckets.setdefault(hour, Counts())
+        bucket.merge(sample)
+        for name, start in self.window_start.items():
+            if start is None or hour >= start:
+                self.windows[name].merge(sample)
+
+    def rebuild(self, now_hour: int) -> None:
+        for name, hours in WINDOWS_HOURS.items():
+            start = now_hour - hours + 1
+            aggregate = Counts()
+            for hour, bucket in self.buckets.items():
+                if hour >= start:
+                    aggregate.merge(bucket)
+            self.windows[name] = aggregate
+            self.window_start[name] = start
+
+
+@dataclass
+class WindowReport:
+    window: str
+    total: int
+    success_rate: Optional[float]
+    burn_rate: Optional[float]
+    p50_seconds: Optional[float]
+    p95_seconds: Optional[float]
+    p99_seconds: Optional[float]
+    node_error_rates: Dict[str, float]
+
+
+def _state_path() -> Path:
+    override = os.environ.get("SLO_STATE_PATH")
+    return Path(override) if override else ROOT / "logs" / "slo-state.json"
+
+
+class SLOEngine:
+    def __init__(self, state_path: Optional[Path] = None, node_stats: bool = True) -> None:
+        self.state_path = state_path or _state_path()
+        self.node_stats = node_stats
+        self.watermark = 0
+        self.pending: Dict[int, str] = {}
+        self.workflows: Dict[str, WorkflowSLO] = defaultdict(WorkflowSLO)
+        self._load()
+
+    # --- persistence ----------------------------------------------------
+
+    def _load(self) -> None:
+        if not self.state_path.exists():
+            return
+        try:
+            raw = json.loads(self.state_path.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            return
+        self.watermark = int(raw.get("watermark", 0))
+        self.pending = {int(k): v for k, v in (raw.get("pending") or {}).items()}
+        now_hour = int(time.time() // 3600)
+        for workflow_id, buckets in (raw.get("workflows") or {}).items():
+            slo = self.workflows[workflow_id]
+            slo.buckets = {int(h): Counts.from_json(c) for h, c in buckets.items()}
+            slo.rebuild(now_hour)
+
+    def save(self) -> None:
+        payload = {
+            "watermark": self.watermark,
+            "pending": {str(k): v for k, v in self.pending.items()},
+            "workflows": {
+                workflow_id: {str(h): c.to_json() for h, c in slo.buckets.items()}
+                for workflow_id, slo in self.workflows.items()
+            },
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_name(f"{self.state_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(payload, sort_keys=True), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # --- ingestion ------------------------------------------------------
+
+    def _sample(self, conn: Any, row: Any) -> Tuple[Optional[int], Counts]:
+        started = parse_iso(row["startedAt"])
+        stopped = parse_iso(row["stoppedAt"])
+        sample = Counts(total=1, success=1 if row["status"] == "success" else 0)
+        if started and stopped:
+            sample.durations[_bin(max(0.0, (stopped - started).total_seconds()))] = 1
+        if self.node_stats:
+            payload = load_execution_data(conn, int(row["id"]))
+            if payload:
+                _, run_data, _ = execution_result(payload)
+                for node, runs in run_data.items():
+                    if not isinstance(runs, list):
+                        continue
+                    sample.node_runs[node] = len(runs)
+                    errors = sum(1 for run in runs if isinstance(run, dict) and run.get("error"))
+                    if errors:
+                        sample.node_errors[node] = errors
+        hour = int(started.timestamp() // 3600) if started else None
+        return hour, sample
+
+    def _ingest(self, conn: Any, row: Any, workflow_id: str, now_hour: int) -> None:
+        hour, sample = self._sample(conn, row)
+        if hour is None or hour <= now_hour - RETENTION_HOURS:
+            return
+        slo = self.workflows[workflow_id]
+        if slo.window_start["1d"] is None:
+            # New workflow: pin window starts before the first insert.
+            slo.advance(now_hour)
+        slo.add(hour, sample)
+
+    def refresh(self, conn: Any, now: Optional[float] = None) -> int:
+        """Fold executions above the watermark (and finished pending ones) into buckets."""
+        now_hour = int((now or time.time()) // 3600)
+        oldest_hour = now_hour - RETENTION_HOURS + 1
+        for slo in self.workflows.values():
+            slo.advance(now_hour)
+
+        if not self.watermark:
+            # Cold start: skip straight to the retention horizon instead of all history.
+            horizon = dt.datetime.fromtimestamp(oldest_hour * 3600, tz=dt.timezone.utc)
+            row = conn.execute(
+                "select max(id) as max_id from execution_entity where startedAt < ?",
+                (horizon.strftime("%Y-%m-%d %H:%M:%S"),),
+            ).fetchone()
+            self.watermark = int(row["max_id"] or 0) if row else 0
+
+        ingested = 0
+        pending, self.pending = self.pending, {}
+        # Pending ids missing from the table were pruned by n8n and are dropped.
+        for row in executions_by_id(conn, list(pending)):
+            workflow_id = pending[int(row["id"])]
+            if row["status"] in TERMINAL_STATUSES:
+                self._ingest(conn, row, workflow_id, now_hour)
+                ingested += 1
+            else:
+                self.pending[int(row["id"])] = workflow_id
+        while True:
+            rows = executions_since(conn, self.watermark, limit=500)
+            if not rows:
+                break
+            for row in rows:
+                self.watermark = max(self.watermark, int(row["id"]))
+                if row["status"] in TERMINAL_STATUSES:
+                    self._ingest(conn, row, row["workflowId"], now_hour)
+                    ingested += 1
+                else:
+                    self.pending[int(row["id"])] = row["workflowId"]
+        for workflow_id in list(self.workflows):
+            self.workflows[workflow_id].advance(now_hour)
+        return ingested
+
+    # --- queries --------------------------------------------------------
+
+    def report(self, workflow_id: str, target: float) -> List[WindowReport]:
+        slo = self.workflows.get(workflow_id)
+        if slo is None:
+            return []
+        budget = max(1e-9, 1.0 - target)
+        reports = []
+        for name in WINDOWS_HOURS:
+            counts = slo.windows[name]
+            rate = (counts.success / counts.total) if counts.total else None
+            reports.append(
+                WindowReport(
+                    window=name,
+                    total=counts.total,
+                    success_rate=rate,
+                    burn_rate=((1.0 - rate) / budget) if rate is not None else None,
+                    p50_seconds=counts.quantile(0.50),
+                    p95_seconds=counts.quantile(0.95),
+                    p99_seconds=counts.quantile(0.99),
+                    node_error_rates={
+                        node: counts.node_errors.get(node, 0) / runs
+                        for node, runs in sorted(counts.node_runs.items())
+                        if runs
+                    },
+                )
+            )
+        return reports
+
+    def burn_alerts(self, workflow_id: str, target: float) -> List[str]:
+        by_window = {r.window: r for r in self.report(workflow_id, target)}
+        alerts = []
+        for short, long, threshold, severity in BURN_RULES:
+            short_burn = by_window[short].burn_rate if short in by_window else None
+            long_burn = by_window[long].burn_rate if long in by_window else None
+            if short_burn is None or long_burn is None:
+                continue
+            if short_burn > threshold and long_burn > threshold:
+                alerts.append(
+                    f"[{severity}] burn rate {short}={short_burn:.1f} {long}={long_burn:.1f}"
+                    f" > {threshold:.1f} (target={target:.3f})"
+                )
+        return alerts
+
+
+def _workflow_names(ids: Iterable[str]) -> Dict[str, str]:
+    try:
+        from _n8n_api import build_client
+
+        return {w["id"]: w.get("name") or w["id"] for w in build_client().list_workflows()}
+    except Exception:  # pragma: no cover - API optional for offline reports
+        return {workflow_id: workflow_id for workflow_id in ids}
+
+
+def _fmt_seconds(value: Optional[float]) -> str:
+    return f"{value:.1f}s" if value is not None else "-"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rolling-window SLO report and burn-rate alerts")
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=float(os.environ.get("SLO_SUCCESS_TARGET", "0.95")),
+        help="Success-rate SLO target used for error budget / burn rate",
+    )
+    parser.add_argument("--json", action="store_true", help="Print a machine-readable report")
+    parser.add_argument("--no-node-stats", action="store_true", help="Skip decoding execution_data")
+    args = parser.parse_args()
+
+    load_env()
+    engine = SLOEngine(node_stats=not args.no_node_stats)
+    conn = connect()
+    t0 = time.perf_counter()
+    ingested = engine.refresh(conn)
+    refresh_seconds = time.perf_counter() - t0
+    engine.save()
+
+    t1 = time.perf_counter()
+    reports = {wid: engine.report(wid, args.target) for wid in engine.workflows}
+    alerts = {wid: engine.burn_alerts(wid, args.target) for wid in engine.workflows}
+    query_ms = (time.perf_counter() - t1) * 1000.0
+    names = _workflow_names(engine.workflows)
+
+    if args.json:
+        print(
+            json.dumps(
+                {
+                    "watermark": engine.watermark,
+                    "ingested": ingested,
+                    "query_ms": query_ms,
+                    "workflows": {
+                        wid: {
+                            "name": names.get(wid, wid),
+                            "windows": [r.__dict__ for r in reports[wid]],
+                            "alerts": alerts[wid],
+                        }
+                        for wid in reports
+                    },
+                },
+                sort_keys=True,
+            )
+        )
+    else:
+        print(
+            f"[slo] watermark={engine.watermark} ingested={ingested}"
+            f" refresh_seconds={refresh_seconds:.3f} query_ms={query_ms:.2f}"
+        )
+        for wid, windows in reports.items():
+            print(f"[slo] {names.get(wid, wid)} ({wid})")
+            for r in windows:
+                rate = f"{r.success_rate:.3f}" if r.success_rate is not None else "-"
+                burn = f"{r.burn_rate:.2f}" if r.burn_rate is not None else "-"
+                print(
+                    f"  {r.window:>3}: n={r.total} success_rate={rate} burn={burn}"
+                    f" p50={_fmt_seconds(r.p50_seconds)} p95={_fmt_seconds(r.p95_seconds)}"
+                    f" p99={_fmt_seconds(r.p99_seconds)}"
+                )
+            worst = sorted(windows[-1].node_error_rates.items(), key=lambda kv: -kv[1]) if windows else []
+            for node, rate in [kv for kv in worst if kv[1] > 0][:5]:
+                print(f"       node_error_rate {node}={rate:.3f}")
+            for alert in alerts[wid]:
+                print(f"  ALERT {alert}")
+
+    return 1 if any(alerts.values()) else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
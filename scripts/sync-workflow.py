@@ -1,18 +1,26 @@
 #!/usr/bin/env python3
 """
 Workflow Sync Script - Syncs node code from scripts/ to workflow JSON files
-Run: python scripts/sync-workflow.py [--deploy]
+Run: python scripts/sync-workflow.py [--deploy] [--docker]
+
+--deploy pushes every changed workflow through the n8n REST API in one
+concurrent batch; files the API cannot take (no matching live workflow,
+API unreachable) fall back to a single docker `n8n import:workflow` run.
+--docker skips the API and imports everything through the container.
 """
 
 import json
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent.parent
 SCRIPTS_DIR = BASE_DIR / "scripts"
 WORKFLOWS_DIR = BASE_DIR / "workflows"
 CONTAINER_NAME = "n8n-local"
+# Keys accepted by the workflow update endpoint
+API_UPDATE_KEYS = ("name", "nodes", "connections", "settings")
 
 # Mapping of workflow node IDs to script files
 NODE_SCRIPTS = {
@@ -20,6 +28,7 @@ NODE_SCRIPTS = {
     "news-api-fetch": "multi-news-api-node.js",
     "x-keyword": "x-keyword-search-node.js",
     "x-account": "x-account-search-node.js",
+    "normalize": "normalize-node.js",
     "dedupe": "cross-day-dedupe-node.js",
     "semantic-dedupe": "semantic-dedupe-node.js",
     "event-clustering": "event-clustering-node.js",
@@ -30,10 +39,16 @@ NODE_SCRIPTS = {
 }
 
 def load_script(filename):
-    """Load and return script content."""
+    """Load a node script as deployed: shared helpers inlined, minified unless CODE_NODE_MINIFY=false."""
+    from _bundle import BundleError, bundle
+
     script_path = SCRIPTS_DIR / filename
     if script_path.exists():
-        return script_path.read_text(encoding="utf-8")
+        try:
+            return bundle(script_path).code
+        except BundleError as exc:
+            print(f"Warning: Cannot bundle {filename}: {exc}")
+            return None
     print(f"Warning: Script not found: {filename}")
     return None
 
@@ -76,9 +91,9 @@ def sync_workflow(workflow_path):
 
     return updated
 
-def deploy_workflow(workflow_path):
-    """Deploy workflow to n8n using CLI."""
-    print(f"\n🚀 Deploying to n8n: {workflow_path.name}")
+def deploy_workflows_docker(workflow_paths):
+    """Deploy workflows with one n8n CLI import (fallback path)."""
+    print(f"\n🚀 Importing via docker: {', '.join(p.name for p in workflow_paths)}")
 
     # Check container is running
     result = subprocess.run(
@@ -89,17 +104,101 @@ def deploy_workflow(workflow_path):
         print(f"❌ Container {CONTAINER_NAME} is not running")
         return False
 
-    # Copy and import
-    subprocess.run(["docker", "cp", str(workflow_path), f"{CONTAINER_NAME}:/tmp/workflow.json"], check=True)
-    subprocess.run(["docker", "exec", CONTAINER_NAME, "n8n", "import:workflow", "--input=/tmp/workflow.json"], check=True)
-    subprocess.run(["docker", "exec", CONTAINER_NAME, "rm", "-f", "/tmp/workflow.json"], check=True)
+    # Copy all files into one directory so a single CLI process imports them
+    # (each `n8n import:workflow` boots the whole n8n CLI).
+    remote_dir = "/tmp/workflow-sync"
+    subprocess.run(["docker", "exec", CONTAINER_NAME, "mkdir", "-p", remote_dir], check=True)
+    for index, workflow_path in enumerate(workflow_paths):
+        subprocess.run(
+            ["docker", "cp", str(workflow_path), f"{CONTAINER_NAME}:{remote_dir}/{index}-{workflow_path.name}"],
+            check=True,
+        )
+    subprocess.run(
+        ["docker", "exec", CONTAINER_NAME, "n8n", "import:workflow", "--separate", f"--input={remote_dir}"],
+        check=True,
+    )
+    subprocess.run(["docker", "exec", CONTAINER_NAME, "rm", "-rf", remote_dir], check=True)
 
-    print(f"✅ Deployed: {workflow_path.name}")
+    for workflow_path in workflow_paths:
+        print(f"✅ Deployed: {workflow_path.name}")
     return True
 
+def _match_live(workflow, live_workflows):
+    """Live workflow for a repo file: same id if the file has one, else same name (active first)."""
+    if workflow.get("id"):
+        for live in live_workflows:
+            if live.get("id") == workflow["id"]:
+                return live
+    candidates = [w for w in live_workflows if w.get("name") == workflow.get("name")]
+    candidates.sort(key=lambda w: not w.get("active"))
+    return candidates[0] if candidates else None
+
+def _code_mismatches(expected, live):
+    """Names of code nodes whose jsCode in the PUT response differs from the file."""
+    live_code = {n.get("name"): (n.get("parameters") or {}).get("jsCode") for n in live.get("nodes") or []}
+    return [
+        n.get("name")
+        for n in expected.get("nodes", [])
+        if "jsCode" in (n.get("parameters") or {}) and live_code.get(n.get("name")) != n["parameters"]["jsCode"]
+    ]
+
+def _put_workflow(client, workflow_path, live):
+    workflow = json.loads(workflow_path.read_text(encoding="utf-8"))
+    payload = {key: workflow[key] for key in API_UPDATE_KEYS if key in workflow}
+    updated = client.update_workflow(live["id"], payload)
+    mismatches = _code_mismatches(workflow, updated)
+    if mismatches:
+        raise RuntimeError(f"code differs after update: {', '.join(mismatches)}")
+    return updated
+
+def deploy_workflows_api(workflow_paths):
+    """Deploy workflows through the REST API concurrently; returns the paths that still need docker."""
+    from _env import load_env
+    from _n8n_api import build_client
+
+    print(f"\n🚀 Deploying via API: {', '.join(p.name for p in workflow_paths)}")
+    load_env()
+    try:
+        client = build_client()
+        live_workflows = list(client.list_workflows())
+    except Exception as exc:
+        print(f"⚠️  n8n API unavailable ({exc}); falling back to docker import")
+        return list(workflow_paths)
+
+    targets = []
+    fallback = []
+    for workflow_path in workflow_paths:
+        workflow = json.loads(workflow_path.read_text(encoding="utf-8"))
+        live = _match_live(workflow, live_workflows)
+        if live is None:
+            print(f"⚠️  No live workflow named '{workflow.get('name')}' for {workflow_path.name}; will import")
+            fallback.append(workflow_path)
+        else:
+            targets.append((workflow_path, live))
+
+    workers = max(1, int(os.environ.get("SYNC_DEPLOY_CONCURRENCY", "4")))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [(path, live, pool.submit(_put_workflow, client, path, live)) for path, live in targets]
+        for workflow_path, live, future in futures:
+            try:
+                future.result()
+                print(f"✅ Deployed: {workflow_path.name} -> {live['id']}")
+            except Exception as exc:
+                print(f"❌ API update failed for {workflow_path.name}: {exc}")
+                fallback.append(workflow_path)
+    return fallback
+
+def deploy_workflows(workflow_paths, docker_only=False):
+    """Deploy changed workflows: API batch first, docker import for whatever is left."""
+    remaining = list(workflow_paths) if docker_only else deploy_workflows_api(workflow_paths)
+    if not remaining:
+        return True
+    return deploy_workflows_docker(remaining)
+
 def main():
     import sys
     deploy_mode = "--deploy" in sys.argv
+    docker_only = "--docker" in sys.argv
 
     print("=" * 50)
     print("Workflow Sync Script")
@@ -131,8 +230,8 @@ def main():
     if deploy_mode and updated_files:
         print("\n" + "=" * 50)
         print("Deploying to n8n...")
-        for wf_path in updated_files:
-            deploy_workflow(wf_path)
+        if not deploy_workflows(updated_files, docker_only=docker_only):
+            sys.exit(1)
     elif not deploy_mode and total_updated > 0:
         print("\nTo deploy: python scripts/sync-workflow.py --deploy")
 
@@ -102,7 +102,7 @@ const buildMessages = (parts, maxLen) => {
   return messages;
 };
 
-const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+// @include sleep
 
 const sendWithRetry = async (text, index, total) => {
   let lastError = null;
@@ -1,26 +1,26 @@
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import subprocess
 import urllib.error
 import urllib.parse
 import urllib.request
-from typing import Dict, List
+from typing import List, Optional
 
+from _bundle import deployed_source_map, error_origin
 from _env import load_env
 from _n8n_api import build_client
-from _n8n_db import (
-    connect,
-    execution_result,
-    latest_execution_id,
-    load_execution_data,
-    node_last_json,
-    summarize_nodes,
-    wait_for_new_execution,
-    wait_until_finished,
+from _n8n_db import node_last_json, summarize_nodes
+from _n8n_tracker import (
+    CORRELATION_HEADER,
+    CORRELATION_PARAM,
+    ExecutionTracker,
+    new_correlation_id,
+    run_data_of,
 )
+from _progress import ProgressPrinter, load_stage_profile
+from _slack import build_slack_client
 
 
 KEY_NODES = [
@@ -38,35 +38,6 @@ KEY_NODES = [
 ]
 
 
-def _slack_get(method: str, params: Dict[str, str]) -> Dict:
-    token = os.environ.get("SLACK_BOT_TOKEN")
-    if not token:
-        raise RuntimeError("SLACK_BOT_TOKEN is not set")
-    qs = urllib.parse.urlencode(params)
-    url = f"https://slack.com/api/{method}?{qs}"
-    req = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        data = json.load(resp)
-    if not data.get("ok"):
-        raise RuntimeError(f"Slack API {method} failed: {data.get('error')}")
-    return data
-
-
-def _slack_message_exists(channel: str, message_ts: str) -> bool:
-    oldest = str(max(0.0, float(message_ts) - 90))
-    data = _slack_get(
-        "conversations.history",
-        {
-            "channel": channel,
-            "latest": message_ts,
-            "oldest": oldest,
-            "inclusive": "true",
-            "limit": "5",
-        },
-    )
-    return any(m.get("ts") == message_ts for m in data.get("messages", []))
-
-
 def _run_docker_execute(workflow_id: str) -> None:
     cmd = [
         "docker",
@@ -88,7 +59,7 @@ def _run_ui_execute(workflow_id: str) -> None:
     subprocess.run(cmd, check=True, env=env)
 
 
-def _run_webhook_execute() -> None:
+def run_webhook_execute(correlation_id: Optional[str] = None) -> None:
     host = os.environ.get("N8N_HOST", "localhost")
     port = os.environ.get("N8N_PORT", "5678")
     secret = os.environ.get("WEBHOOK_SECRET")
@@ -97,7 +68,12 @@ def _run_webhook_execute() -> None:
     header_name = os.environ.get("WEBHOOK_HEADER_NAME", "X-Webhook-Secret")
     path = os.environ.get("DAILY_PACK_WEBHOOK_PATH", "x-daily-pack-trigger")
     url = f"http://{host}:{port}/webhook/{path}"
-    req = urllib.request.Request(url, headers={header_name: secret})
+    headers = {header_name: secret}
+    if correlation_id:
+        # The Webhook node echoes query and headers into its output item.
+        url += "?" + urllib.parse.urlencode({CORRELATION_PARAM: correlation_id})
+        headers[CORRELATION_HEADER] = correlation_id
+    req = urllib.request.Request(url, headers=headers)
     try:
         with urllib.request.urlopen(req, timeout=30) as resp:
             status = resp.getcode()
@@ -122,59 +98,81 @@ def main() -> int:
         default=None,
         help="Execution ID watermark to wait after (avoids race conditions)",
     )
+    parser.add_argument(
+        "--live",
+        action="store_true",
+        help="Stream node completions with elapsed time and ETA while the execution runs",
+    )
     args = parser.parse_args()
 
     load_env()
     client = build_client()
-    conn = connect()
 
     daily = client.find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
     if not daily:
         raise SystemExit("Daily Pack workflow not found")
     workflow_id = daily["id"]
 
-    before_id = args.after_id if args.after_id is not None else (latest_execution_id(conn, workflow_id) or 0)
-    print(f"[trigger] workflow_id={workflow_id} before_execution_id={before_id}")
+    if args.after_id is not None:
+        before_id = args.after_id
+    else:
+        latest = client.list_executions(workflow_id, limit=1).get("data") or []
+        before_id = int(latest[0]["id"]) if latest else 0
+    correlation_id = new_correlation_id() if args.trigger == "webhook" else None
+    print(f"[trigger] workflow_id={workflow_id} before_execution_id={before_id} correlation_id={correlation_id}")
 
     if args.trigger == "docker":
         _run_docker_execute(workflow_id)
     elif args.trigger == "webhook":
-        _run_webhook_execute()
+        run_webhook_execute(correlation_id)
     elif args.trigger == "ui":
         _run_ui_execute(workflow_id)
     else:
         print("[trigger] skipping trigger step (trigger=none)")
 
-    new_id = wait_for_new_execution(conn, workflow_id, before_id, timeout_seconds=600)
+    tracker = ExecutionTracker(client, workflow_id, before_id, correlation_id=correlation_id)
+    new_id = tracker.wait_for_execution(timeout_seconds=900)
     if not new_id:
         print("[trigger] ERROR: no new execution detected within timeout")
         return 2
     print(f"[trigger] new_execution_id={new_id}")
 
-    finished_row = wait_until_finished(conn, new_id, timeout_seconds=900)
-    if not finished_row:
+    on_poll = None
+    if args.live:
+        profile = load_stage_profile(client, workflow_id)
+        print(f"[trigger] live: typical_total={profile.total:.0f}s samples={profile.samples}")
+        on_poll = ProgressPrinter(profile, out=lambda line: print(line, flush=True))
+    execution = tracker.wait_until_finished(new_id, timeout_seconds=900, on_poll=on_poll)
+    if not execution:
         print("[trigger] ERROR: execution did not finish within timeout")
         return 3
 
-    status = finished_row["status"]
+    status = execution["status"]
     print("[trigger] finished_status:", status)
 
-    payload = load_execution_data(conn, new_id)
-    if not payload:
+    if not execution.get("data"):
         print("[trigger] ERROR: execution_data missing")
         return 4
 
-    result, run_data, top_error = execution_result(payload)
+    run_data = run_data_of(execution)
+    top_error = (execution["data"].get("resultData") or {}).get("error")
     if top_error:
         print("[trigger] top_error:", top_error)
 
     node_summary = summarize_nodes(run_data, KEY_NODES)
     error_nodes: List[str] = []
     print("[trigger] node_summary:")
+    ran_code = {
+        n.get("name"): (n.get("parameters") or {}).get("jsCode")
+        for n in (execution.get("workflowData") or {}).get("nodes") or []
+    }
     for node, node_status, items, message in node_summary:
         line = f"  - {node}: {node_status} items={items}"
         if message:
             line += f" msg={message[:160]}"
+            origin = error_origin(message, deployed_source_map(node, ran_code.get(node)))
+            if origin:
+                line += f" origin={origin[0]}:{origin[1]}"
         print(line)
         if node_status == "ERROR":
             error_nodes.append(node)
@@ -189,7 +187,7 @@ def main() -> int:
     slack_exists = None
     if slack_channel and slack_ts:
         try:
-            slack_exists = _slack_message_exists(slack_channel, slack_ts)
+            slack_exists = build_slack_client().message_exists(slack_channel, slack_ts)
             print("[trigger] slack_message_exists:", slack_exists)
         except Exception as exc:  # pragma: no cover - network variability
             print("[trigger] slack_verify_error:", exc)
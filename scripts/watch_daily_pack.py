@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Hot-deploy Daily Pack code nodes on save.
+
+Watches the files in CODE_NODE_SOURCES, the shared helpers in scripts/lib
+and generator configs such as config/rss-feeds.json (inotify on Linux,
+polling elsewhere), debounces bursts of writes, rebuilds the affected
+nodes and pushes their jsCode in a single PUT built from the cached
+workflow (the previous PUT response), so each save costs one API
+round-trip. Optionally replays the changed nodes offline or fires a
+webhook run afterwards.
+
+The cached workflow is assumed to be the live one; pass --refetch if the
+workflow may also be edited in the UI while watching (one extra GET per push).
+
+Run:
+  python3 scripts/watch_daily_pack.py
+  python3 scripts/watch_daily_pack.py --then replay
+  python3 scripts/watch_daily_pack.py --then trigger
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+from _bundle import Bundle, BundleError, bundle, record_source_maps, shared_inputs
+from _env import load_env
+from _inotify import FileWatcher
+from _n8n_api import N8NClient, build_client
+from deploy_daily_pack import (
+    CODE_NODE_SOURCES,
+    ROOT,
+    build_sources,
+    code_mismatches,
+    daily_pack_cron,
+    digest,
+    put_workflow,
+    record_deploy,
+    sync_nodes,
+    workflow_nodes,
+)
+
+
+def _nodes_for(paths: set) -> List[str]:
+    # A helper or config change can reach any node; rebuilding them all is cheap and unchanged output is skipped.
+    if any(path.resolve() in paths for path in shared_inputs()):
+        return list(CODE_NODE_SOURCES)
+    return [name for name, path in CODE_NODE_SOURCES.items() if path.resolve() in paths]
+
+
+def _push(client: N8NClient, workflow_id: str, workflow: Dict[str, Any], sources: Dict[str, str], cron: str) -> Dict[str, Any]:
+    updated = put_workflow(client, workflow_id, workflow)
+    mismatches = code_mismatches(workflow_nodes(updated), sources)
+    if mismatches:
+        raise RuntimeError("live code differs after push: " + ", ".join(name for name, _, _ in mismatches))
+    record_deploy(workflow_id, updated.get("updatedAt"), cron, {name: digest(text) for name, text in sources.items()})
+    return updated
+
+
+def _follow_up(mode: str, nodes: List[str]) -> None:
+    if mode == "replay":
+        cmd = [sys.executable, str(ROOT / "scripts" / "replay_node.py"), "--runs", "1"]
+        for name in nodes:
+            cmd += ["--node", name]
+    else:
+        cmd = [sys.executable, str(ROOT / "scripts" / "trigger_daily_pack.py"), "--trigger", "webhook", "--live"]
+    subprocess.run(cmd, check=False)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Watch code node sources and hot-deploy changes")
+    parser.add_argument("--debounce", type=float, default=0.3, help="Quiet period before pushing (seconds)")
+    parser.add_argument("--then", choices=("none", "replay", "trigger"), default="none", help="Run after each push")
+    parser.add_argument("--refetch", action="store_true", help="GET the live workflow before every push")
+    parser.add_argument("--poll", action="store_true", help="Use mtime polling instead of inotify")
+    args = parser.parse_args()
+
+    load_env()
+    client = build_client()
+    daily = client.find_workflow(lambda w: "Daily Pack" in (w.get("name") or ""))
+    if not daily:
+        raise SystemExit("Daily Pack workflow not found")
+    workflow_id = daily["id"]
+    cron = daily_pack_cron()
+
+    # Start from a synced workflow so every later push only carries the files just saved.
+    bundles = build_sources()
+    sources = {name: built.code for name, built in bundles.items()}
+    workflow = client.get_workflow(workflow_id)
+    schedule_updates, code_updates = sync_nodes(workflow_nodes(workflow), sources, cron)
+    if schedule_updates or code_updates:
+        workflow = _push(client, workflow_id, workflow, sources, cron)
+        record_source_maps(bundles)
+    print(f"[watch] workflow_id={workflow_id} initial_sync schedule_updates={schedule_updates} code_updates={code_updates}")
+
+    watched = list(CODE_NODE_SOURCES.values()) + shared_inputs()
+    watcher = FileWatcher(watched, force_polling=args.poll)
+    print(f"[watch] watching {len(watched)} files via {watcher.backend} (Ctrl-C to stop)", flush=True)
+    stale = False  # a push failed: the cached workflow may not match the live one
+    try:
+        while True:
+            changed = watcher.wait_settled(args.debounce)
+            saved_at = time.monotonic()
+            nodes = _nodes_for(changed)
+            try:
+                rebuilt: Dict[str, Bundle] = {name: bundle(CODE_NODE_SOURCES[name], name=name) for name in nodes}
+            except (BundleError, OSError) as exc:
+                print(f"[watch] not pushing, build failed: {exc}", flush=True)
+                continue
+            fresh = {name: built.code for name, built in rebuilt.items()}
+            nodes = [name for name in nodes if fresh[name] != sources[name]]
+            if not nodes:
+                continue
+            previous = {name: sources[name] for name in nodes}
+            sources.update({name: fresh[name] for name in nodes})
+            try:
+                if args.refetch or stale:
+                    workflow = client.get_workflow(workflow_id)
+                    stale = False
+                _, code_updates = sync_nodes(workflow_nodes(workflow), {n: sources[n] for n in nodes}, cron)
+                if not code_updates:
+                    continue
+                workflow = _push(client, workflow_id, workflow, sources, cron)
+                record_source_maps({name: rebuilt[name] for name in nodes})
+            except Exception as exc:  # keep watching; the next save retries from live state
+                print(f"[watch] push failed for {', '.join(nodes)}: {exc}", flush=True)
+                sources.update(previous)
+                stale = True
+                continue
+            print(
+                f"[watch] pushed {', '.join(nodes)} in {time.monotonic() - saved_at:.2f}s"
+                f" updatedAt={workflow.get('updatedAt')}",
+                flush=True,
+            )
+            if args.then != "none":
+                _follow_up(args.then, nodes)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,78 @@
+/**
+ * Test Fixtures - Golden Corpus
+ *
+ * Loads real (scrubbed) node inputs/outputs recorded by
+ * scripts/record_golden_corpus.py from tests/fixtures/golden/<version>/.
+ * Returns null when no corpus has been recorded, so suites can skip.
+ */
+
+import fs from 'fs';
+import path from 'path';
+import zlib from 'zlib';
+
+const CORPUS_DIR = process.env.GOLDEN_CORPUS_DIR || path.resolve(__dirname, 'golden');
+
+export interface CorpusNode {
+  executionId: number;
+  node: string;
+  input: any[];
+  output: any[];
+  executionTimeMs: number;
+}
+
+export interface CorpusEmbedding {
+  id: string;
+  title: string;
+  timestamp: number | null;
+  embedding: Float32Array;
+}
+
+function readGz(file: string): any {
+  return JSON.parse(zlib.gunzipSync(fs.readFileSync(file)).toString('utf8'));
+}
+
+function resolveVersion(version?: string): string | null {
+  if (version) return version;
+  const index = path.join(CORPUS_DIR, 'index.json');
+  if (!fs.existsSync(index)) return null;
+  return JSON.parse(fs.readFileSync(index, 'utf8')).latest || null;
+}
+
+export function loadGoldenCorpus(nodes?: string[], version?: string): CorpusNode[] | null {
+  const resolved = resolveVersion(version);
+  if (!resolved) return null;
+  const base = path.join(CORPUS_DIR, resolved);
+  const manifest = JSON.parse(fs.readFileSync(path.join(base, 'manifest.json'), 'utf8'));
+  const out: CorpusNode[] = [];
+  for (const execution of manifest.executions) {
+    for (const [name, meta] of Object.entries<any>(execution.nodes)) {
+      if (nodes && !nodes.includes(name)) continue;
+      const snap = readGz(path.join(base, meta.file));
+      out.push({
+        executionId: Number(execution.id),
+        node: name,
+        input: snap.input,
+        output: snap.output,
+        executionTimeMs: Number(snap.execution_time_ms || 0),
+      });
+    }
+  }
+  return out;
+}
+
+export function loadGoldenEmbeddings(version?: string): CorpusEmbedding[] | null {
+  const resolved = resolveVersion(version);
+  if (!resolved) return null;
+  const file = path.join(CORPUS_DIR, resolved, 'embeddings.json.gz');
+  if (!fs.existsSync(file)) return null;
+  const blob = readGz(file);
+  const raw = Buffer.from(blob.vectors, 'base64');
+  // Copy: Buffer offsets into the shared pool are not always 4-byte aligned.
+  const flat = new Float32Array(raw.buffer.slice(raw.byteOffset, raw.byteOffset + raw.byteLength));
+  return blob.entries.map((entry: any, i: number) => ({
+    id: entry.id,
+    title: entry.title,
+    timestamp: entry.timestamp ?? null,
+    embedding: flat.slice(i * blob.dims, (i + 1) * blob.dims),
+  }));
+}
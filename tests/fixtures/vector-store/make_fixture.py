@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Writes the fixture for tests/suites/unit/vector-store.test.ts with scripts/_vector_store.py:
+the same five 8-dim vectors as float16.vec and int8.vec (+ .idx), and source.json
+with the float32 inputs and what numpy decodes from each file.
+
+Run (needs numpy):
+  python3 tests/fixtures/vector-store/make_fixture.py
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+HERE = Path(__file__).resolve().parent
+sys.path.insert(0, str(HERE.parents[2] / "scripts"))
+
+from _vector_store import VectorStore, decode_rows, encode_rows  # noqa: E402
+
+# Row 0 holds float16 edge cases: ties that round to even (1 + 2^-11 -> 1, 1 + 3*2^-11 -> 1 + 2^-9),
+# the largest finite half, an overflow, the smallest subnormal and a subnormal tie (2^-25 -> 0).
+EDGES = [1 + 2**-11, 1 + 3 * 2**-11, 65504.0, 65520.0, 2**-24, 2**-25, -0.1, 1 / 3]
+IDS = ["emb_edges", "emb_a", "emb_b", "emb_zero", "emb_c"]
+TITLES = ["edges", "a", "b", "zero", "c · 中文"]
+TIMESTAMPS = [1760000000000, 1760000001000, 1760000002000, 1760000003000, 1760000004000]
+
+
+def main() -> int:
+    rng = np.random.default_rng(42)
+    vectors = rng.standard_normal((len(IDS), len(EDGES))).astype(np.float32)
+    vectors[0] = EDGES
+    vectors[3] = 0.0
+    source = {"ids": IDS, "titles": TITLES, "timestamps": TIMESTAMPS, "vectors": vectors.astype(np.float64).tolist()}
+    for dtype in ("float16", "int8"):
+        path = HERE / f"{dtype}.vec"
+        for stale in (path, path.with_name(f"{path.name}.idx")):
+            stale.unlink(missing_ok=True)
+        with np.errstate(over="ignore"):  # 65520 overflows float16 on purpose
+            VectorStore(path, dtype).write(IDS, TITLES, TIMESTAMPS, vectors)
+            decoded = decode_rows(encode_rows(vectors, dtype), dtype)
+        source[f"decoded_{dtype}"] = [[None if not np.isfinite(v) else float(v) for v in row] for row in decoded]
+    (HERE / "source.json").write_text(json.dumps(source, indent=1) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
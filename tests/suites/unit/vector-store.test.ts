@@ -0,0 +1,152 @@
+/**
+ * 二进制向量库（scripts/lib/vector-store.js）单元测试
+ * 与 scripts/_vector_store.py 互读互写：tests/fixtures/vector-store/ 由 make_fixture.py 用 Python 端生成
+ */
+import { describe, it, expect, beforeEach, afterEach } from 'vitest';
+import fs from 'fs';
+import os from 'os';
+import path from 'path';
+
+const lib = fs.readFileSync(path.resolve(__dirname, '../../../scripts/lib/vector-store.js'), 'utf8');
+const { VEC_STORE, HALF_TO_FLOAT, floatToHalf, vecRowBytes, readVecStore, loadVecStore, saveVecStore, newVecState } =
+  new Function(`${lib}\nreturn { VEC_STORE, HALF_TO_FLOAT, floatToHalf, vecRowBytes, readVecStore, loadVecStore, saveVecStore, newVecState };`)();
+
+const FIXTURE_DIR = path.resolve(__dirname, '../../fixtures/vector-store');
+const source = JSON.parse(fs.readFileSync(path.join(FIXTURE_DIR, 'source.json'), 'utf8'));
+// JSON has no Infinity: make_fixture.py writes the float16 overflow as null
+const finite = (rows: (number | null)[][]) => rows.map(row => row.map(v => (v === null ? Infinity : v)));
+const half = (value: number): number => HALF_TO_FLOAT[floatToHalf(value)];
+
+const sourceEntries = () => source.ids.map((id: string, i: number) => ({
+  id,
+  title: source.titles[i],
+  timestamp: source.timestamps[i],
+  embedding: source.vectors[i],
+}));
+
+describe('Vector Store', () => {
+  let dir: string;
+  let vecPath: string;
+
+  beforeEach(() => {
+    dir = fs.mkdtempSync(path.join(os.tmpdir(), 'vector-store-'));
+    vecPath = path.join(dir, 'store.vec');
+  });
+
+  afterEach(() => {
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+
+  describe('Python fixture', () => {
+    it('reads float16 rows exactly as numpy decodes them', () => {
+      const { embeddings } = loadVecStore(fs, path.join(FIXTURE_DIR, 'float16.vec'));
+      expect(embeddings.map((e: any) => e.id)).toEqual(source.ids);
+      expect(embeddings.map((e: any) => e.title)).toEqual(source.titles);
+      expect(embeddings.map((e: any) => e.timestamp)).toEqual(source.timestamps);
+      expect(embeddings.map((e: any) => e.embedding)).toEqual(finite(source.decoded_float16));
+    });
+
+    it('reads int8 rows as numpy decodes them (float32 scale × q)', () => {
+      const { embeddings } = loadVecStore(fs, path.join(FIXTURE_DIR, 'int8.vec'));
+      expect(embeddings.map((e: any) => e.id)).toEqual(source.ids);
+      expect(embeddings.map((e: any) => e.embedding.map(Math.fround))).toEqual(finite(source.decoded_int8));
+    });
+
+    it('writes a float16 store byte-for-byte like _vector_store.py', () => {
+      saveVecStore(fs, vecPath, sourceEntries(), newVecState(), 'float16');
+      expect(fs.readFileSync(vecPath)).toEqual(fs.readFileSync(path.join(FIXTURE_DIR, 'float16.vec')));
+      expect(fs.readFileSync(`${vecPath}.idx`, 'utf8')).toEqual(fs.readFileSync(path.join(FIXTURE_DIR, 'float16.vec.idx'), 'utf8'));
+    });
+  });
+
+  describe('float16', () => {
+    it('rounds to nearest even', () => {
+      expect(half(1 + 2 ** -11)).toBe(1);
+      expect(half(1 + 3 * 2 ** -11)).toBe(1 + 2 ** -9);
+      expect(half(2 ** -25)).toBe(0);
+      expect(half(3 * 2 ** -26)).toBe(2 ** -24);
+      expect(half(-0.1)).toBe(-0.0999755859375);
+    });
+
+    it('saturates at the largest finite half', () => {
+      expect(half(65504)).toBe(65504);
+      expect(half(65519)).toBe(65504);
+      expect(half(65520)).toBe(Infinity);
+      expect(half(-1e6)).toBe(-Infinity);
+    });
+  });
+
+  describe('int8', () => {
+    it('scales each row by max|v| / 127', () => {
+      const embedding = [0.5, -0.25, 0.1, 0.0031];
+      saveVecStore(fs, vecPath, [{ id: 'a', title: 'a', timestamp: 1, embedding }], newVecState(), 'int8');
+      const scale = fs.readFileSync(vecPath).readFloatLE(VEC_STORE.headerBytes);
+      expect(scale).toBe(Math.fround(0.5 / 127));
+
+      const [loaded] = loadVecStore(fs, vecPath).embeddings;
+      expect(loaded.embedding[0]).toBeCloseTo(0.5, 6);
+      loaded.embedding.forEach((v: number, i: number) => {
+        expect(Math.abs(v - embedding[i])).toBeLessThanOrEqual(scale / 2);
+      });
+    });
+
+    it('stores an all-zero row as zeros', () => {
+      saveVecStore(fs, vecPath, [{ id: 'z', title: '', timestamp: 1, embedding: [0, 0, 0] }], newVecState(), 'int8');
+      expect(loadVecStore(fs, vecPath).embeddings[0].embedding).toEqual([0, 0, 0]);
+    });
+  });
+
+  describe('Appends', () => {
+    it('cuts a torn append off on the next save', () => {
+      const entries = sourceEntries().slice(1, 4);
+      saveVecStore(fs, vecPath, entries, newVecState(), 'float16');
+      const width = vecRowBytes('float16', 8);
+      // A row that landed without its index
+      fs.appendFileSync(vecPath, Buffer.alloc(width + 3, 0xff));
+
+      const { entries: read, state } = readVecStore(fs, vecPath);
+      expect(read.map((e: any) => e.id)).toEqual(entries.map((e: any) => e.id));
+
+      const fresh = { id: 'emb_new', title: 'new', timestamp: 1760000009000, embedding: source.vectors[4] };
+      const result = saveVecStore(fs, vecPath, [...read, fresh], state, 'float16');
+      expect(result).toEqual({ appended: 1, compacted: false, rows: 4, live: 4 });
+      expect(fs.statSync(vecPath).size).toBe(VEC_STORE.headerBytes + 4 * width);
+
+      const { embeddings } = loadVecStore(fs, vecPath);
+      expect(embeddings.map((e: any) => e.id)).toEqual([...entries.map((e: any) => e.id), 'emb_new']);
+      expect(embeddings[3].embedding).toEqual(finite(source.decoded_float16)[4]);
+    });
+
+    it('ignores an index from another generation and rewrites past it', () => {
+      saveVecStore(fs, vecPath, sourceEntries(), newVecState(), 'float16');
+      // The .vec was rewritten (generation 7) but its index never landed
+      const buf = fs.readFileSync(vecPath);
+      buf.writeUInt32LE(7, 12);
+      fs.writeFileSync(vecPath, buf);
+
+      const { entries, state } = readVecStore(fs, vecPath);
+      expect(entries).toEqual([]);
+      expect(state.generation).toBe(7);
+
+      const result = saveVecStore(fs, vecPath, sourceEntries().slice(0, 1), state, 'float16');
+      expect(result.compacted).toBe(true);
+      expect(fs.readFileSync(vecPath).readUInt32LE(12)).toBe(8);
+      expect(loadVecStore(fs, vecPath).embeddings.map((e: any) => e.id)).toEqual([source.ids[0]]);
+    });
+  });
+
+  describe('Dimensions', () => {
+    it('keeps the newest entry\'s dimension whatever the order', () => {
+      const entries = [
+        { id: 'new', title: '', timestamp: 3, embedding: [0.1, 0.2, 0.3, 0.4] },
+        { id: 'old1', title: '', timestamp: 2, embedding: source.vectors[1] },
+        { id: 'old2', title: '', timestamp: 1, embedding: source.vectors[2] },
+      ];
+      for (const order of [entries, [...entries].reverse()]) {
+        const result = saveVecStore(fs, vecPath, order, newVecState(), 'float16');
+        expect(result.live).toBe(1);
+        expect(JSON.parse(fs.readFileSync(`${vecPath}.idx`, 'utf8')).dims).toBe(4);
+      }
+    });
+  });
+});